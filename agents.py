@@ -1,11 +1,30 @@
-import requests
 import re
 import os
+import hashlib
 from dotenv import load_dotenv
-import ollama
+from pydantic import BaseModel, Field, ValidationError
 import json
+import heapq
+import itertools
+import math
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+import github_cache
+from github_client import GITHUB_API_TOKENS, GitHubClient, GitHubRateLimitError
+from github_graphql import GitHubGraphQLError, scrape_github_data_graphql
+from job_profile import get_profile, parse_skills
+from local_scorer import similarity_score
+import metrics
+from ollama_client import OLLAMA_TIMEOUT_SECONDS, OllamaTimeoutError, ollama_pool
+from prescreen import DECISION_ESCALATE, SCORING_CASCADE_ENABLED, prescreen
+from prompt_compaction import (
+    GITHUB_TOKEN_BUDGET, PROMPT_COMPACTION_ENABLED, RESUME_TOKEN_BUDGET, compact_github_data, compact_resume
+)
+import score_cache
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,6 +40,247 @@ Your scores MUST be integers only (no decimals) and follow strict guidelines:
 
 For example, if IMPACT=4, FORMAT=4, LANGUAGE=4, SKILLS=4, SIMILARITY=42, GITHUB=15, then TOTAL must equal 73."""
 
+# Per-job part of the scoring prompt, filled in by build_scoring_prompt(). It is identical for
+# every applicant to a job, so Ollama reuses its evaluated KV cache and only the suffix is evaluated
+SCORING_PROMPT_PREFIX_TEMPLATE = """
+        Score the resume below in three parts, strictly adhering to the point allocations below:
+
+        PART 1: RESUME PARAMETERS (20 points total)
+        Score each parameter from 0-5 (total must not exceed 20):
+        1. Impact: Measurable achievements and results
+        2. Format: Clear structure and professional presentation
+        3. Language: Grammar, spelling, and professional writing
+        4. Skills: Demonstrated technical and soft skills
+
+        PART 2: JOB SIMILARITY (60 points total)
+        Compare resume with job requirements:
+        - Required Skills Match (30 points)
+        - Experience Level Match (15 points)
+        - Education Match (15 points)
+
+        PART 3: GITHUB PROJECTS (20 points total)
+        Evaluate GitHub portfolio, awarding a total between 0-20 points:
+        - Project Relevance (8 points)
+        - Technical Complexity (6 points)
+        - Code Quality (6 points)
+{output_instructions}
+        Job Description:
+        {job_description}
+"""
+
+# Per-applicant part, appended after the prefix
+SCORING_PROMPT_SUFFIX_TEMPLATE = """
+        Resume:
+        {resume_text}
+
+        GitHub Portfolio:
+        {github_data}
+
+        Now score this resume, using exactly the output format given above.
+        """
+
+# Output instructions for SCORING_FORMAT=lines, parsed line by line
+LINE_OUTPUT_INSTRUCTIONS = """
+        IMPORTANT: You MUST output EXACTLY in this format, with no additional text:
+        IMPACT: <score 0-5>
+        FORMAT: <score 0-5>
+        LANGUAGE: <score 0-5>
+        SKILLS: <score 0-5>
+        SIMILARITY: <score 0-60>
+        GITHUB: <score 0-20>
+        TOTAL: <sum between 0-100>
+
+        All scores must be integers, not decimals. 
+        The total score MUST be equal to the sum of all individual scores.
+        
+        For example, if:
+        IMPACT: 4
+        FORMAT: 4
+        LANGUAGE: 4
+        SKILLS: 4
+        SIMILARITY: 42
+        GITHUB: 15
+        
+        Then:
+        TOTAL: 73  (because 4+4+4+4+42+15=73)
+        """
+
+# Output instructions for SCORING_FORMAT=json; Ollama also constrains the output to ScoreOutput's schema
+JSON_OUTPUT_INSTRUCTIONS = """
+        Respond with a JSON object with the integer fields IMPACT, FORMAT, LANGUAGE and SKILLS (0-5 each),
+        SIMILARITY (0-60), GITHUB (0-20) and TOTAL (0-100, the sum of all other fields).
+        """
+
+# "lines" asks for KEY: value lines; "json" uses Ollama's structured output, validated with pydantic
+SCORING_FORMAT = os.getenv("SCORING_FORMAT", "lines").lower()
+OUTPUT_INSTRUCTIONS = JSON_OUTPUT_INSTRUCTIONS if SCORING_FORMAT == "json" else LINE_OUTPUT_INSTRUCTIONS
+
+
+class ScoreOutput(BaseModel):
+    """Scores the model must return in SCORING_FORMAT=json"""
+
+    IMPACT: int = Field(ge=0, le=5)
+    FORMAT: int = Field(ge=0, le=5)
+    LANGUAGE: int = Field(ge=0, le=5)
+    SKILLS: int = Field(ge=0, le=5)
+    SIMILARITY: int = Field(ge=0, le=60)
+    GITHUB: int = Field(ge=0, le=20)
+    TOTAL: int = Field(ge=0, le=100)
+
+
+# Identifies the prompt wording in cache keys; changes whenever a prompt, the output format or
+# the compaction budgets change
+PROMPT_VERSION = hashlib.sha256(
+    f"{SYSTEM_PROMPT}\n{SCORING_PROMPT_PREFIX_TEMPLATE}\n{OUTPUT_INSTRUCTIONS}\n{SCORING_PROMPT_SUFFIX_TEMPLATE}\n"
+    f"{PROMPT_COMPACTION_ENABLED}:{RESUME_TOKEN_BUDGET}:{GITHUB_TOKEN_BUDGET}".encode("utf-8")
+).hexdigest()[:16]
+
+
+@lru_cache(maxsize=128)
+def scoring_prompt_prefix(job_description):
+    """Rendered per-job prefix; job profiles pass the same string object, so lookups hash nothing"""
+    return SCORING_PROMPT_PREFIX_TEMPLATE.format(
+        output_instructions=OUTPUT_INSTRUCTIONS,
+        job_description=job_description
+    )
+
+
+def build_scoring_prompt(job_description, resume_text, github_data):
+    """
+    Scoring prompt laid out as a stable per-job prefix (rubric, output format,
+    job description) followed by the applicant's resume and GitHub data,
+    both compacted to their token budgets
+    """
+    prefix = scoring_prompt_prefix(job_description)
+    suffix = SCORING_PROMPT_SUFFIX_TEMPLATE.format(
+        resume_text=compact_resume(resume_text),
+        github_data=compact_github_data(github_data)
+    )
+    return prefix + suffix
+
+# Model used for scoring
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "openhermes")
+
+# Generations sent to Ollama at once; further calls wait in a priority queue
+OLLAMA_MAX_PARALLEL = int(os.getenv("OLLAMA_MAX_PARALLEL", "2"))
+# Calls allowed to wait; beyond this they are rejected with OllamaOverloadedError (HTTP 429)
+OLLAMA_MAX_QUEUE = int(os.getenv("OLLAMA_MAX_QUEUE", "32"))
+# Longest a call waits for a slot before giving up with OllamaOverloadedError
+OLLAMA_MAX_WAIT_SECONDS = float(os.getenv("OLLAMA_MAX_WAIT_SECONDS", "120"))
+# Seconds of waiting worth one priority level, so batch calls (10 levels down) wait at most about
+# ten times this behind interactive calls that arrived later; 0 disables aging
+OLLAMA_PRIORITY_AGING_SECONDS = float(os.getenv("OLLAMA_PRIORITY_AGING_SECONDS", "6"))
+
+# Scheduling priorities, lower runs first: live applicants go ahead of bulk rescoring
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+
+class OllamaOverloadedError(Exception):
+    """Raised when the scoring queue is full; retry_after is a suggested delay in seconds"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"Scoring queue is full, retry in {retry_after} seconds")
+
+
+class OllamaScheduler:
+    """
+    Caps in-flight generations and admits waiting calls by priority, then
+    arrival order. A waiting call's priority improves by one level every
+    `aging` seconds, so steady interactive traffic can't starve batch
+    calls, and no call waits longer than `max_wait` seconds.
+    """
+
+    def __init__(self, max_parallel=OLLAMA_MAX_PARALLEL, max_queue=OLLAMA_MAX_QUEUE,
+                 max_wait=OLLAMA_MAX_WAIT_SECONDS, aging=OLLAMA_PRIORITY_AGING_SECONDS):
+        self.max_parallel = max_parallel
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.aging = aging
+        self._in_flight = 0
+        # Heap of (rank, arrival) tickets. Every waiting call ages at the same rate, so ranking by
+        # priority * aging + enqueue time orders them as their aged priorities would at any moment
+        self._waiting = []
+        self._arrivals = itertools.count()
+        self._condition = threading.Condition()
+
+    def _publish(self):
+        metrics.set_gauge("ollama.in_flight", self._in_flight)
+        metrics.set_gauge("ollama.queue_depth", len(self._waiting))
+
+    def retry_after(self):
+        """Rough seconds until the current backlog drains"""
+        latency = metrics.average("ollama.latency_seconds") or OLLAMA_TIMEOUT_SECONDS
+        rounds = len(self._waiting) / self.max_parallel + 1
+        return max(1, math.ceil(rounds * latency))
+
+    def acquire(self, priority=PRIORITY_INTERACTIVE, timeout=None):
+        """
+        Wait for a generation slot, or raise OllamaOverloadedError if the
+        queue is full or no slot frees up within `timeout` (default max_wait)
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + (self.max_wait if timeout is None else timeout)
+        with self._condition:
+            if self._in_flight >= self.max_parallel and len(self._waiting) >= self.max_queue:
+                metrics.increment("ollama.rejected")
+                raise OllamaOverloadedError(self.retry_after())
+
+            rank = priority * self.aging + time.monotonic() if self.aging > 0 else priority
+            ticket = (rank, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            self._publish()
+            while self._waiting[0] != ticket or self._in_flight >= self.max_parallel:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._publish()
+                    # The ticket may have been blocking the head of the queue
+                    self._condition.notify_all()
+                    metrics.increment("ollama.wait_timeouts")
+                    raise OllamaOverloadedError(self.retry_after())
+                self._condition.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self._in_flight += 1
+            self._publish()
+            # The next ticket may fit in a remaining slot
+            self._condition.notify_all()
+        metrics.observe("ollama.queue_wait_seconds", time.perf_counter() - start)
+
+    def release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._publish()
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_INTERACTIVE):
+        self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self):
+        """Current load of the scheduler"""
+        with self._condition:
+            return {
+                "in_flight": self._in_flight,
+                "queued": len(self._waiting),
+                "max_parallel": self.max_parallel,
+                "max_queue": self.max_queue,
+                "avg_wait_seconds": round(metrics.average("ollama.queue_wait_seconds"), 4),
+                "rejected": metrics.get_counter("ollama.rejected"),
+                "wait_timeouts": metrics.get_counter("ollama.wait_timeouts")
+            }
+
+
+# Shared by every scoring call in the process
+ollama_scheduler = OllamaScheduler()
+
 def restart_ollama():
     """
     Tries to restart the Ollama service
@@ -74,147 +334,175 @@ def restart_ollama():
         print(f"Error restarting Ollama: {e}")
         return False
 
+# How long Ollama keeps the model, and with it the evaluated prompt prefix, loaded after a call.
+# Ollama reuses the KV cache of the longest prompt prefix it has already evaluated, so while the
+# model stays loaded, applicants to the same job only pay prompt evaluation for their own part
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+# Stream generations and stop them as soon as every score line has arrived
+OLLAMA_STREAMING = os.getenv("OLLAMA_STREAMING", "true").lower() in ("1", "true", "yes")
+
+# Lines the scoring prompt asks for, in order
+SCORE_KEYS = ['IMPACT', 'FORMAT', 'LANGUAGE', 'SKILLS', 'SIMILARITY', 'GITHUB', 'TOTAL']
+
+
+class ScoreLineParser:
+    """Picks KEY: value score lines out of a streamed completion as each line completes"""
+
+    def __init__(self):
+        self.scores = {}
+        self.first_score_seconds = None
+        self._buffer = ""
+        self._start = time.perf_counter()
+
+    @property
+    def complete(self):
+        return all(key in self.scores for key in SCORE_KEYS)
+
+    def feed(self, text):
+        """Add streamed text; returns True once IMPACT through TOTAL have all been seen"""
+        self._buffer += text
+        # Only parse finished lines, so "TOTAL: 7" is never mistaken for "TOTAL: 73"
+        *lines, self._buffer = self._buffer.split("\n")
+        for line in lines:
+            # Same rules as the line-by-line parser in score_resume()
+            key, _, value_text = line.partition(":")
+            key = key.strip().upper()
+            number_match = re.search(r'\b(\d+)\b', value_text)
+            if key in SCORE_KEYS and key not in self.scores and number_match:
+                self.scores[key] = int(number_match.group(1))
+                if self.first_score_seconds is None:
+                    self.first_score_seconds = time.perf_counter() - self._start
+        return self.complete
+
+
+def _report_stream(parser, result):
+    """Record time-to-first-score and the tokens an early stop saved"""
+    if parser.first_score_seconds is not None:
+        metrics.observe("ollama.time_to_first_score_seconds", parser.first_score_seconds)
+    if not result["stopped_early"]:
+        return
+
+    # Estimated against the average length of generations that ran to completion
+    typical_tokens = metrics.average("ollama.completion_tokens")
+    tokens_saved = max(0, round(typical_tokens - result["tokens"])) if typical_tokens else None
+    metrics.increment("ollama.early_stops")
+    if tokens_saved is not None:
+        metrics.increment("ollama.tokens_saved", tokens_saved)
+    print(
+        f"Stopped generation after {result['tokens']} tokens, all scores parsed "
+        f"(first score after {parser.first_score_seconds:.2f}s, "
+        f"tokens saved: {'unknown' if tokens_saved is None else f'~{tokens_saved}'})"
+    )
+
+# Sampling options shared by every scoring call
+OLLAMA_OPTIONS = {
+    "temperature": 0.2,  # Lower temperature for more consistent scoring
+    "top_p": 0.9,
+    "top_k": 40,
+    "num_gpu": 1,
+    "num_thread": 4
+}
+
+def _scores_valid(scores):
+    """True if `scores` holds all seven fields within their ranges"""
+    try:
+        ScoreOutput.model_validate(scores)
+        return True
+    except ValidationError:
+        return False
+
+
+def scoring_stats():
+    """How often model replies could be parsed into scores"""
+    return {
+        "format": SCORING_FORMAT,
+        "parse_attempts": metrics.get_counter("scoring.parse_attempts"),
+        "parse_success": metrics.get_counter("scoring.parse_success"),
+        "parse_success_rate": metrics.ratio("scoring.parse_success", "scoring.parse_attempts"),
+        "fallbacks": metrics.get_counter("scoring.fallbacks")
+    }
+
 # Function to use Ollama directly for scoring resumes
-def score_with_ollama(prompt, model_name="openhermes"):
+def score_with_ollama(prompt, model_name=OLLAMA_MODEL, fallback=True, priority=PRIORITY_INTERACTIVE, schema=None):
     """
     Uses Ollama directly to score resumes without smolagents
+
+    Requests wait for a slot in ollama_scheduler (raising
+    OllamaOverloadedError if its queue is full), then go through the shared
+    pooled client; a timed-out generation is cancelled rather than left
+    running. With OLLAMA_STREAMING the generation is also stopped once all
+    score lines have been received. A JSON `schema` is passed as Ollama's
+    structured output format.
+
+    If Ollama fails, returns keyword-based default scores, or None when
+    fallback is False so callers can tell real model output apart.
     """
+    def generate():
+        with ollama_scheduler.slot(priority):
+            request = {
+                "model": model_name,
+                "prompt": f"{SYSTEM_PROMPT}\n\n{prompt}",
+                "options": OLLAMA_OPTIONS,
+                "keep_alive": OLLAMA_KEEP_ALIVE
+            }
+            if schema is not None:
+                request["format"] = schema
+            # Structured output ends with the closing brace, so there is nothing to stop early
+            if not OLLAMA_STREAMING or schema is not None:
+                return ollama_pool.generate(**request)
+
+            parser = ScoreLineParser()
+            result = ollama_pool.stream(parser.feed, **request)
+            _report_stream(parser, result)
+            return result
+
     try:
-        # Add timeout to prevent hanging indefinitely
-        response_container = {"response": None, "error": None}
-        
-        def ollama_request():
+        result = generate()
+        print("\n==== RESPONSE FROM OLLAMA ====")
+        print(result['response'])
+        print("==== END OF RESPONSE ====\n")
+        return result['response']
+    except OllamaOverloadedError:
+        raise
+    except OllamaTimeoutError as e:
+        # The generation was cancelled and the server is healthy, so no restart
+        print(f"Error: {e}")
+    except ConnectionError as e:
+        print(f"Error calling Ollama: {e}")
+
+        # The server is unreachable: try restarting it once
+        if restart_ollama():
+            print("Retrying after restart...")
             try:
-                result = ollama.generate(
-                    model=model_name,
-                    prompt=f"{SYSTEM_PROMPT}\n\n{prompt}",
-                    options={
-                        "temperature": 0.2,  # Lower temperature for more consistent scoring
-                        "top_p": 0.9,
-                        "top_k": 40,
-                        "num_gpu": 1,
-                        "num_thread": 4
-                    }
-                )
-                response_container["response"] = result
-            except Exception as e:
-                response_container["error"] = str(e)
-        
-        # Start Ollama request in a separate thread
-        ollama_thread = threading.Thread(target=ollama_request)
-        ollama_thread.daemon = True
-        ollama_thread.start()
-        
-        # Wait for response with timeout (30 seconds)
-        timeout = 20  # seconds
-        start_time = time.time()
-        while ollama_thread.is_alive() and time.time() - start_time < timeout:
-            time.sleep(0.5)
-        
-        # Check if we have a response or timed out
-        if time.time() - start_time >= timeout:
-            print(f"Error: Ollama request timed out after {timeout} seconds")
-            
-            # Try restarting Ollama
-            restart_successful = restart_ollama()
-            
-            if restart_successful:
-                print("Retrying request with restarted Ollama service...")
-                # Try the request one more time with a shorter timeout
-                new_response_container = {"response": None, "error": None}
-                
-                def retry_request():
-                    try:
-                        result = ollama.generate(
-                            model=model_name,
-                            prompt=f"{SYSTEM_PROMPT}\n\n{prompt}",
-                            options={
-                                "temperature": 0.2,
-                                "top_p": 0.9,
-                                "top_k": 40,
-                                "num_gpu": 1,
-                                "num_thread": 4
-                            }
-                        )
-                        new_response_container["response"] = result
-                    except Exception as e:
-                        new_response_container["error"] = str(e)
-                
-                retry_thread = threading.Thread(target=retry_request)
-                retry_thread.daemon = True
-                retry_thread.start()
-                
-                # Wait with a shorter timeout
-                retry_timeout = 15  # seconds
-                retry_start = time.time()
-                while retry_thread.is_alive() and time.time() - retry_start < retry_timeout:
-                    time.sleep(0.5)
-                
-                # Check if retry worked
-                if new_response_container["response"]:
-                    print("Retry successful!")
-                    print("\n==== RESPONSE FROM OLLAMA (RETRY) ====")
-                    print(new_response_container["response"]['response'])
-                    print("==== END OF RESPONSE ====\n")
-                    return new_response_container["response"]['response']
-            
-            # If we get here, both attempts failed or restart failed
-            # Use a default scoring mechanism instead
-            return generate_default_scoring(prompt)
-        
-        # Check if there was an error
-        if response_container["error"]:
-            print(f"Error calling Ollama: {response_container['error']}")
-            
-            # Try restarting if it's a connection error
-            if "connection" in response_container["error"].lower() or "failed" in response_container["error"].lower():
-                if restart_ollama():
-                    print("Retrying after restart...")
-                    # Try one more time with direct call (no threading)
-                    try:
-                        result = ollama.generate(
-                            model=model_name,
-                            prompt=f"{SYSTEM_PROMPT}\n\n{prompt}",
-                            options={
-                                "temperature": 0.2,
-                                "top_p": 0.9,
-                                "top_k": 40,
-                                "num_gpu": 1,
-                                "num_thread": 4
-                            }
-                        )
-                        print("\n==== RESPONSE FROM OLLAMA (AFTER RESTART) ====")
-                        print(result['response'])
-                        print("==== END OF RESPONSE ====\n")
-                        return result['response']
-                    except Exception as retry_e:
-                        print(f"Retry failed after restart: {retry_e}")
-            
-            return generate_default_scoring(prompt)
-        
-        if response_container["response"]:
-            print("\n==== RESPONSE FROM OLLAMA ====")
-            print(response_container["response"]['response'])
-            print("==== END OF RESPONSE ====\n")
-            return response_container["response"]['response']
-        else:
-            print("Error: No response received from Ollama")
-            return generate_default_scoring(prompt)
-            
+                result = generate()
+                print("\n==== RESPONSE FROM OLLAMA (AFTER RESTART) ====")
+                print(result['response'])
+                print("==== END OF RESPONSE ====\n")
+                return result['response']
+            except Exception as retry_e:
+                print(f"Retry failed after restart: {retry_e}")
     except Exception as e:
         print(f"Error calling Ollama: {e}")
-        return generate_default_scoring(prompt)
 
-def generate_default_scoring(prompt):
-    """Generate a reasonable default score when Ollama fails to respond"""
+    return generate_default_scoring(prompt) if fallback else None
+
+def generate_default_scoring(prompt, resume_text=None, job_description=None, profile=None):
+    """
+    Generate a reasonable default score when Ollama fails to respond
+
+    SIMILARITY comes from the local BM25 scorer, using the job profile's
+    keyword vector when given. Pass the resume text and job description
+    when available; otherwise they are recovered from the prompt.
+    """
     print("Generating default scores based on resume content...")
     
-    # Extract portions of the prompt to analyze
-    resume_match = re.search(r'Resume:\s*(.*?)(?=GitHub Portfolio:|$)', prompt, re.DOTALL)
-    job_match = re.search(r'Job Description:\s*(.*?)(?=Resume:|$)', prompt, re.DOTALL)
-    
-    resume_text = resume_match.group(1).strip() if resume_match else ""
-    job_text = job_match.group(1).strip() if job_match else ""
+    if resume_text is None or job_description is None:
+        # Extract portions of the prompt to analyze
+        resume_match = re.search(r'Resume:\s*(.*?)(?=GitHub Portfolio:|$)', prompt, re.DOTALL)
+        job_match = re.search(r'Job Description:\s*(.*?)(?=Resume:|$)', prompt, re.DOTALL)
+        resume_text = resume_match.group(1).strip() if resume_match else ""
+        job_description = job_match.group(1).strip() if job_match else ""
     
     # Generate reasonable default scores
     # Parameter scores - default to above average
@@ -223,23 +511,12 @@ def generate_default_scoring(prompt):
     language = 4
     skills = 4
     
-    # Job similarity - calculate basic keyword matching
-    similarity = 30  # Default moderate match
-    
-    # Try to improve similarity score with basic keyword matching if we have text
-    if resume_text and job_text:
-        # Convert to lowercase for comparison
-        resume_lower = resume_text.lower()
-        job_lower = job_text.lower()
-        
-        # Extract potential keywords from job description (very simple approach)
-        job_words = set([w.strip(',.;:()[]{}') for w in job_lower.split() if len(w) > 4])
-        matches = sum(1 for word in job_words if word in resume_lower)
-        
-        # Adjust similarity score based on keyword matches
-        if len(job_words) > 0:
-            match_percentage = min(matches / len(job_words), 1.0)
-            similarity = int(match_percentage * 60)  # Scale to max 60 points
+    # Job similarity - keyword relevance of the resume to the job, or a moderate match without text
+    similarity = 30
+    if resume_text and profile is not None:
+        similarity = profile.vector.score(resume_text)
+    elif resume_text and job_description:
+        similarity = similarity_score(resume_text, job_description)
     
     # Default moderate GitHub score
     github = 15
@@ -258,15 +535,25 @@ def generate_default_scoring(prompt):
     TOTAL: {total}
     """
 
-# GitHub API token
-GITHUB_API_TOKEN = os.getenv("GITHUB_API_TOKEN")
+# Base URL of the GitHub REST API (override to point at a stub server)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+
+# Maximum number of GitHub requests in flight at once, across all submissions
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", "8"))
+
+# "rest" (one call per resource) or "graphql" (one batched query per candidate)
+GITHUB_ENRICHMENT_BACKEND = os.getenv("GITHUB_ENRICHMENT_BACKEND", "rest").lower()
+
+# Rate-limit-aware client shared by all GitHub calls, with enough pooled connections for the scraper threads
+github = GitHubClient(tokens=GITHUB_API_TOKENS, pool_size=GITHUB_MAX_CONCURRENCY)
 
-# Headers for GitHub API
-HEADERS = {"Authorization": f"token {GITHUB_API_TOKEN}"}
+# Shared pool that bounds concurrent GitHub calls
+_github_executor = ThreadPoolExecutor(max_workers=GITHUB_MAX_CONCURRENCY, thread_name_prefix="github")
 
-# Use a session for performance
-session = requests.Session()
-session.headers.update(HEADERS)
+
+def github_get(url, endpoint):
+    """GET a GitHub URL, served from or revalidated against the response cache"""
+    return github_cache.cached_get(github.get, url, endpoint)
 
 
 def is_github_link(url):
@@ -287,8 +574,8 @@ def extract_github_details(url):
 
 def fetch_github_profile(username):
     """Fetches GitHub user profile data."""
-    url = f"https://api.github.com/users/{username}"
-    response = session.get(url)
+    url = f"{GITHUB_API_URL}/users/{username}"
+    response = github_get(url, "profile")
 
     if response.status_code == 200:
         data = response.json()
@@ -305,8 +592,8 @@ def fetch_github_profile(username):
 
 def fetch_github_repo(username, repo):
     """Fetches GitHub repository data."""
-    repo_url = f"https://api.github.com/repos/{username}/{repo}"
-    response = session.get(repo_url)
+    repo_url = f"{GITHUB_API_URL}/repos/{username}/{repo}"
+    response = github_get(repo_url, "repo")
 
     if response.status_code == 200:
         data = response.json()
@@ -322,12 +609,12 @@ def fetch_github_repo(username, repo):
 
 def fetch_readme(username, repo):
     """Fetches the README.md content for a repository."""
-    url = f"https://api.github.com/repos/{username}/{repo}/readme"
-    response = session.get(url)
+    url = f"{GITHUB_API_URL}/repos/{username}/{repo}/readme"
+    response = github_get(url, "readme")
 
     if response.status_code == 200:
         data = response.json()
-        readme_content = session.get(data["download_url"]).text
+        readme_content = github_get(data["download_url"], "readme").text
         return re.sub(r"[\n\r]+", " ", readme_content)[:500]  # Clean & limit to 500 chars
     return "README not found"
 
@@ -339,8 +626,8 @@ def fetch_profile_readme(username):
 
 def fetch_languages(username, repo):
     """Fetches languages used in a repository."""
-    url = f"https://api.github.com/repos/{username}/{repo}/languages"
-    response = session.get(url)
+    url = f"{GITHUB_API_URL}/repos/{username}/{repo}/languages"
+    response = github_get(url, "languages")
 
     if response.status_code == 200:
         return list(response.json().keys())  # List of languages
@@ -349,18 +636,18 @@ def fetch_languages(username, repo):
 
 def fetch_contributions(username):
     """Fetches user contributions from GitHub API (approximation)."""
-    url = f"https://api.github.com/users/{username}/events"
-    response = session.get(url)
+    url = f"{GITHUB_API_URL}/users/{username}/events"
+    response = github_get(url, "contributions")
 
     if response.status_code == 200:
         return len(response.json())  # Approximate count
     return 0
 
 
-def scrape_github_data(links):
-    """Extracts and scrapes relevant GitHub data."""
-    github_data = {"profiles": [], "projects": []}
-
+def collect_github_targets(links):
+    """Unique GitHub usernames and (owner, repo) pairs, in the order they first appear"""
+    usernames = {}
+    repos = {}
     for link in links:
         if not is_github_link(link):
             continue  # Skip non-GitHub links
@@ -368,90 +655,177 @@ def scrape_github_data(links):
         username, repo = extract_github_details(link)
 
         if username and not repo:  # It's a profile
-            profile_data = fetch_github_profile(username)
-            if profile_data:
-                profile_data["contributions"] = fetch_contributions(username)
-                profile_data["profile_readme"] = fetch_profile_readme(username)
-                github_data["profiles"].append(profile_data)
-
+            usernames.setdefault(username.lower(), username)
         elif username and repo:  # It's a repository
-            repo_data = fetch_github_repo(username, repo)
-            if repo_data:
-                repo_data["languages"] = fetch_languages(username, repo)
-                repo_data["readme"] = fetch_readme(username, repo)
-                github_data["projects"].append(repo_data)
+            repos.setdefault((username.lower(), repo.lower()), (username, repo))
+
+    return list(usernames.values()), list(repos.values())
+
+
+def scrape_github_data(links):
+    """
+    Extracts and scrapes relevant GitHub data.
+
+    With GITHUB_ENRICHMENT_BACKEND=graphql (and a token configured) the whole
+    portfolio is fetched in one GraphQL query; otherwise every REST call is
+    issued at once on the shared bounded pool. Repeated usernames and repos
+    are fetched once.
+    """
+    usernames, repos = collect_github_targets(links)
+    if not usernames and not repos:
+        return {"profiles": [], "projects": []}
+
+    if GITHUB_ENRICHMENT_BACKEND == "graphql" and github.authenticated:
+        # GraphQL has no recent-events count, so contributions come from REST, fetched meanwhile
+        contributions = {username: _github_executor.submit(fetch_contributions, username) for username in usernames}
+        try:
+            return scrape_github_data_graphql(
+                github, usernames, repos, lambda username: contributions[username].result()
+            )
+        except GitHubGraphQLError as e:
+            print(f"GraphQL enrichment failed, falling back to REST: {e}")
+
+    return scrape_github_data_rest(usernames, repos)
+
+
+def scrape_github_data_rest(usernames, repos):
+    """Fetch profiles and repos with concurrent REST calls"""
+    github_data = {"profiles": [], "projects": []}
+
+    submit = _github_executor.submit
+    profile_futures = [
+        (submit(fetch_github_profile, username), submit(fetch_contributions, username), submit(fetch_profile_readme, username))
+        for username in usernames
+    ]
+    repo_futures = [
+        (submit(fetch_github_repo, username, repo), submit(fetch_languages, username, repo), submit(fetch_readme, username, repo))
+        for username, repo in repos
+    ]
+
+    for profile_future, contributions_future, readme_future in profile_futures:
+        profile_data = profile_future.result()
+        if profile_data:
+            profile_data["contributions"] = contributions_future.result()
+            profile_data["profile_readme"] = readme_future.result()
+            github_data["profiles"].append(profile_data)
+
+    for repo_future, languages_future, readme_future in repo_futures:
+        repo_data = repo_future.result()
+        if repo_data:
+            repo_data["languages"] = languages_future.result()
+            repo_data["readme"] = readme_future.result()
+            github_data["projects"].append(repo_data)
 
     return github_data
 
 
-def score_resume(resume_text, job_description, extracted_links):
-    try:
-        # Prepare the prompt for Ollama
-        scoring_prompt = f"""
-        Score this resume in three parts, strictly adhering to the point allocations below:
+def prescreen_evaluation(scores, job_description, profile=None):
+    """score_resume()-shaped evaluation from the pre-screen's estimated scores"""
+    parameter_score = scores["IMPACT"] + scores["FORMAT"] + scores["LANGUAGE"] + scores["SKILLS"]
+    evaluation = {
+        "Parameter Score": parameter_score,
+        "Job Similarity Score": scores["SIMILARITY"],
+        "GitHub Score": scores["GITHUB"],
+        "Total Score": scores["TOTAL"],
+        "Scored By": "prescreen"
+    }
+    evaluation["Feedback"] = generate_feedback(
+        evaluation["Total Score"],
+        evaluation["Parameter Score"],
+        evaluation["Job Similarity Score"],
+        evaluation["GitHub Score"],
+        job_description,
+        profile=profile
+    )
+    return evaluation
 
-        PART 1: RESUME PARAMETERS (20 points total)
-        Score each parameter from 0-5 (total must not exceed 20):
-        1. Impact: Measurable achievements and results
-        2. Format: Clear structure and professional presentation
-        3. Language: Grammar, spelling, and professional writing
-        4. Skills: Demonstrated technical and soft skills
 
-        PART 2: JOB SIMILARITY (60 points total)
-        Compare resume with job requirements:
-        - Required Skills Match (30 points)
-        - Experience Level Match (15 points)
-        - Education Match (15 points)
+def score_resume(resume_text, job_description, extracted_links, job=None, defer_github=False,
+                 priority=PRIORITY_INTERACTIVE, fallback=True):
+    """
+    Score a resume against a job description.
 
-        PART 3: GITHUB PROJECTS (20 points total)
-        Evaluate GitHub portfolio, awarding a total between 0-20 points:
-        - Project Relevance (8 points)
-        - Technical Complexity (6 points)
-        - Code Quality (6 points)
+    When the JobDetails row is passed, results are memoized in the score
+    cache keyed on the resume, the job revision, the model and the prompt
+    version, so repeat scoring skips GitHub scraping and the Ollama call.
 
-        Job Description:
-        {job_description}
+    If the GitHub rate limit is exhausted, raises GitHubRateLimitError when
+    defer_github is True (so background work can retry after the reset);
+    otherwise scores without the GitHub portfolio.
 
-        Resume:
-        {resume_text}
+    `priority` orders the Ollama call in ollama_scheduler; when its queue
+    is full, OllamaOverloadedError propagates so callers can back off.
 
-        GitHub Portfolio:
-        {json.dumps(scrape_github_data(extracted_links), indent=2)}
+    With SCORING_CASCADE_ENABLED, resumes whose local estimate is clearly
+    below or above the job's pre-screen band are scored without the LLM.
 
-        IMPORTANT: You MUST output EXACTLY in this format, with no additional text:
-        IMPACT: <score 0-5>
-        FORMAT: <score 0-5>
-        LANGUAGE: <score 0-5>
-        SKILLS: <score 0-5>
-        SIMILARITY: <score 0-60>
-        GITHUB: <score 0-20>
-        TOTAL: <sum between 0-100>
+    With fallback=False, returns None instead of default scores when the
+    model is unavailable or its reply doesn't parse into all seven scores,
+    and raises instead of returning a placeholder evaluation on errors.
+    """
+    cache_key = None
+    profile = None
+    if job is not None:
+        profile = get_profile(job)
+        cache_key = score_cache.score_cache_key(
+            resume_text, extracted_links, job.job_id, profile.fingerprint, OLLAMA_MODEL, PROMPT_VERSION
+        )
+        cached_evaluation = score_cache.get_cached_score(cache_key)
+        if cached_evaluation is not None:
+            print(f"Using cached evaluation for job {job.job_id} (prompt {PROMPT_VERSION})")
+            return cached_evaluation
 
-        All scores must be integers, not decimals. 
-        The total score MUST be equal to the sum of all individual scores.
-        
-        For example, if:
-        IMPACT: 4
-        FORMAT: 4
-        LANGUAGE: 4
-        SKILLS: 4
-        SIMILARITY: 42
-        GITHUB: 15
-        
-        Then:
-        TOTAL: 73  (because 4+4+4+4+42+15=73)
-        """
+    if job is not None and SCORING_CASCADE_ENABLED:
+        # Clear accepts and rejects are decided locally, skipping GitHub scraping and the LLM
+        decision, estimate = prescreen(
+            resume_text, job_description, extracted_links, job.job_id, vector=profile.vector
+        )
+        if decision != DECISION_ESCALATE:
+            print(f"Pre-screen decided '{decision}' for job {job.job_id} (estimated total {estimate['TOTAL']})")
+            return prescreen_evaluation(estimate, job_description, profile)
+
+    try:
+        # Prepare the prompt for Ollama
+        try:
+            github_data = scrape_github_data(extracted_links)
+        except GitHubRateLimitError as e:
+            if defer_github:
+                raise
+            print(f"Scoring without GitHub portfolio: {e}")
+            github_data = {"profiles": [], "projects": [], "unavailable": str(e)}
+
+        scoring_prompt = build_scoring_prompt(job_description, resume_text, github_data)
 
         print("\n==== PROMPT SENT TO OLLAMA ====")
         print(scoring_prompt)
         print("==== END OF PROMPT ====\n")
         
         # Get response directly from Ollama
-        response = score_with_ollama(scoring_prompt)
-        
+        json_mode = SCORING_FORMAT == "json"
+        response = score_with_ollama(
+            scoring_prompt, fallback=False, priority=priority,
+            schema=ScoreOutput.model_json_schema() if json_mode else None
+        )
+        model_replied = from_model = response is not None
+
         # Parse the string response into a dictionary
         scores = {}
-        if isinstance(response, str):
+        if json_mode and from_model:
+            # Structured output is validated as a whole; a malformed reply is not guessed at
+            try:
+                scores = ScoreOutput.model_validate_json(response).model_dump()
+                print("Scores validated against the JSON schema")
+            except ValidationError as e:
+                print(f"Model output failed schema validation: {e}")
+                from_model = False
+
+        if not from_model and fallback:
+            metrics.increment("scoring.fallbacks")
+            response = generate_default_scoring(
+                scoring_prompt, resume_text=resume_text, job_description=job_description, profile=profile
+            )
+
+        if not scores and isinstance(response, str):
             # First, try to find a JSON string in case Ollama returns one
             try:
                 # Look for JSON-like structure with regex
@@ -504,12 +878,21 @@ def score_resume(resume_text, job_description, extracted_links):
                             # Will be handled by the default value logic below
                     except ValueError as e:
                         print(f"Error parsing value in line '{line}': {e}")
-        else:
+        elif not scores:
             scores = response  # In case it's already a dictionary
         
         print("\n==== EXTRACTED SCORES ====")
         print(scores)
         print("==== END OF EXTRACTED SCORES ====\n")
+
+        # A parse succeeds when the model's reply yields all seven scores in range, without defaults
+        parsed = from_model and _scores_valid(scores)
+        if model_replied:
+            metrics.increment("scoring.parse_attempts")
+            if parsed:
+                metrics.increment("scoring.parse_success")
+        if not parsed and not fallback:
+            return None
         
         # Ensure all required keys exist with valid values
         for key in ['IMPACT', 'FORMAT', 'LANGUAGE', 'SKILLS']:
@@ -578,7 +961,8 @@ def score_resume(resume_text, job_description, extracted_links):
             evaluation["Parameter Score"],
             evaluation["Job Similarity Score"], 
             evaluation["GitHub Score"],
-            job_description
+            job_description,
+            profile=profile
         )
         
         # Log the final scores for debugging
@@ -590,11 +974,20 @@ def score_resume(resume_text, job_description, extracted_links):
         # Verify that scores add up correctly
         print(f"Sum of components: {parameter_score + scores.get('SIMILARITY', 0) + scores.get('GITHUB', 0)}")
         print("==== END OF PARSED SCORES ====\n")
+
+        # Only a complete model reply on complete data is worth remembering; defaults filled in
+        # for a truncated or unparseable reply would be served for every resubmission
+        if cache_key and parsed and "unavailable" not in github_data:
+            score_cache.store_score(cache_key, job.job_id, OLLAMA_MODEL, PROMPT_VERSION, evaluation)
         
         return evaluation
 
+    except (GitHubRateLimitError, OllamaOverloadedError):
+        raise
     except Exception as e:
         print(f"Error in score_resume: {e}")
+        if not fallback:
+            raise
         # Provide a default evaluation in case of errors
         return {
             "Parameter Score": 16,
@@ -639,20 +1032,31 @@ def clean_text(text):
     
     return text
 
-def generate_feedback(total_score, parameter_score, similarity_score, github_score, job_description):
-    """Generate personalized feedback based on candidate scores"""
-    
-    # Extract job title from description for more personalized feedback
+def parse_job_description(job_description):
+    """(job title, key skills) recovered from a job description string"""
     job_title = "this position"
     title_match = re.search(r"Job Title:\s*([^\n]+)", job_description)
     if title_match:
         job_title = title_match.group(1).strip()
-    
-    # Extract key skills from job description
-    skills_section = ""
-    skills_match = re.search(r"Skills Requirements:(.*?)(?=\n\n|$)", job_description, re.DOTALL)
+
+    key_skills = []
+    skills_match = re.search(r"Skills[^\n]*:[ \t]*\n?(.*?)(?=\n\s*\n|$)", job_description, re.DOTALL)
     if skills_match:
-        skills_section = skills_match.group(1).strip()
+        key_skills = parse_skills(skills_match.group(1))
+    return job_title, key_skills
+
+def generate_feedback(total_score, parameter_score, similarity_score, github_score, job_description, profile=None):
+    """
+    Generate personalized feedback based on candidate scores
+
+    The job title and key skills come from the job's compiled profile; a
+    plain job description (no JobDetails row) is parsed instead.
+    """
+    if profile is not None:
+        job_title = profile.title
+        key_skills = profile.skills
+    else:
+        job_title, key_skills = parse_job_description(job_description)
     
     # Base feedback on total score
     if total_score >= 85:
@@ -700,12 +1104,12 @@ def generate_feedback(total_score, parameter_score, similarity_score, github_sco
         full_feedback += next_steps
     else:
         # Generate personalized improvement suggestions for rejected candidates
-        suggestions = generate_improvement_suggestions(parameter_score, similarity_score, github_score, job_description, skills_section)
+        suggestions = generate_improvement_suggestions(parameter_score, similarity_score, github_score, key_skills)
         full_feedback += f"\n\n{suggestions}"
     
     return full_feedback
 
-def generate_improvement_suggestions(parameter_score, similarity_score, github_score, job_description, skills_section):
+def generate_improvement_suggestions(parameter_score, similarity_score, github_score, key_skills):
     """Generate specific improvement suggestions based on candidate's weak areas"""
     
     suggestions = []
@@ -728,17 +1132,6 @@ def generate_improvement_suggestions(parameter_score, similarity_score, github_s
     
     # Skills-specific suggestions
     if weakest_area == "skills" or scores["skills"] < 0.5:
-        # Extract key skills from job description if available
-        key_skills = []
-        if skills_section:
-            # Simple extraction of bullet points or comma-separated skills
-            skills_lines = skills_section.split('\n')
-            for line in skills_lines:
-                if '-' in line or '•' in line:
-                    skill = re.sub(r'^[•\-\s]+', '', line).strip()
-                    if skill:
-                        key_skills.append(skill)
-        
         if key_skills:
             skill_suggestions = ", ".join(key_skills[:3])  # Limit to first 3 skills
             suggestions.append(f"Focus on developing these key skills that were missing from your application: {skill_suggestions}")
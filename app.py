@@ -1,20 +1,41 @@
 from fastapi import FastAPI, UploadFile, Form, File, Depends, HTTPException, Response, Request
-import fitz  # PyMuPDF
-import io
 import requests
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import os
+import shutil
+import tempfile
 import logging
-from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+from datetime import datetime
+from pydantic import BaseModel
 import logging
 
 # Import our modules
-from models import get_db, JobDetails, Candidate
+from models import get_async_db, async_engine, AsyncSessionLocal, create_tables, JobDetails, JobStats, Submission, JobScreening
 from file_storage import save_upload_file, serve_file
-from agents import score_resume  # Importing the scoring function
-from email_service import send_interview_invitation, send_rejection_feedback
+from agents import OllamaOverloadedError, ollama_scheduler, score_resume, scoring_stats  # Importing the scoring function
+import metrics
+from pdf_extraction import PDFExtractionError, check_pdf_size, shutdown_pool
+from extraction_cache import extract_with_cache_async, cache_stats as extraction_cache_stats
+from score_cache import cache_stats as score_cache_stats
+from github_cache import cache_stats as github_cache_stats
+from rescore import latest_run, start_rescore
+from job_profile import get_profile
+from candidate_listing import list_candidates_async
+from bulk_ingest import get_ingest, start_ingest
+from prescreen import CASCADE_ACCEPT_ABOVE, CASCADE_REJECT_BELOW, cascade_stats, set_thresholds
+from pipeline import (
+    PASS_THRESHOLD, SUBMISSION_WORKERS, SubmissionWorkerPool,
+    build_candidate, create_submission, normalize_email, notify_candidate
+)
+from job_stats import record_candidates
+from write_queue import candidate_writer
 from dotenv import load_dotenv
 
 # Configure logging
@@ -24,8 +45,14 @@ logger = logging.getLogger(__name__)
 # Load environment variables from .env file
 load_dotenv()
 
+# "sync" scores inside the request; "async" returns 202 and scores on the worker pool
+SUBMISSION_MODE = os.getenv("SUBMISSION_MODE", "sync").lower()
+
 app = FastAPI(title="Resume Scorer API")
 
+# Background scoring workers (started on app startup)
+worker_pool = None
+
 # Add CORS middleware configuration
 app.add_middleware(
     CORSMiddleware,
@@ -38,29 +65,138 @@ app.add_middleware(
 # Mount the static files directory for serving uploaded files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
+@app.on_event("startup")
+def startup():
+    global worker_pool
+    # Make sure newly added tables (e.g. submissions) exist
+    create_tables()
+    # Only queued submissions need workers; they also pick up work left in flight by a previous run.
+    # Sync deployments scoring in the request would otherwise poll the database for nothing
+    if SUBMISSION_MODE == "async" and SUBMISSION_WORKERS > 0:
+        worker_pool = SubmissionWorkerPool()
+        worker_pool.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    if worker_pool:
+        worker_pool.stop(wait=False)
+    shutdown_pool()
+    # Pooled aiosqlite connections each hold a thread that would keep the process alive
+    await async_engine.dispose()
+
 @app.get("/")  
 def read_root():  
     return {"message": "HR Analytics API is running!"}
 
 @app.get("/job-details", response_model=List[dict])
-async def get_job_details(db: Session = Depends(get_db)):
+async def get_job_details(db: AsyncSession = Depends(get_async_db)):
     """Get all job details"""
-    jobs = db.query(JobDetails).order_by(JobDetails.created_at.desc()).all()
+    jobs = (await db.execute(select(JobDetails).order_by(JobDetails.created_at.desc()))).scalars().all()
     return [job.to_dict() for job in jobs]
 
 @app.get("/job-details/{job_id}", response_model=dict)
-async def get_job_detail(job_id: int, db: Session = Depends(get_db)):
+async def get_job_detail(job_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get a specific job detail"""
-    job = db.query(JobDetails).filter(JobDetails.job_id == job_id).first()
+    job = await db.get(JobDetails, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job.to_dict()
 
-@app.get("/candidates", response_model=List[dict])
-async def get_candidates(db: Session = Depends(get_db)):
-    """Get all candidates"""
-    candidates = db.query(Candidate).order_by(Candidate.id.desc()).all()
-    return [candidate.to_dict() for candidate in candidates]
+@app.get("/job-details/{job_id}/stats", response_model=dict)
+async def get_job_stats(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Candidate count, pass rate, mean scores and score histogram of a job, read from its job_stats row"""
+    stats = await db.get(JobStats, job_id)
+    if not stats:
+        if not await db.get(JobDetails, job_id):
+            raise HTTPException(status_code=404, detail="Job not found")
+        # No candidates yet
+        stats = JobStats(job_id=job_id)
+    return {**stats.to_dict(), "pass_threshold": PASS_THRESHOLD}
+
+class ScreeningThresholds(BaseModel):
+    reject_below: int
+    accept_above: int
+
+@app.get("/job-details/{job_id}/screening", response_model=dict)
+async def get_job_screening(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the pre-screen thresholds of a job (the configured defaults if none were set)"""
+    job = await db.get(JobDetails, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    screening = await db.get(JobScreening, job_id)
+    if screening:
+        return screening.to_dict()
+    return {"job_id": job_id, "reject_below": CASCADE_REJECT_BELOW, "accept_above": CASCADE_ACCEPT_ABOVE, "updated_at": None}
+
+@app.put("/job-details/{job_id}/screening", response_model=dict)
+async def put_job_screening(job_id: int, thresholds: ScreeningThresholds, db: AsyncSession = Depends(get_async_db)):
+    """Set the pre-screen thresholds of a job"""
+    job = await db.get(JobDetails, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    # The band must contain the pass threshold, or the pre-screen would overrule the LLM's pass/fail
+    if not 0 <= thresholds.reject_below <= PASS_THRESHOLD <= thresholds.accept_above <= 100:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Thresholds must satisfy 0 <= reject_below <= {PASS_THRESHOLD} <= accept_above <= 100"
+        )
+    screening = await db.run_sync(set_thresholds, job_id, thresholds.reject_below, thresholds.accept_above)
+    return screening.to_dict()
+
+@app.post("/job-details/{job_id}/rescore")
+async def rescore_job_candidates(job_id: int, restart: bool = False, db: AsyncSession = Depends(get_async_db)):
+    """Re-score all candidates of a job in the background, resuming an interrupted run unless `restart`"""
+    job = await db.get(JobDetails, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    try:
+        start_rescore(job_id, restart=restart)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content={
+            "job_id": job_id,
+            "status_url": f"/job-details/{job_id}/rescore",
+            "message": "Rescoring started."
+        }
+    )
+
+@app.get("/job-details/{job_id}/rescore", response_model=dict)
+async def get_rescore_progress(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Progress and throughput of the latest rescore run of a job"""
+    run = await db.run_sync(latest_run, job_id)
+    if not run:
+        raise HTTPException(status_code=404, detail="No rescore run for this job")
+    return run.to_dict()
+
+@app.get("/candidates", response_model=dict)
+async def get_candidates(
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    job_id: Optional[int] = None,
+    min_score: Optional[float] = None,
+    max_score: Optional[float] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    sort: Literal["created_at", "total_score"] = "created_at",
+    order: Literal["desc", "asc"] = "desc",
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Get a page of candidates. Pass the returned `next_cursor` as `cursor`
+    (with the same filters and sort) to get the next page; `fields` is a
+    comma-separated list of the fields to return.
+    """
+    try:
+        return await list_candidates_async(
+            db, limit=limit, cursor=cursor, job_id=job_id, min_score=min_score, max_score=max_score,
+            created_after=created_after, created_before=created_before, sort=sort, order=order, fields=fields
+        )
+    except ValueError as e:
+        # Unknown fields or a malformed/mismatched cursor
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.post("/submit-resume")
 async def submit_resume(
@@ -68,33 +204,24 @@ async def submit_resume(
     email: str = Form(...),
     job_id: int = Form(...),
     resume: UploadFile = File(...),
-    db: Session = Depends(get_db)
+    async_db: AsyncSession = Depends(get_async_db)
 ):
+    # Same form as bulk ingestion, so one address is one candidate whatever its case
+    email = normalize_email(email)
+    if SUBMISSION_MODE == "async":
+        return await queue_resume_submission(name, email, job_id, resume, async_db)
+
     try:
         logger.debug(f"Starting resume submission for {name} ({email}) for job ID {job_id}")
         
-        # Read the PDF file
+        # Read the PDF file and extract text and links with PyMuPDF (in the parser pool),
+        # reusing the previous result if this exact PDF was uploaded before
         pdf_content = await resume.read()
-        pdf_file = io.BytesIO(pdf_content)
-        
-        # Use PyMuPDF to extract text and links
-        doc = fitz.open(stream=pdf_file, filetype="pdf")
-        
-        # Extract text from all pages
-        text_content = ""
-        links = []
-        
-        for page in doc:
-            # Extract text
-            text_content += page.get_text()
-            
-            # Extract links
-            page_links = page.get_links()
-            for link in page_links:
-                if 'uri' in link:
-                    links.append(link['uri'])
-
-        doc.close()
+        try:
+            text_content, links = await extract_with_cache_async(pdf_content)
+        except PDFExtractionError as e:
+            logger.error(f"Rejected resume upload: {str(e)}")
+            return {"error": str(e)}
         logger.debug("PDF text and links extracted successfully")
 
         # Save the resume file locally
@@ -110,97 +237,37 @@ async def submit_resume(
             return {"error": f"Failed to save file: {str(e)}"}
 
         # Get job details from database based on job_id
-        job = db.query(JobDetails).filter(JobDetails.job_id == job_id).first()
+        job = await async_db.get(JobDetails, job_id)
         if not job:
             logger.error(f"Job with ID {job_id} not found in database")
             return {"error": f"Job with ID {job_id} not found"}
         
-        job_description = f"""📌 Job Title: {job.job_title}
-
-            🔍 Job Requirements
-            1️⃣ Skills (Technical & Soft Skills):
-            {job.skills_requirement}
-
-            2️⃣ Experience:
-            {job.experience_requirement}
-
-            3️⃣ Educational Qualifications:
-            {job.education_requirement}
-
-            4️⃣ Additional Requirements:
-            {job.additional_requirements or "None"}
-            """
+        job_description = get_profile(job).description
 
         logger.debug(f"Using job description for {job.job_title} (ID: {job_id})")
         
-        # Call the score_resume function
-        scoring_result = score_resume(text_content, job_description, links)
+        # Call the score_resume function off the event loop, since it may queue for an Ollama slot
+        try:
+            scoring_result = await run_in_threadpool(score_resume, text_content, job_description, links, job=job)
+        except OllamaOverloadedError as e:
+            logger.warning(f"Rejecting submission from {email}: {str(e)}")
+            return JSONResponse(
+                status_code=429,
+                content={"error": "The scoring service is busy, please retry shortly", "retry_after": e.retry_after},
+                headers={"Retry-After": str(e.retry_after)}
+            )
         logger.debug(f"Resume scored successfully: {scoring_result}")
 
-        # Prepare candidate data
-        candidate_data = Candidate(
-            job_id=job.job_id,
-            user_name=name,
-            user_email=email,
-            resume_url=resume_url,
-            parameter_score=scoring_result["Parameter Score"],
-            job_similarity_score=scoring_result["Job Similarity Score"],
-            github_score=scoring_result["GitHub Score"],
-            total_score=scoring_result["Total Score"]
-        )
-        
         # Store in database
         try:
-            db.add(candidate_data)
-            db.commit()
+            await store_candidate(job_id, name, email, resume_url, scoring_result)
             logger.debug("Candidate data stored in database")
         except Exception as e:
-            db.rollback()
             logger.error(f"Failed to store in database: {str(e)}")
             return {"error": f"Failed to store in database: {str(e)}"}
 
-        # Calculate total score as a percentage
-        total_score_percentage = (scoring_result["Total Score"] / 100) * 100
-        logger.debug(f"Total score percentage: {total_score_percentage}%")
-
         # Send appropriate email based on score
-        if total_score_percentage >= 70:
-            logger.debug(f"Score is above threshold. Sending interview invitation to {email}")
-            # Send interview invitation
-            email_sent = send_interview_invitation(name, email, job.job_title)
-            if email_sent:
-                print(f"\n==== EMAIL SENT ====")
-                print(f"Invitation email sent to {name} ({email})")
-                print(f"Total Score: {total_score_percentage}% - QUALIFIED FOR INTERVIEW")
-                print(f"==== END OF EMAIL INFO ====\n")
-            else:
-                print(f"\n==== EMAIL FAILED ====")
-                print(f"Failed to send invitation email to {name} ({email})")
-                print(f"==== END OF EMAIL INFO ====\n")
-        else:
-            logger.debug(f"Score is below threshold. Sending rejection to {email}")
-            
-            # Use the feedback generated by our scoring function
-            feedback = scoring_result.get("Feedback", "")
-            
-            # Send rejection email with feedback
-            email_sent = send_rejection_feedback(
-                name, 
-                email, 
-                job.job_title,
-                feedback
-            )
-            
-            if email_sent:
-                print(f"\n==== EMAIL SENT ====")
-                print(f"Rejection email sent to {name} ({email})")
-                print(f"Total Score: {total_score_percentage}% - NOT QUALIFIED FOR INTERVIEW")
-                print(f"Feedback: {feedback[:100]}...")  # Print first 100 chars of feedback
-                print(f"==== END OF EMAIL INFO ====\n")
-            else:
-                print(f"\n==== EMAIL FAILED ====")
-                print(f"Failed to send rejection email to {name} ({email})")
-                print(f"==== END OF EMAIL INFO ====\n")
+        notify_candidate(name, email, job.job_title, scoring_result)
 
         return {
             "name": name,
@@ -217,6 +284,129 @@ async def submit_resume(
         logger.error(f"Error in submit_resume: {str(e)}")
         return {"error": f"Failed to process resume: {str(e)}"}
 
+async def store_candidate(job_id, name, email, resume_url, scoring_result):
+    """Insert a scored candidate without blocking the event loop"""
+    def store(db):
+        # The candidate writer may replay the write, so each run builds its own row
+        candidate = build_candidate(job_id, name, email, resume_url, scoring_result)
+        db.add(candidate)
+        record_candidates(db, [candidate])
+
+    if candidate_writer.enabled:
+        # The candidate writer commits concurrent submissions together
+        await asyncio.wrap_future(candidate_writer.submit(store))
+        return
+    async with AsyncSessionLocal() as async_db:
+        await async_db.run_sync(store)
+        await async_db.commit()
+
+async def queue_resume_submission(name: str, email: str, job_id: int, resume: UploadFile, db: AsyncSession):
+    """Validate and persist an upload, then leave scoring to the worker pool"""
+    logger.debug(f"Queueing resume submission for {name} ({email}) for job ID {job_id}")
+
+    job = await db.get(JobDetails, job_id)
+    if not job:
+        logger.error(f"Job with ID {job_id} not found in database")
+        return {"error": f"Job with ID {job_id} not found"}
+
+    pdf_content = await resume.read()
+    try:
+        check_pdf_size(pdf_content)
+    except PDFExtractionError as e:
+        logger.error(f"Rejected resume upload: {str(e)}")
+        return {"error": str(e)}
+
+    try:
+        await resume.seek(0)
+        file_path, resume_url = await save_upload_file(resume, f"{email}_resume.pdf")
+        logger.debug(f"Resume saved to {file_path}")
+    except Exception as e:
+        logger.error(f"Failed to save file: {str(e)}")
+        return {"error": f"Failed to save file: {str(e)}"}
+
+    try:
+        submission = await db.run_sync(create_submission, name, email, job_id, resume_url)
+    except Exception as e:
+        await db.rollback()
+        logger.error(f"Failed to store in database: {str(e)}")
+        return {"error": f"Failed to store in database: {str(e)}"}
+
+    if worker_pool:
+        worker_pool.notify()
+
+    return JSONResponse(
+        status_code=202,
+        content={
+            "submission_id": submission.id,
+            "stage": submission.stage,
+            "status_url": f"/submissions/{submission.id}",
+            "message": "Resume uploaded and queued for evaluation."
+        }
+    )
+
+@app.post("/bulk-ingest")
+async def bulk_ingest(
+    job_id: int = Form(...),
+    files: List[UploadFile] = File(...),
+    notify: bool = Form(False),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Score and store many resumes for a job: any mix of PDFs and zip archives of PDFs"""
+    job = await db.get(JobDetails, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    # Spool the uploads to disk in chunks; archives are read member by member from there
+    temp_dir = tempfile.mkdtemp(prefix="bulk-ingest-")
+    paths = []
+    for upload in files:
+        # One directory per upload, so files with the same name don't collide
+        upload_dir = os.path.join(temp_dir, str(len(paths)))
+        os.makedirs(upload_dir)
+        path = os.path.join(upload_dir, os.path.basename(upload.filename or "upload.pdf"))
+        with open(path, "wb") as buffer:
+            await run_in_threadpool(shutil.copyfileobj, upload.file, buffer)
+        paths.append(path)
+
+    ingest = start_ingest(job_id, paths, notify=notify, temp_dir=temp_dir)
+    return JSONResponse(
+        status_code=202,
+        content={
+            "ingest_id": ingest.id,
+            "status_url": f"/bulk-ingest/{ingest.id}",
+            "message": "Resumes uploaded and queued for evaluation."
+        }
+    )
+
+@app.get("/bulk-ingest/{ingest_id}", response_model=dict)
+async def get_bulk_ingest(ingest_id: str):
+    """Progress, throughput and per-file report of a bulk ingest started by this process"""
+    ingest = get_ingest(ingest_id)
+    if not ingest:
+        raise HTTPException(status_code=404, detail="Bulk ingest not found")
+    return ingest.summary()
+
+@app.get("/submissions/{submission_id}", response_model=dict)
+async def get_submission(submission_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get the pipeline stage and, once scored, the evaluation of a submission"""
+    submission = await db.get(Submission, submission_id)
+    if not submission:
+        raise HTTPException(status_code=404, detail="Submission not found")
+    return submission.to_dict()
+
+@app.get("/metrics", response_model=dict)
+async def get_metrics():
+    """Cache, queue and latency metrics for this API process"""
+    return {
+        **metrics.snapshot(),
+        "extraction_cache": extraction_cache_stats(),
+        "score_cache": score_cache_stats(),
+        "github_cache": github_cache_stats(),
+        "ollama_queue": ollama_scheduler.stats(),
+        "scoring": scoring_stats(),
+        "cascade": cascade_stats()
+    }
+
 @app.get("/download/{file_path:path}")
 async def download_file(file_path: str):
     """Serve a file from the uploads directory"""
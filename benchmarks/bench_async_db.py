@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Benchmark: request latency with sync vs async database sessions.
+
+Starts a small FastAPI app in a separate process on a temporary SQLite
+database seeded with candidates. It serves the job listing, the candidate
+listing and a candidate insert twice:
+
+    sync    a sync Session inside `async def` handlers (the old app.py
+            behaviour), so every query runs on the event loop
+    async   the AsyncSession from models.get_async_db, with inserts
+            awaiting the candidate writer as app.store_candidate does
+
+Inside the server, a background thread stands in for rescoring, bulk
+ingestion and the submission workers. It writes a batch every 100 ms and
+holds the write lock for --hold-ms. A sync insert waiting for that lock
+stalls every request on the event loop; an async one delays only itself.
+
+Requests are sent open-loop at --rate per second (70% candidate pages,
+15% job list, 15% inserts), and latency is measured from each request's
+scheduled send time, so time spent queued behind a blocked loop counts.
+
+The sync handlers open their session inline rather than through a
+get_db-style dependency. Such a dependency returns its connection in a
+teardown that runs after the response is sent. Under load the pool runs
+dry, and a sync handler then blocks the event loop waiting for a
+connection that only a teardown scheduled on that same loop can return.
+Every request then stalls until the pool timeout.
+
+Usage:
+    python benchmarks/bench_async_db.py [--rate 80] [--seconds 20] [--hold-ms 150] [--candidates 20000]
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from candidate_listing import list_candidates, list_candidates_async
+from db_engine import create_configured_async_engine, create_configured_engine
+from models import Base, Candidate, JobDetails
+from pipeline import build_candidate
+from write_queue import WriteQueue
+
+PORT = 8766
+BASE_URL = f"http://127.0.0.1:{PORT}"
+JOBS = 5
+SCORES = {"Parameter Score": 20, "Job Similarity Score": 35, "GitHub Score": 15, "Total Score": 70}
+
+engine = SessionLocal = async_engine = AsyncSessionLocal = writer_queue = None
+
+
+def create_engines(database_url):
+    global engine, SessionLocal, async_engine, AsyncSessionLocal, writer_queue
+    engine = create_configured_engine(database_url, connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(bind=engine)
+    async_engine = create_configured_async_engine(database_url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+    writer_queue = WriteQueue(session_factory=SessionLocal, name="bench_writer")
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+app = FastAPI()
+
+
+@app.get("/sync/job-details")
+async def sync_job_details():
+    with SessionLocal() as db:
+        return [job.to_dict() for job in db.query(JobDetails).order_by(JobDetails.created_at.desc()).all()]
+
+
+@app.get("/sync/candidates")
+async def sync_candidates(job_id: int):
+    with SessionLocal() as db:
+        return list_candidates(db, job_id=job_id, sort="total_score", limit=100)
+
+
+@app.post("/sync/candidates")
+async def sync_insert(email: str):
+    with SessionLocal() as db:
+        db.add(build_candidate(1, email, email, f"/uploads/{email}.pdf", SCORES))
+        db.commit()
+    return {"ok": True}
+
+
+@app.get("/async/job-details")
+async def async_job_details(db: AsyncSession = Depends(get_async_db)):
+    jobs = (await db.execute(select(JobDetails).order_by(JobDetails.created_at.desc()))).scalars().all()
+    return [job.to_dict() for job in jobs]
+
+
+@app.get("/async/candidates")
+async def async_candidates(job_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await list_candidates_async(db, job_id=job_id, sort="total_score", limit=100)
+
+
+@app.post("/async/candidates")
+async def async_insert(email: str):
+    await asyncio.wrap_future(writer_queue.submit(
+        lambda db: db.add(build_candidate(1, email, email, f"/uploads/{email}.pdf", SCORES))
+    ))
+    return {"ok": True}
+
+
+def seed(candidates):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(JobDetails), [
+            {"job_id": job_id, "job_title": f"Job {job_id}", "job_details": "-", "skills_requirement": "Python",
+             "education_requirement": "-", "experience_requirement": "-"}
+            for job_id in range(1, JOBS + 1)
+        ])
+        conn.execute(insert(Candidate), [
+            {"job_id": i % JOBS + 1, "user_name": f"c{i}", "user_email": f"seed{i}@example.com",
+             "resume_url": f"/uploads/{i}.pdf", "total_score": random.uniform(0, 100)}
+            for i in range(candidates)
+        ])
+
+
+def background_writer(hold_ms):
+    """Write a batch every 100 ms, holding the write lock for `hold_ms`"""
+    for batch in itertools.count():
+        time.sleep(0.1)
+        with engine.begin() as conn:
+            conn.execute(insert(Candidate), [
+                {"job_id": 1, "user_name": "bg", "user_email": f"bg{batch}-{i}@example.com",
+                 "resume_url": "/uploads/bg.pdf"}
+                for i in range(20)
+            ])
+            time.sleep(hold_ms / 1000)
+
+
+def serve(database_url, hold_ms):
+    create_engines(database_url)
+    if hold_ms > 0:
+        threading.Thread(target=background_writer, args=(hold_ms,), daemon=True).start()
+    uvicorn.run(app, host="127.0.0.1", port=PORT, log_level="warning")
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run_load(client, prefix, rate, seconds, email_ids):
+    """Send requests open-loop at `rate` per second; latency counts from each scheduled send time"""
+    latencies = []
+    errors = 0
+
+    async def request(scheduled):
+        nonlocal errors
+        roll = random.random()
+        try:
+            if roll < 0.7:
+                response = await client.get(f"{prefix}/candidates", params={"job_id": random.randint(1, JOBS)})
+            elif roll < 0.85:
+                response = await client.get(f"{prefix}/job-details")
+            else:
+                response = await client.post(
+                    f"{prefix}/candidates", params={"email": f"load{next(email_ids)}@example.com"}
+                )
+            ok = response.status_code == 200
+        except httpx.HTTPError:
+            ok = False
+        latencies.append(time.perf_counter() - scheduled)
+        if not ok:
+            errors += 1
+
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(rate * seconds)):
+        scheduled = start + i / rate
+        await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+        tasks.append(asyncio.create_task(request(scheduled)))
+    await asyncio.gather(*tasks)
+    return latencies, time.perf_counter() - start, errors
+
+
+async def main(rate, seconds, hold_ms):
+    print(f"{rate:g} requests/s for {seconds:g} s, background writes holding the lock {hold_ms} ms\n")
+    print(f"{'sessions':<9} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    email_ids = itertools.count()
+    limits = httpx.Limits(max_connections=500)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60, limits=limits) as client:
+        for prefix in ("/sync", "/async"):
+            # Warm up connections and the page cache
+            await run_load(client, prefix, rate, 2, email_ids)
+            latencies, elapsed, errors = await run_load(client, prefix, rate, seconds, email_ids)
+            print(
+                f"{prefix[1:]:<9} {len(latencies) / elapsed:>8.0f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+                f"{percentile(latencies, 0.99) * 1000:>8.1f} {errors:>7}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=float, default=80)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--hold-ms", type=int, default=150)
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--serve", metavar="DATABASE_URL", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.hold_ms)
+        sys.exit()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database_url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        create_engines(database_url)
+        seed(args.candidates)
+        engine.dispose()
+
+        server = subprocess.Popen(
+            [sys.executable, __file__, "--serve", database_url, "--hold-ms", str(args.hold_ms)]
+        )
+        try:
+            for _ in range(200):
+                try:
+                    httpx.get(f"{BASE_URL}/sync/job-details")
+                    break
+                except httpx.HTTPError:
+                    time.sleep(0.1)
+            asyncio.run(main(args.rate, args.seconds, args.hold_ms))
+        finally:
+            server.terminate()
+            server.wait()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GitHub response cache and ETag revalidation.
+
+Scrapes the same resume links three times against a local stub GitHub
+server: with a cold cache, with fresh entries, and with every entry expired
+so that it is revalidated with If-None-Match. Reports latency, requests
+that reached the server, 304 replies and bytes saved.
+
+Usage:
+    python benchmarks/bench_github_cache.py [--repos 6] [--latency 0.05]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(BENCH_DIR))
+sys.path.append(BENCH_DIR)
+
+from github_stub import start_stub
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repos", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per stub request")
+    args = parser.parse_args()
+
+    server, base_url = start_stub(latency=args.latency)
+    os.environ["GITHUB_API_URL"] = base_url
+    # The client-side token bucket would otherwise pace the stub requests
+    os.environ.setdefault("GITHUB_REQUESTS_PER_SECOND", "1000")
+    os.environ.setdefault("GITHUB_BURST", "1000")
+
+    # Keep the benchmark's cache out of the real database
+    os.chdir(tempfile.mkdtemp())
+    import agents
+    import github_cache
+    import metrics
+    from models import create_tables
+    create_tables()
+
+    links = ["https://github.com/octocat"] + [f"https://github.com/octocat/project-{i}" for i in range(args.repos)]
+
+    def run(label):
+        metrics.reset()
+        server.request_count = 0
+        server.not_modified_count = 0
+        start = time.perf_counter()
+        agents.scrape_github_data(links)
+        elapsed = time.perf_counter() - start
+        stats = github_cache.cache_stats()
+        print(f"{label:<12} {elapsed * 1000:8.1f} ms   {server.request_count:3d} requests   "
+              f"{server.not_modified_count:3d} x 304   hit rate {stats['hit_rate']:.2f}   "
+              f"{int(stats['bytes_saved']):6d} bytes saved")
+
+    run("cold")
+    run("fresh")
+    for endpoint in github_cache.GITHUB_CACHE_TTLS:
+        github_cache.GITHUB_CACHE_TTLS[endpoint] = 0
+    run("revalidate")
+    server.shutdown()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: local similarity scorer vs the old keyword check.
+
+Scores synthetic resumes of increasing length and relevance against the
+seeded job descriptions with the substring check generate_default_scoring()
+used to run and with local_scorer.similarity_score(). Reports time per
+call (cold and with the job vector cached) and how well each score tracks
+the share of job terms planted in the resume.
+
+Usage:
+    python benchmarks/bench_local_scorer.py [--resumes 200] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+JOBS = [
+    SimpleNamespace(
+        job_title="Software Engineer",
+        skills_requirement="Python, Java, C++, databases, web development, software frameworks",
+        experience_requirement="3+ years building scalable backend services and REST APIs",
+        education_requirement="Bachelor's degree in Computer Science or related field",
+        additional_requirements="Experience with Docker, Kubernetes and CI/CD pipelines"
+    ),
+    SimpleNamespace(
+        job_title="Data Scientist",
+        skills_requirement="Python, R, SQL, machine learning frameworks, Tableau, Power BI",
+        experience_requirement="2+ years of statistical modelling and experimentation",
+        education_requirement="Master's degree in Statistics, Mathematics or Computer Science",
+        additional_requirements="Familiarity with deep learning and A/B testing"
+    )
+]
+
+FILLER = ("collaborated stakeholders delivered initiatives managed quarterly roadmap improved onboarding "
+          "mentored colleagues presented findings coordinated vendors organised workshops").split()
+
+
+def legacy_similarity(resume_text, job_text):
+    """The keyword check generate_default_scoring() used before local_scorer"""
+    resume_lower = resume_text.lower()
+    job_words = set([w.strip(',.;:()[]{}') for w in job_text.lower().split() if len(w) > 4])
+    matches = sum(1 for word in job_words if word in resume_lower)
+    return int(min(matches / len(job_words), 1.0) * 60) if job_words else 30
+
+
+def synthetic_resume(job_terms, relevance, words, rng):
+    """`words` words of which roughly `relevance` are drawn from the job's terms"""
+    return " ".join(rng.choice(job_terms) if rng.random() < relevance else rng.choice(FILLER) for _ in range(words))
+
+
+def time_per_call(function, pairs, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for resume_text, job_text in pairs:
+            function(resume_text, job_text)
+    return (time.perf_counter() - start) / (repeat * len(pairs)) * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from local_scorer import job_vector, similarity_score, tokenize
+    from job_profile import render_job_description
+
+    rng = random.Random(7)
+    pairs, relevances = [], []
+    for i in range(args.resumes):
+        job_text = render_job_description(JOBS[i % len(JOBS)])
+        relevance = rng.random() * 0.4
+        words = rng.choice([300, 800, 1500, 3000])
+        pairs.append((synthetic_resume(tokenize(job_text), relevance, words, rng), job_text))
+        relevances.append(relevance)
+
+    legacy_us = time_per_call(legacy_similarity, pairs, args.repeat)
+    job_vector.cache_clear()
+    cold_us = time_per_call(lambda r, j: (job_vector.cache_clear(), similarity_score(r, j)), pairs, 1)
+    warm_us = time_per_call(similarity_score, pairs, args.repeat)
+
+    legacy_scores = [legacy_similarity(r, j) for r, j in pairs]
+    local_scores = [similarity_score(r, j) for r, j in pairs]
+
+    print(f"{'scorer':<22} {'us/call':>9} {'corr. with relevance':>22}")
+    print(f"{'legacy substring':<22} {legacy_us:9.1f} {np.corrcoef(relevances, legacy_scores)[0, 1]:22.3f}")
+    print(f"{'bm25 (cold vector)':<22} {cold_us:9.1f}")
+    print(f"{'bm25 (cached vector)':<22} {warm_us:9.1f} {np.corrcoef(relevances, local_scores)[0, 1]:22.3f}")
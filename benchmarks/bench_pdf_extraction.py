@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark: responsiveness of other endpoints while large PDFs are parsed.
+
+Starts a small FastAPI app with a cheap /ping endpoint and two parse
+endpoints, one parsing inline on the event loop (the old submit_resume
+behaviour) and one using pdf_extraction's process pool. For each, 50 large
+PDFs are parsed concurrently while a client hammers /ping, and the ping
+requests/sec are reported.
+
+Usage:
+    python benchmarks/bench_pdf_extraction.py [--pages 60] [--parses 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+# Extract every page of the synthetic documents
+os.environ.setdefault("PDF_MAX_PAGES", "1000")
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # PyMuPDF
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+
+import pdf_extraction
+
+PORT = 8765
+BASE_URL = f"http://127.0.0.1:{PORT}"
+
+
+def build_large_pdf(pages):
+    """Create a text-dense PDF with a few links per page"""
+    doc = fitz.open()
+    line = "Led a team of engineers building distributed data pipelines in Python and Go. " * 2
+    for page_number in range(pages):
+        page = doc.new_page()
+        for row in range(45):
+            page.insert_text((36, 40 + row * 16), line[:110], fontsize=9)
+        for i in range(3):
+            rect = fitz.Rect(36, 760 + i * 10, 200, 770 + i * 10)
+            page.insert_link({"kind": fitz.LINK_URI, "from": rect, "uri": f"https://github.com/user{page_number}/repo{i}"})
+    return doc.tobytes()
+
+
+app = FastAPI()
+
+
+@app.get("/ping")
+async def ping():
+    return {"ok": True}
+
+
+@app.post("/parse-inline")
+async def parse_inline(request: Request):
+    pdf_content = await request.body()
+    text, links, _ = pdf_extraction._extract_pages(pdf_content, 0, 10**6)
+    return {"chars": len(text), "links": len(links)}
+
+
+@app.post("/parse-pool")
+async def parse_pool(request: Request):
+    pdf_content = await request.body()
+    text, links = await pdf_extraction.extract_pdf_content_async(pdf_content)
+    return {"chars": len(text), "links": len(links)}
+
+
+async def run_scenario(client, endpoint, pdf_content, parses):
+    """Parse `parses` PDFs concurrently and count /ping responses meanwhile"""
+    done = asyncio.Event()
+    pings = 0
+
+    async def pinger():
+        nonlocal pings
+        while not done.is_set():
+            await client.get("/ping")
+            pings += 1
+
+    async def parse_all():
+        await asyncio.gather(*[client.post(endpoint, content=pdf_content) for _ in range(parses)])
+        done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(parse_all(), *[pinger() for _ in range(4)])
+    elapsed = time.perf_counter() - start
+    return pings / elapsed, elapsed
+
+
+async def main(pages, parses):
+    pdf_content = build_large_pdf(pages)
+    print(f"Synthetic resume: {pages} pages, {len(pdf_content) / 1024:.0f} KiB; {parses} concurrent parses")
+    print(f"PDF_WORKERS={pdf_extraction.PDF_WORKERS}, PDF_PAGES_PER_TASK={pdf_extraction.PDF_PAGES_PER_TASK}\n")
+
+    limits = httpx.Limits(max_connections=parses + 8)
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=600, limits=limits) as client:
+        # Warm up the process pool so worker start-up isn't measured
+        await client.post("/parse-pool", content=pdf_content)
+
+        idle_start = time.perf_counter()
+        for _ in range(200):
+            await client.get("/ping")
+        print(f"{'idle':<14} /ping {200 / (time.perf_counter() - idle_start):8.1f} req/s")
+
+        for endpoint in ("/parse-inline", "/parse-pool"):
+            ping_rate, elapsed = await run_scenario(client, endpoint, pdf_content, parses)
+            print(f"{endpoint:<14} /ping {ping_rate:8.1f} req/s   parses finished in {elapsed:6.2f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--parses", type=int, default=50)
+    args = parser.parse_args()
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=PORT, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        asyncio.run(main(args.pages, args.parses))
+    finally:
+        server.should_exit = True
+        thread.join()
+        pdf_extraction.shutdown_pool()
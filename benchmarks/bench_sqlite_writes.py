@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent candidate inserts against SQLite.
+
+Runs the same workload against a fresh database file three ways:
+
+    default   SQLite defaults, each writer thread commits its own row
+    tuned     db_engine pragmas (WAL, synchronous=NORMAL, busy timeout)
+    queued    tuned, with inserts submitted to a write_queue.WriteQueue
+
+Writer threads each insert --rows candidates while reader threads keep
+running the admin listing query. Reports insert throughput, p50/p99
+insert latency, reads completed and "database is locked" errors.
+
+Usage:
+    python benchmarks/bench_sqlite_writes.py [--writers 32] [--rows 50] [--readers 4]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add the parent directory to the path so we can import the app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from candidate_listing import list_candidates
+from db_engine import create_configured_engine
+from models import Base, JobDetails
+from pipeline import build_candidate
+from write_queue import WriteQueue
+
+SCORES = {"Parameter Score": 20, "Job Similarity Score": 35, "GitHub Score": 15, "Total Score": 70}
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def run_scenario(mode, directory, writers, rows, readers):
+    # Python's sqlite3 waits 5 s for a lock by default; the tuned engine raises that with busy_timeout
+    engine = create_configured_engine(
+        f"sqlite:///{os.path.join(directory, mode + '.db')}", tuned=mode != "default",
+        connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.commit()
+    db.close()
+
+    writer_queue = WriteQueue(session_factory=factory, name=f"bench_{mode}") if mode == "queued" else None
+    latencies = []
+    errors = {"locked": 0, "other": 0}
+    reads = 0
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def record_error(e):
+        with lock:
+            errors["locked" if "locked" in str(e) else "other"] += 1
+
+    def writer(worker):
+        for row in range(rows):
+            email = f"w{worker}-{row}@example.com"
+
+            def store(session):
+                session.add(build_candidate(1, email, email, f"/uploads/{email}.pdf", SCORES))
+
+            start = time.perf_counter()
+            try:
+                if writer_queue is not None:
+                    writer_queue.run(store)
+                else:
+                    session = factory()
+                    try:
+                        store(session)
+                        session.commit()
+                    except Exception:
+                        session.rollback()
+                        raise
+                    finally:
+                        session.close()
+            except OperationalError as e:
+                record_error(e)
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    def reader():
+        nonlocal reads
+        while not done.is_set():
+            session = factory()
+            try:
+                list_candidates(session, limit=50, job_id=1, sort="total_score")
+                with lock:
+                    reads += 1
+            except OperationalError as e:
+                record_error(e)
+            finally:
+                session.close()
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for thread in reader_threads:
+        thread.start()
+    start = time.perf_counter()
+    for thread in writer_threads:
+        thread.start()
+    for thread in writer_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "inserts_per_second": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.5) * 1000 if latencies else 0,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else 0,
+        "reads": reads,
+        "locked": errors["locked"],
+        "other_errors": errors["other"],
+    }
+
+
+def main(writers, rows, readers):
+    print(f"{writers} writer threads x {rows} inserts, {readers} reader threads\n")
+    print(f"{'mode':<8} {'inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8} {'reads':>7} {'locked':>7} {'other':>6}")
+    with tempfile.TemporaryDirectory() as directory:
+        for mode in ("default", "tuned", "queued"):
+            result = run_scenario(mode, directory, writers, rows, readers)
+            print(
+                f"{mode:<8} {result['inserts_per_second']:>10.0f} {result['p50_ms']:>8.1f} "
+                f"{result['p99_ms']:>8.1f} {result['reads']:>7} {result['locked']:>7} {result['other_errors']:>6}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=32)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+    main(args.writers, args.rows, args.readers)
@@ -0,0 +1,118 @@
+"""
+Local stub of the GitHub API for benchmarks.
+
+Serves the REST endpoints agents.py uses with a fixed artificial latency
+per request, so scraping strategies can be compared without the network or
+a token. Responses carry ETags and honour If-None-Match, and POST /graphql
+answers the portfolio queries built by github_graphql. Point agents.py at
+it with GITHUB_API_URL and GITHUB_GRAPHQL_URL.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class GitHubStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status, payload, content_type="application/json"):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        # Conditional requests: unchanged resources get an empty 304
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified_count += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        time.sleep(server.latency)
+
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        base = f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+        if parts[:1] == ["users"] and len(parts) == 2:
+            self._send(200, {
+                "html_url": f"https://github.com/{parts[1]}", "name": parts[1].title(), "bio": "Engineer",
+                "public_repos": 12, "followers": 30, "following": 4
+            })
+        elif parts[:1] == ["users"] and parts[2:] == ["events"]:
+            self._send(200, [{"type": "PushEvent"}] * 25)
+        elif parts[:1] == ["repos"] and len(parts) == 3:
+            self._send(200, {
+                "html_url": f"https://github.com/{parts[1]}/{parts[2]}", "description": f"{parts[2]} project",
+                "stargazers_count": 7, "forks_count": 2, "language": "Python"
+            })
+        elif parts[:1] == ["repos"] and parts[3:] == ["languages"]:
+            self._send(200, {"Python": 12000, "Shell": 300})
+        elif parts[:1] == ["repos"] and parts[3:] == ["readme"]:
+            self._send(200, {"download_url": f"{base}/raw/{parts[1]}/{parts[2]}/README.md"})
+        elif parts[:1] == ["raw"]:
+            self._send(200, f"# {parts[2]}\n\nA project README.\n".encode("utf-8"), "text/plain")
+        else:
+            self._send(404, {"message": "Not Found"})
+
+
+    def do_POST(self):
+        """GraphQL endpoint answering the aliases built by github_graphql.build_query()"""
+        server = self.server
+        with server.lock:
+            server.request_count += 1
+        time.sleep(server.latency)
+
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        variables = payload.get("variables", {})
+        readme = {"readme": {"text": "# Project\n\nA project README.\n"}, "readmeLower": None}
+        data = {}
+        for key, value in variables.items():
+            if key.startswith("login"):
+                i = key[len("login"):]
+                data[f"p{i}"] = {
+                    "url": f"https://github.com/{value}", "name": value.title(), "bio": "Engineer",
+                    "repositories": {"totalCount": 12}, "followers": {"totalCount": 30},
+                    "following": {"totalCount": 4},
+                    "contributionsCollection": {"contributionCalendar": {"totalContributions": 25}}
+                }
+                data[f"pr{i}"] = readme
+            elif key.startswith("owner"):
+                i = key[len("owner"):]
+                owner, name = value, variables[f"name{i}"]
+                data[f"r{i}"] = {
+                    "url": f"https://github.com/{owner}/{name}", "description": f"{name} project",
+                    "stargazerCount": 7, "forkCount": 2, "primaryLanguage": {"name": "Python"},
+                    "languages": {"nodes": [{"name": "Python"}, {"name": "Shell"}]}, **readme
+                }
+        self._send(200, {"data": data})
+
+
+def start_stub(latency=0.05, port=0):
+    """Start the stub server in a background thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), GitHubStubHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.request_count = 0
+    server.not_modified_count = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
@@ -0,0 +1,378 @@
+"""
+Bulk resume ingestion from a directory, a zip archive or single PDFs.
+
+Job fairs and agencies deliver resumes by the hundred. Files are read one
+at a time (zip members straight from the archive, never unpacked to
+disk), and at most a few PDFs are held in memory while the worker threads
+extract and score them through the same extraction cache and
+score_resume() path as /submit-resume. Candidate rows are inserted in
+batched transactions, and every file gets a line in the result report:
+
+    python bulk_ingest.py <job_id> <directory|archive.zip|file.pdf>... [--report report.json]
+
+Bulk applications carry no form data, so the candidate's email (required,
+it is unique per candidate) and name are read from the resume itself.
+Emails are normalized like /submit-resume's, and each resume is saved
+under a name of its own, so an ingest never overwrites the file of an
+applicant who applied through the form.
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+
+import metrics
+from models import SessionLocal, create_tables, Candidate, JobDetails
+from file_storage import delete_file, save_file_bytes
+from extraction_cache import extract_with_cache
+from pdf_extraction import PDF_MAX_BYTES
+from job_profile import get_profile
+from job_stats import record_candidates
+from pipeline import normalize_email, notify_candidate
+from rescore import RESCORE_WORKERS, score_in_batch
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Resumes extracted and scored concurrently
+BULK_INGEST_WORKERS = int(os.getenv("BULK_INGEST_WORKERS", str(RESCORE_WORKERS)))
+# Candidates inserted per transaction
+BULK_INGEST_BATCH_SIZE = int(os.getenv("BULK_INGEST_BATCH_SIZE", "50"))
+# How long a finished API ingest's report stays available from GET /bulk-ingest/{id}
+BULK_INGEST_RETENTION_SECONDS = float(os.getenv("BULK_INGEST_RETENTION_SECONDS", "3600"))
+
+STATUS_INGESTED = "ingested"
+STATUS_DUPLICATE = "duplicate"
+STATUS_FAILED = "failed"
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+# A name line: two to four words of letters, e.g. "Jane O'Neil" or "Ana-Maria Lopez"
+NAME_PATTERN = re.compile(r"^[^\W\d_][^\W\d_.'-]*(?:[ .'-]+[^\W\d_]+){1,3}\.?$")
+# How many non-empty lines at the top of a resume are searched for the name
+NAME_SEARCH_LINES = 5
+
+# Bulk ingests started through the API in this process, by id
+_ingests = {}
+_ingests_lock = threading.Lock()
+
+
+def iter_pdfs(path):
+    """
+    Yield (name, read) for every PDF under `path`, which may be a directory,
+    a zip archive or a single PDF. `read()` returns the file's bytes, or
+    raises ValueError if the file is over PDF_MAX_BYTES.
+    """
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for file_name in sorted(files):
+                if file_name.lower().endswith(".pdf"):
+                    full_path = os.path.join(root, file_name)
+                    yield os.path.relpath(full_path, path), lambda full_path=full_path: _read_file(full_path)
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not info.filename.lower().endswith(".pdf") or info.filename.startswith("__MACOSX/"):
+                    continue
+                yield info.filename, lambda info=info: _read_member(archive, info)
+    else:
+        yield os.path.basename(path), lambda: _read_file(path)
+
+
+def _read_file(path):
+    if os.path.getsize(path) > PDF_MAX_BYTES:
+        raise ValueError(f"File is over the {PDF_MAX_BYTES} byte limit")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _read_member(archive, info):
+    # Checked before decompressing, so an oversized (or malicious) member is never read
+    if info.file_size > PDF_MAX_BYTES:
+        raise ValueError(f"File is over the {PDF_MAX_BYTES} byte limit")
+    return archive.read(info)
+
+
+def find_contact(text_content, file_name):
+    """(name, email) of the applicant; the name falls back to the file name"""
+    match = EMAIL_PATTERN.search(text_content)
+    email = normalize_email(match.group(0)) if match else None
+
+    # The name is normally the first line of the header, before the contact details
+    name = None
+    header = [line.strip() for line in text_content.splitlines() if line.strip()][:NAME_SEARCH_LINES]
+    for line in header:
+        if EMAIL_PATTERN.search(line):
+            break
+        if NAME_PATTERN.match(line) and "resume" not in line.lower() and "curriculum" not in line.lower():
+            name = line.rstrip(".")
+            break
+    if name is None:
+        name = re.sub(r"[_\-]+", " ", os.path.splitext(os.path.basename(file_name))[0]).strip().title()
+    return name, email
+
+
+class BulkIngest:
+    """One ingest of many resumes into a job; `report` fills in as files complete"""
+
+    def __init__(self, job_id, workers=BULK_INGEST_WORKERS, batch_size=BULK_INGEST_BATCH_SIZE, notify=False):
+        self.id = uuid.uuid4().hex
+        self.job_id = job_id
+        self.workers = workers
+        self.batch_size = batch_size
+        self.notify = notify
+        self.status = "running"
+        self.report = []
+        self.elapsed_seconds = 0.0
+        self.finished_at = None  # Unix time the run ended, for pruning
+        self._started = None
+        self._claimed_emails = set()
+        self._claim_lock = threading.Lock()
+
+    def run(self, paths):
+        """Ingest every PDF under `paths`; returns the summary with the per-file report"""
+        db = SessionLocal()
+        self._started = time.perf_counter()
+        try:
+            job = db.query(JobDetails).filter(JobDetails.job_id == self.job_id).first()
+            if not job:
+                raise ValueError(f"Job with ID {self.job_id} not found")
+            # Workers read the job while this session commits batches, which would expire it
+            db.expunge(job)
+            job_description = get_profile(job).description
+
+            pending = []
+            in_flight = deque()
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="ingest") as executor:
+                for path in paths:
+                    for file_name, read in iter_pdfs(path):
+                        # Bytes are read here, one file at a time, and only a bounded number wait in the pool
+                        if len(in_flight) >= self.workers * 2:
+                            self._collect(db, job, in_flight.popleft(), pending)
+                        try:
+                            pdf_content = read()
+                        except Exception as e:
+                            self._record(self._entry(file_name, STATUS_FAILED, error=str(e)))
+                            continue
+                        in_flight.append((
+                            file_name, executor.submit(self._prepare, file_name, pdf_content, job, job_description)
+                        ))
+                while in_flight:
+                    self._collect(db, job, in_flight.popleft(), pending)
+            self._insert(db, job, pending)
+            self.status = "completed"
+        except Exception as e:
+            self.status = "failed"
+            logger.error(f"Bulk ingest {self.id} failed: {str(e)}")
+            raise
+        finally:
+            self.elapsed_seconds = time.perf_counter() - self._started
+            self.finished_at = time.time()
+            db.close()
+        return self.summary()
+
+    def _prepare(self, file_name, pdf_content, job, job_description):
+        """Worker: extract and score one file; returns (candidate, scores) or a finished report entry"""
+        try:
+            text_content, links = extract_with_cache(pdf_content)
+            name, email = find_contact(text_content, file_name)
+            if not email:
+                return self._entry(file_name, STATUS_FAILED, error="No email address found in the resume")
+            if not self._claim_email(email):
+                return self._entry(file_name, STATUS_DUPLICATE, email=email)
+
+            scoring_result = score_in_batch(text_content, links, job, job_description)
+            # /submit-resume stores "<email>_resume.pdf"; a name of our own keeps its file intact
+            _, resume_url = save_file_bytes(pdf_content, f"{email}_{uuid.uuid4().hex[:12]}_resume.pdf")
+            candidate = Candidate(
+                job_id=job.job_id,
+                user_name=name,
+                user_email=email,
+                resume_url=resume_url,
+                parameter_score=scoring_result["Parameter Score"],
+                job_similarity_score=scoring_result["Job Similarity Score"],
+                github_score=scoring_result["GitHub Score"],
+                total_score=scoring_result["Total Score"]
+            )
+            return candidate, scoring_result
+        except Exception as e:
+            logger.error(f"Failed to ingest {file_name}: {str(e)}")
+            return self._entry(file_name, STATUS_FAILED, error=str(e))
+
+    def _claim_email(self, email):
+        """False if this email was already seen in this ingest or is stored for any job"""
+        with self._claim_lock:
+            if email in self._claimed_emails:
+                return False
+            self._claimed_emails.add(email)
+        db = SessionLocal()
+        try:
+            # Rows stored before emails were normalized may differ in case
+            return db.query(Candidate.id).filter(func.lower(Candidate.user_email) == email).first() is None
+        finally:
+            db.close()
+
+    def _collect(self, db, job, item, pending):
+        file_name, future = item
+        result = future.result()
+        if isinstance(result, dict):
+            self._record(result)
+            return
+        pending.append((file_name, *result))
+        if len(pending) >= self.batch_size:
+            self._insert(db, job, pending)
+
+    def _insert(self, db, job, pending):
+        """Insert a batch of candidates in one transaction (row by row if that hits a duplicate)"""
+        if not pending:
+            return
+        stored = []
+        try:
+            db.add_all(candidate for _, candidate, _ in pending)
+            db.flush()
+            record_candidates(db, [candidate for _, candidate, _ in pending])
+            stored = [self._stored_entry(item) for item in pending]
+            db.commit()
+        except IntegrityError:
+            # Someone registered one of these emails meanwhile; find out which
+            db.rollback()
+            stored = []
+            for item in pending:
+                file_name, candidate, _ = item
+                try:
+                    db.add(candidate)
+                    db.flush()
+                    record_candidates(db, [candidate])
+                    entry = self._stored_entry(item)
+                    db.commit()
+                    stored.append(entry)
+                except IntegrityError:
+                    db.rollback()
+                    delete_file(candidate.resume_url)
+                    self._record(self._entry(file_name, STATUS_DUPLICATE, email=candidate.user_email))
+
+        for entry, name, scoring_result in stored:
+            self._record(entry)
+            if self.notify:
+                notify_candidate(name, entry["email"], job.job_title, scoring_result)
+        metrics.increment("bulk_ingest.batches")
+        pending.clear()
+
+    def _stored_entry(self, item):
+        """(report entry, name, scores) of a flushed candidate, read before commit expires it"""
+        file_name, candidate, scoring_result = item
+        entry = self._entry(
+            file_name, STATUS_INGESTED, email=candidate.user_email, candidate_id=candidate.id,
+            total_score=candidate.total_score
+        )
+        return entry, candidate.user_name, scoring_result
+
+    @staticmethod
+    def _entry(file_name, status, email=None, candidate_id=None, total_score=None, error=None):
+        return {
+            "file": file_name,
+            "status": status,
+            "email": email,
+            "candidate_id": candidate_id,
+            "total_score": total_score,
+            "error": error
+        }
+
+    def _record(self, entry):
+        self.report.append(entry)
+        metrics.increment(f"bulk_ingest.{entry['status']}")
+
+    def summary(self):
+        """Counts per status, throughput so far and the per-file report"""
+        counts = {status: 0 for status in (STATUS_INGESTED, STATUS_DUPLICATE, STATUS_FAILED)}
+        for entry in list(self.report):
+            counts[entry["status"]] += 1
+        elapsed = self.elapsed_seconds
+        if self.status == "running" and self._started is not None:
+            elapsed = time.perf_counter() - self._started
+        return {
+            "ingest_id": self.id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "files": len(self.report),
+            **counts,
+            "resumes_per_minute": round(len(self.report) / elapsed * 60, 2) if elapsed else 0.0,
+            "report": list(self.report)
+        }
+
+
+def start_ingest(job_id, paths, notify=False, temp_dir=None):
+    """
+    Run a BulkIngest on a background thread (for the API) and return it.
+    `temp_dir` (holding the uploaded files) is deleted once it finishes.
+    """
+    ingest = BulkIngest(job_id, notify=notify)
+    with _ingests_lock:
+        _prune_ingests()
+        _ingests[ingest.id] = ingest
+
+    def run():
+        try:
+            ingest.run(paths)
+        except Exception:
+            pass  # Logged and reflected in ingest.status
+        finally:
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+
+    threading.Thread(target=run, name=f"ingest-{ingest.id[:8]}", daemon=True).start()
+    return ingest
+
+
+def _prune_ingests():
+    """Forget ingests that finished over BULK_INGEST_RETENTION_SECONDS ago; call with _ingests_lock held"""
+    expired_before = time.time() - BULK_INGEST_RETENTION_SECONDS
+    for ingest_id in [key for key, ingest in _ingests.items()
+                      if ingest.finished_at is not None and ingest.finished_at < expired_before]:
+        del _ingests[ingest_id]
+
+
+def get_ingest(ingest_id):
+    with _ingests_lock:
+        _prune_ingests()
+        return _ingests.get(ingest_id)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score and store a batch of resumes for a job")
+    parser.add_argument("job_id", type=int)
+    parser.add_argument("paths", nargs="+", help="directories, zip archives or PDF files")
+    parser.add_argument("--workers", type=int, default=BULK_INGEST_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=BULK_INGEST_BATCH_SIZE)
+    parser.add_argument("--notify", action="store_true", help="email every candidate their result")
+    parser.add_argument("--report", help="write the per-file report to this JSON file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    ingest = BulkIngest(args.job_id, workers=args.workers, batch_size=args.batch_size, notify=args.notify)
+    summary = ingest.run(args.paths)
+
+    for entry in summary["report"]:
+        detail = entry["error"] or entry["email"]
+        print(f"{entry['status']:<10} {entry['file']}  {detail}")
+    print(f"\n{summary['ingested']} ingested, {summary['duplicate']} duplicates, {summary['failed']} failed "
+          f"({summary['resumes_per_minute']} resumes/minute)")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(summary, f, indent=2)
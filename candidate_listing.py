@@ -0,0 +1,179 @@
+"""
+Keyset-paginated candidate listing for GET /candidates.
+
+Pages are ordered by (sort column, id) and continue from an opaque cursor
+holding the last row's sort value and id, so fetching page N costs the
+same as fetching page 1 instead of growing with an OFFSET. Only the
+requested columns are selected, and rows are returned as plain dicts
+without building ORM objects. The API uses list_candidates_async() so
+the query doesn't block the event loop.
+
+created_at is nullable, and a row comparison never matches NULL, so rows
+without one are listed after all the others in either order, by id. They
+are read by a second query once the dated rows run out. Each query still
+walks an index, on SQLite and PostgreSQL alike, which disagree on where
+ORDER BY puts NULLs.
+"""
+
+import base64
+import json
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import select, tuple_
+
+from models import Candidate
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Page size when the client doesn't ask for one, and the largest page served
+CANDIDATES_PAGE_SIZE = int(os.getenv("CANDIDATES_PAGE_SIZE", "50"))
+CANDIDATES_MAX_PAGE_SIZE = int(os.getenv("CANDIDATES_MAX_PAGE_SIZE", "500"))
+
+# Fields a client may select, in Candidate.to_dict() order
+CANDIDATE_FIELDS = (
+    "id", "job_id", "user_name", "user_email", "resume_url", "parameter_score",
+    "job_similarity_score", "github_score", "total_score", "created_at"
+)
+SORT_FIELDS = ("created_at", "total_score")
+
+
+class CursorError(ValueError):
+    """Raised for a malformed cursor or one issued for a different sort order"""
+
+
+def encode_cursor(sort, order, value, candidate_id):
+    """Opaque cursor pointing just past the row with this sort value and id"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort, order, value, candidate_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, sort, order):
+    """(sort value, id) of a cursor from encode_cursor() for the same sort and order"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, candidate_id = json.loads(base64.urlsafe_b64decode(padded))
+        if value is None:
+            pass  # The page ended among the rows without a sort value
+        elif sort == "created_at":
+            value = datetime.fromisoformat(value)
+        else:
+            value = float(value)
+        candidate_id = int(candidate_id)
+    except (ValueError, TypeError) as e:
+        raise CursorError(f"Invalid cursor: {str(e)}")
+    if (cursor_sort, cursor_order) != (sort, order):
+        raise CursorError("Cursor was issued for a different sort order")
+    return value, candidate_id
+
+
+def parse_fields(fields):
+    """Validated list of fields from a comma-separated `fields` parameter (None selects all)"""
+    if not fields:
+        return list(CANDIDATE_FIELDS)
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in CANDIDATE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(CANDIDATE_FIELDS)}")
+    return selected
+
+
+def _page_statements(limit, cursor, job_id, min_score, max_score, created_after, created_before, sort, order,
+                     fields):
+    """
+    (SELECT statements, selected fields, page size) for one page. The page
+    is the first rows of the statements' results, taken in turn.
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort by {sort}. Allowed: {', '.join(SORT_FIELDS)}")
+    limit = min(max(limit or CANDIDATES_PAGE_SIZE, 1), CANDIDATES_MAX_PAGE_SIZE)
+    selected = parse_fields(fields)
+    sort_column = getattr(Candidate, sort)
+
+    # The sort value and id are always fetched to build the next cursor
+    columns = [getattr(Candidate, field) for field in selected]
+    columns += [sort_column.label("_sort"), Candidate.id.label("_id")]
+    statement = select(*columns)
+
+    if job_id is not None:
+        statement = statement.where(Candidate.job_id == job_id)
+    if min_score is not None:
+        statement = statement.where(Candidate.total_score >= min_score)
+    if max_score is not None:
+        statement = statement.where(Candidate.total_score <= max_score)
+    if created_after is not None:
+        statement = statement.where(Candidate.created_at >= created_after)
+    if created_before is not None:
+        statement = statement.where(Candidate.created_at <= created_before)
+
+    value, candidate_id = decode_cursor(cursor, sort, order) if cursor else (None, None)
+    id_order = Candidate.id.desc() if order == "desc" else Candidate.id.asc()
+
+    # Rows without a sort value, listed last
+    undated = statement.where(sort_column.is_(None)).order_by(id_order)
+    if cursor and value is None:
+        past_id = Candidate.id < candidate_id if order == "desc" else Candidate.id > candidate_id
+        return [undated.where(past_id)], selected, limit
+
+    dated = statement.where(sort_column.isnot(None)) if sort_column.nullable else statement
+    if cursor:
+        key = tuple_(sort_column, Candidate.id)
+        dated = dated.where(key < tuple_(value, candidate_id) if order == "desc" else key > tuple_(value, candidate_id))
+    dated = dated.order_by(sort_column.desc() if order == "desc" else sort_column.asc(), id_order)
+
+    return ([dated, undated] if sort_column.nullable else [dated]), selected, limit
+
+
+def _page(rows, selected, limit, sort, order):
+    """Response for the fetched rows; `rows` holds one extra row if there is a next page"""
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(sort, order, rows[-1]._sort, rows[-1]._id)
+
+    items = []
+    for row in rows:
+        item = {field: getattr(row, field) for field in selected}
+        if "created_at" in item and item["created_at"] is not None:
+            item["created_at"] = item["created_at"].isoformat()
+        items.append(item)
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def list_candidates(db, limit=None, cursor=None, job_id=None, min_score=None, max_score=None,
+                    created_after=None, created_before=None, sort="created_at", order="desc", fields=None):
+    """
+    One page of candidates as {"items": [...], "next_cursor": str or None}.
+
+    Filters combine with AND; `min_score`/`max_score` bound total_score
+    and `created_after`/`created_before` bound created_at (inclusive).
+    """
+    statements, selected, limit = _page_statements(
+        limit, cursor, job_id, min_score, max_score, created_after, created_before, sort, order, fields
+    )
+    rows = []
+    for statement in statements:
+        # One extra row tells whether there is a next page
+        rows += db.execute(statement.limit(limit + 1 - len(rows))).all()
+        if len(rows) > limit:
+            break
+    return _page(rows, selected, limit, sort, order)
+
+
+async def list_candidates_async(db, limit=None, cursor=None, job_id=None, min_score=None, max_score=None,
+                                created_after=None, created_before=None, sort="created_at", order="desc",
+                                fields=None):
+    """list_candidates() on an AsyncSession"""
+    statements, selected, limit = _page_statements(
+        limit, cursor, job_id, min_score, max_score, created_after, created_before, sort, order, fields
+    )
+    rows = []
+    for statement in statements:
+        rows += (await db.execute(statement.limit(limit + 1 - len(rows)))).all()
+        if len(rows) > limit:
+            break
+    return _page(rows, selected, limit, sort, order)
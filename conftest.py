@@ -0,0 +1,18 @@
+"""
+Test configuration.
+
+Point the application at a throwaway SQLite database before any test
+module imports `models`, whose engines are created at import time, so the
+suite never opens (or switches to WAL mode) the checked-in
+database/resume_scorer.db.
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# load_dotenv() doesn't override variables that are already set, so this wins over a .env file
+_test_database_dir = tempfile.mkdtemp(prefix="resume-scorer-tests-")
+atexit.register(shutil.rmtree, _test_database_dir, ignore_errors=True)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_test_database_dir, 'resume_scorer.db')}"
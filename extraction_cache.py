@@ -0,0 +1,153 @@
+"""
+Content-addressed cache of PDF extraction results.
+
+Candidates re-upload the same PDF to several jobs and after failed
+attempts. The SHA-256 of the uploaded bytes keys the `extraction_cache`
+table, so a repeat upload skips fitz.open entirely. The table is bounded by
+EXTRACTION_CACHE_MAX_BYTES and evicts least recently used entries.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+
+import metrics
+from models import SessionLocal, ExtractionCache
+from pdf_extraction import check_pdf_size, extract_pdf_content, extract_pdf_content_async
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the extracted text and links kept in the cache
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def pdf_digest(pdf_content):
+    """SHA-256 hex digest of the uploaded PDF bytes"""
+    return hashlib.sha256(pdf_content).hexdigest()
+
+
+def get_cached_extraction(digest):
+    """Return (text, links) for a digest, or None on a miss"""
+    metrics.increment("extraction_cache.lookups")
+    db = SessionLocal()
+    try:
+        entry = db.query(ExtractionCache).filter(ExtractionCache.sha256 == digest).first()
+        if entry is None:
+            metrics.increment("extraction_cache.misses")
+            return None
+
+        cached = entry.text_content, json.loads(entry.links)
+        metrics.increment("extraction_cache.hits")
+        try:
+            entry.hit_count += 1
+            entry.last_used_at = datetime.utcnow()
+            db.commit()
+        except Exception as e:
+            # Recency bookkeeping only steers eviction; a locked database must not fail the submission
+            db.rollback()
+            logger.error(f"Failed to record extraction cache hit {digest[:12]}: {str(e)}")
+        return cached
+    finally:
+        db.close()
+
+
+def store_extraction(digest, text_content, links):
+    """Cache an extraction result, then evict old entries if over budget"""
+    links_json = json.dumps(links)
+    size_bytes = len(text_content.encode("utf-8")) + len(links_json)
+    if size_bytes > EXTRACTION_CACHE_MAX_BYTES:
+        return
+
+    db = SessionLocal()
+    try:
+        db.merge(ExtractionCache(
+            sha256=digest,
+            text_content=text_content,
+            links=links_json,
+            size_bytes=size_bytes,
+            last_used_at=datetime.utcnow()
+        ))
+        db.commit()
+        _evict(db)
+    except Exception as e:
+        # A failed cache write must never fail the submission
+        db.rollback()
+        logger.error(f"Failed to cache extraction {digest[:12]}: {str(e)}")
+    finally:
+        db.close()
+
+
+def _evict(db):
+    """Delete least recently used entries until the cache fits its byte budget"""
+    total_bytes, entries = db.query(
+        func.coalesce(func.sum(ExtractionCache.size_bytes), 0), func.count(ExtractionCache.sha256)
+    ).one()
+
+    if total_bytes > EXTRACTION_CACHE_MAX_BYTES:
+        excess = total_bytes - EXTRACTION_CACHE_MAX_BYTES
+        victims = []
+        for digest, size_bytes in (
+            db.query(ExtractionCache.sha256, ExtractionCache.size_bytes)
+            .order_by(ExtractionCache.last_used_at)
+            .yield_per(100)
+        ):
+            victims.append(digest)
+            excess -= size_bytes
+            if excess <= 0:
+                break
+
+        db.query(ExtractionCache).filter(ExtractionCache.sha256.in_(victims)).delete(synchronize_session=False)
+        db.commit()
+        metrics.increment("extraction_cache.evictions", len(victims))
+        total_bytes, entries = db.query(
+            func.coalesce(func.sum(ExtractionCache.size_bytes), 0), func.count(ExtractionCache.sha256)
+        ).one()
+
+    metrics.set_gauge("extraction_cache.bytes", total_bytes)
+    metrics.set_gauge("extraction_cache.entries", entries)
+
+
+def extract_with_cache(pdf_content):
+    """extract_pdf_content() that reuses the result for previously seen PDFs"""
+    check_pdf_size(pdf_content)
+    digest = pdf_digest(pdf_content)
+    cached = get_cached_extraction(digest)
+    if cached is not None:
+        return cached
+
+    text_content, links = extract_pdf_content(pdf_content)
+    store_extraction(digest, text_content, links)
+    return text_content, links
+
+
+async def extract_with_cache_async(pdf_content):
+    """Async variant for request handlers; DB access runs off the event loop"""
+    check_pdf_size(pdf_content)
+    digest = pdf_digest(pdf_content)
+    cached = await asyncio.to_thread(get_cached_extraction, digest)
+    if cached is not None:
+        return cached
+
+    text_content, links = await extract_pdf_content_async(pdf_content)
+    await asyncio.to_thread(store_extraction, digest, text_content, links)
+    return text_content, links
+
+
+def cache_stats():
+    """Hit/miss counters and current size of the extraction cache"""
+    return {
+        "hits": metrics.get_counter("extraction_cache.hits"),
+        "misses": metrics.get_counter("extraction_cache.misses"),
+        "hit_rate": metrics.ratio("extraction_cache.hits", "extraction_cache.lookups"),
+        "evictions": metrics.get_counter("extraction_cache.evictions"),
+        "max_bytes": EXTRACTION_CACHE_MAX_BYTES
+    }
@@ -41,6 +41,25 @@ async def save_upload_file(upload_file: UploadFile, filename: Optional[str] = No
     
     return file_path, file_url
 
+def save_file_bytes(content: bytes, filename: str) -> Tuple[str, str]:
+    """
+    Save file contents that did not arrive as an upload (e.g. read from a zip archive)
+
+    Args:
+        content: The file contents
+        filename: The filename to store it under
+
+    Returns:
+        Tuple of (file_path, file_url)
+    """
+    safe_filename = os.path.basename(filename)
+    file_path = os.path.join(UPLOAD_DIR, safe_filename)
+
+    with open(file_path, "wb") as buffer:
+        buffer.write(content)
+
+    return file_path, f"/uploads/{safe_filename}"
+
 def get_file_path(file_url: str) -> str:
     """
     Convert a file URL to a local file path
@@ -54,6 +73,22 @@ def get_file_path(file_url: str) -> str:
     filename = os.path.basename(file_url)
     return os.path.join(UPLOAD_DIR, filename)
 
+def delete_file(file_url: str) -> bool:
+    """
+    Delete a file from the local storage
+
+    Args:
+        file_url: The file URL
+
+    Returns:
+        True if the file was deleted, False if it did not exist
+    """
+    try:
+        os.remove(get_file_path(file_url))
+        return True
+    except FileNotFoundError:
+        return False
+
 def file_exists(file_url: str) -> bool:
     """
     Check if a file exists in the local storage
@@ -5,7 +5,9 @@ import { FileText, GitBranch, Percent, Star, ExternalLink } from 'lucide-react';
 import { Briefcase } from 'lucide-react';
 import { toast } from 'sonner';
 import Link from 'next/link';
-import { getCandidates, getDownloadUrl } from '@/lib/api';
+import { getCandidates, getDownloadUrl, CandidateQuery } from '@/lib/api';
+
+const PAGE_SIZE = 50;
 
 interface Candidate {
   id: number;
@@ -36,16 +38,34 @@ const ScoreCard = ({ icon, title, score, colorClass }: {
 
 export default function AdminDashboard() {
   const [candidates, setCandidates] = useState<Candidate[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [jobId, setJobId] = useState('');
+  const [minScore, setMinScore] = useState('');
+  const [sort, setSort] = useState<'created_at' | 'total_score'>('created_at');
   const [isAuthenticated, setIsAuthenticated] = useState(true); // No Supabase auth, so we'll just set this to true
 
+  // Filters and sort are applied by the backend; pages are fetched with its cursor
+  const buildQuery = (cursor: string | null = null): CandidateQuery => ({
+    limit: PAGE_SIZE,
+    cursor,
+    job_id: jobId ? Number(jobId) : undefined,
+    min_score: minScore ? Number(minScore) : undefined,
+    sort,
+    order: 'desc',
+  });
+
   useEffect(() => {
+    // Responses for filters that changed again while in flight are dropped
+    let ignore = false;
+
     async function fetchCandidates() {
       try {
-        setLoading(true);
-        const data = await getCandidates();
-        console.log('Fetched data:', data);
-        setCandidates(data || []);
+        const page = await getCandidates<Candidate>(buildQuery());
+        if (ignore) return;
+        setCandidates(page.items);
+        setNextCursor(page.next_cursor);
         setLoading(false);
       } catch (error) {
         console.error('Error in fetchCandidates:', error);
@@ -55,7 +75,25 @@ export default function AdminDashboard() {
     }
 
     fetchCandidates();
-  }, []);
+    return () => {
+      ignore = true;
+    };
+  }, [jobId, minScore, sort]);
+
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    try {
+      setLoadingMore(true);
+      const page = await getCandidates<Candidate>(buildQuery(nextCursor));
+      setCandidates((current) => [...current, ...page.items]);
+      setNextCursor(page.next_cursor);
+    } catch (error) {
+      console.error('Error in loadMore:', error);
+      toast.error('Failed to fetch more candidates');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   const handleLogout = async () => {
     try {
@@ -90,8 +128,10 @@ export default function AdminDashboard() {
           </div>
           <div className="flex flex-col sm:flex-row gap-4 sm:gap-6 items-start sm:items-center w-full lg:w-auto">
             <div className="bg-primary/10 rounded-2xl p-4 sm:p-6 shadow-inner w-full sm:w-auto">
-              <p className="text-sm text-primary/70 font-medium">Total Applications</p>
-              <p className="text-3xl sm:text-4xl font-bold text-primary mt-1">{candidates.length}</p>
+              <p className="text-sm text-primary/70 font-medium">Applications Shown</p>
+              <p className="text-3xl sm:text-4xl font-bold text-primary mt-1">
+                {candidates.length}{nextCursor ? '+' : ''}
+              </p>
             </div>
             <div className="flex flex-row sm:flex-col gap-3 w-full sm:w-auto">
               <Link
@@ -112,6 +152,44 @@ export default function AdminDashboard() {
           </div>
         </div>
 
+        {/* Filters */}
+        <div className="flex flex-col sm:flex-row gap-4 mb-6 bg-card rounded-xl p-4 shadow-md border border-border/50">
+          <label className="flex flex-col gap-1 text-sm text-muted-foreground">
+            Job ID
+            <input
+              type="number"
+              min={1}
+              value={jobId}
+              onChange={(e) => setJobId(e.target.value)}
+              placeholder="All jobs"
+              className="bg-background border border-border rounded-lg px-3 py-2 text-card-foreground"
+            />
+          </label>
+          <label className="flex flex-col gap-1 text-sm text-muted-foreground">
+            Minimum total score
+            <input
+              type="number"
+              min={0}
+              max={100}
+              value={minScore}
+              onChange={(e) => setMinScore(e.target.value)}
+              placeholder="Any"
+              className="bg-background border border-border rounded-lg px-3 py-2 text-card-foreground"
+            />
+          </label>
+          <label className="flex flex-col gap-1 text-sm text-muted-foreground">
+            Sort by
+            <select
+              value={sort}
+              onChange={(e) => setSort(e.target.value as 'created_at' | 'total_score')}
+              className="bg-background border border-border rounded-lg px-3 py-2 text-card-foreground"
+            >
+              <option value="created_at">Newest first</option>
+              <option value="total_score">Highest score first</option>
+            </select>
+          </label>
+        </div>
+
         {/* Candidates Grid */}
         <div className="grid gap-4 sm:gap-6">
           {candidates.map((candidate) => (
@@ -205,6 +283,18 @@ export default function AdminDashboard() {
             </div>
           ))}
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center mt-8">
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              className="bg-primary/90 text-primary-foreground px-6 py-2.5 rounded-lg hover:bg-primary/80 transition-all duration-200 shadow-md disabled:opacity-60"
+            >
+              {loadingMore ? 'Loading...' : 'Load more'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -4,10 +4,21 @@ import { useState, useEffect } from 'react';
 import { useParams, useRouter } from 'next/navigation';
 import { Loader2, CheckCircle2, ArrowLeft, Briefcase, Code, GraduationCap, Clock, Plus } from 'lucide-react';
 import Link from 'next/link';
-import { getJob, submitResume } from '@/lib/api';
+import { getJob, getSubmission, submitResume } from '@/lib/api';
 
 const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
+// How often a queued submission's status is polled
+const SUBMISSION_POLL_MS = 3000;
+
+const STAGE_LABELS: Record<string, string> = {
+  queued: 'Waiting in the queue',
+  extracting: 'Reading your resume',
+  scoring: 'Evaluating your resume',
+  storing: 'Saving your application',
+  notifying: 'Sending your confirmation email',
+};
+
 interface JobDetails {
   job_title: string;
   job_details: string;
@@ -24,6 +35,9 @@ export default function ApplyPage() {
   const [loading, setLoading] = useState(true);
   const [loadingSubmit, setLoadingSubmit] = useState(false);
   const [submitted, setSubmitted] = useState(false);
+  // Set while a submission queued by the backend (SUBMISSION_MODE=async) is being processed
+  const [submissionId, setSubmissionId] = useState<number | null>(null);
+  const [stage, setStage] = useState<string | null>(null);
   const [formData, setFormData] = useState({
     name: '',
     email: '',
@@ -59,6 +73,41 @@ export default function ApplyPage() {
     fetchJob();
   }, [params.id, router]);
 
+  useEffect(() => {
+    if (submissionId === null) return;
+
+    let cancelled = false;
+    let timer: ReturnType<typeof setTimeout>;
+
+    async function poll() {
+      try {
+        const submission = await getSubmission(submissionId as number);
+        if (cancelled) return;
+        if (submission.stage === 'completed') {
+          setSubmissionId(null);
+          setSubmitted(true);
+          return;
+        }
+        if (submission.stage === 'failed') {
+          setSubmissionId(null);
+          alert('We could not process your resume. Please try again.');
+          return;
+        }
+        setStage(submission.stage);
+      } catch (error) {
+        // Keep polling through transient network errors
+        console.error('Error fetching submission status:', error);
+      }
+      timer = setTimeout(poll, SUBMISSION_POLL_MS);
+    }
+
+    poll();
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [submissionId]);
+
   const validateForm = () => {
     let valid = true;
     const errors = {
@@ -118,6 +167,12 @@ export default function ApplyPage() {
         throw new Error(response.error);
       }
 
+      if (response.submission_id !== undefined) {
+        // Queued for evaluation: follow it until the backend finishes
+        setStage(response.stage);
+        setSubmissionId(response.submission_id);
+        return;
+      }
       setSubmitted(true);
     } catch (error) {
       console.error('Error submitting resume:', error);
@@ -146,6 +201,24 @@ export default function ApplyPage() {
     );
   }
 
+  if (submissionId !== null) {
+    return (
+      <div className="min-h-screen bg-gradient-to-b from-background to-secondary py-12 flex items-center justify-center">
+        <div className="max-w-2xl mx-auto px-4">
+          <div className="bg-card rounded-lg shadow-lg p-8 text-center">
+            <div className="flex justify-center mb-4">
+              <Loader2 className="h-16 w-16 text-primary animate-spin" />
+            </div>
+            <h1 className="text-3xl font-bold text-card-foreground mb-4">Processing Your Application</h1>
+            <p className="text-muted-foreground">
+              {STAGE_LABELS[stage ?? 'queued'] ?? 'Processing'}... You can leave this page; we will email you the result.
+            </p>
+          </div>
+        </div>
+      </div>
+    );
+  }
+
   if (submitted) {
     return (
       <div className="min-h-screen bg-gradient-to-b from-background to-secondary py-12 flex items-center justify-center">
@@ -31,11 +31,35 @@ export async function getJob(jobId: number) {
   return response.json();
 }
 
+export interface CandidateQuery {
+  limit?: number;
+  cursor?: string | null;
+  job_id?: number;
+  min_score?: number;
+  max_score?: number;
+  created_after?: string;
+  created_before?: string;
+  sort?: 'created_at' | 'total_score';
+  order?: 'desc' | 'asc';
+  fields?: string[];
+}
+
+export interface CandidatePage<T> {
+  items: T[];
+  next_cursor: string | null;
+}
+
 /**
- * Get all candidates
+ * Get one page of candidates; pass the returned next_cursor as `cursor` for the next page
  */
-export async function getCandidates() {
-  const response = await fetch(`${API_BASE_URL}/candidates`);
+export async function getCandidates<T = Record<string, unknown>>(query: CandidateQuery = {}): Promise<CandidatePage<T>> {
+  const params = new URLSearchParams();
+  Object.entries(query).forEach(([key, value]) => {
+    if (value === undefined || value === null || value === '') return;
+    params.set(key, Array.isArray(value) ? value.join(',') : String(value));
+  });
+
+  const response = await fetch(`${API_BASE_URL}/candidates?${params.toString()}`);
   
   if (!response.ok) {
     throw new Error(`Error fetching candidates: ${response.statusText}`);
@@ -60,6 +84,19 @@ export async function submitResume(formData: FormData) {
   return response.json();
 }
 
+/**
+ * Get the pipeline status of a queued submission
+ */
+export async function getSubmission(submissionId: number) {
+  const response = await fetch(`${API_BASE_URL}/submissions/${submissionId}`);
+  
+  if (!response.ok) {
+    throw new Error(`Error fetching submission: ${response.statusText}`);
+  }
+  
+  return response.json();
+}
+
 /**
  * Get download URL for a resume
  */
@@ -0,0 +1,189 @@
+"""
+Disk-backed cache of GitHub API responses.
+
+Responses are kept in the `github_cache` table with a per-endpoint TTL.
+Fresh entries are served without a request; stale ones are revalidated
+with If-None-Match, and a 304 reply (which GitHub does not count against
+the rate limit) refreshes the entry without downloading the body again.
+Entries not refreshed for GITHUB_CACHE_RETENTION_SECONDS are deleted, at
+most once per GITHUB_CACHE_PRUNE_INTERVAL_SECONDS, so the table only holds
+the profiles and repos that are still being scored.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+import metrics
+from models import SessionLocal, GitHubCacheEntry
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Set GITHUB_CACHE_ENABLED=false to always hit the API
+GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Seconds an entry is served without revalidation, per endpoint
+GITHUB_CACHE_TTLS = {
+    "profile": int(os.getenv("GITHUB_CACHE_TTL_PROFILE", str(6 * 3600))),
+    "repo": int(os.getenv("GITHUB_CACHE_TTL_REPO", str(6 * 3600))),
+    "languages": int(os.getenv("GITHUB_CACHE_TTL_LANGUAGES", str(24 * 3600))),
+    "readme": int(os.getenv("GITHUB_CACHE_TTL_README", str(24 * 3600))),
+    "contributions": int(os.getenv("GITHUB_CACHE_TTL_CONTRIBUTIONS", str(3600)))
+}
+
+# Stale entries are kept this long after their last fetch for ETag revalidation, then deleted
+GITHUB_CACHE_RETENTION_SECONDS = int(os.getenv("GITHUB_CACHE_RETENTION_SECONDS", str(7 * 24 * 3600)))
+# Minimum seconds between two prunes of the table
+GITHUB_CACHE_PRUNE_INTERVAL_SECONDS = int(os.getenv("GITHUB_CACHE_PRUNE_INTERVAL_SECONDS", "3600"))
+
+# Only these statuses are cached; 404s matter because most repos lack a profile README
+CACHEABLE_STATUSES = (200, 404)
+
+
+_last_prune = None  # time.monotonic() of the last prune
+_prune_lock = threading.Lock()
+
+
+class CachedResponse:
+    """The subset of requests.Response that the fetch_* helpers use"""
+
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+    def json(self):
+        return json.loads(self.text)
+
+
+def _load(url):
+    db = SessionLocal()
+    try:
+        return db.query(GitHubCacheEntry).filter(GitHubCacheEntry.url == url).first()
+    except Exception as e:
+        logger.error(f"GitHub cache lookup failed for {url}: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+
+def _save(url, endpoint, status_code, etag, body):
+    db = SessionLocal()
+    try:
+        db.merge(GitHubCacheEntry(
+            url=url,
+            endpoint=endpoint,
+            status_code=status_code,
+            etag=etag,
+            body=body,
+            fetched_at=datetime.utcnow()
+        ))
+        db.commit()
+        _prune_if_due(db)
+    except Exception as e:
+        # A failed cache write must never fail the scrape
+        db.rollback()
+        logger.error(f"Failed to cache GitHub response for {url}: {str(e)}")
+    finally:
+        db.close()
+
+
+def prune(db, now=None):
+    """Delete entries not refreshed for GITHUB_CACHE_RETENTION_SECONDS; returns how many"""
+    expired_before = (now or datetime.utcnow()) - timedelta(seconds=GITHUB_CACHE_RETENTION_SECONDS)
+    deleted = db.query(GitHubCacheEntry).filter(GitHubCacheEntry.fetched_at < expired_before).delete(
+        synchronize_session=False
+    )
+    db.commit()
+    if deleted:
+        metrics.increment("github_cache.pruned", deleted)
+    return deleted
+
+
+def _prune_if_due(db):
+    global _last_prune
+    with _prune_lock:
+        if _last_prune is not None and time.monotonic() - _last_prune < GITHUB_CACHE_PRUNE_INTERVAL_SECONDS:
+            return
+        _last_prune = time.monotonic()
+    try:
+        prune(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to prune the GitHub cache: {str(e)}")
+
+
+def _touch(url):
+    """Mark an entry fresh again after a 304"""
+    db = SessionLocal()
+    try:
+        db.query(GitHubCacheEntry).filter(GitHubCacheEntry.url == url).update(
+            {GitHubCacheEntry.fetched_at: datetime.utcnow()}, synchronize_session=False
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to refresh GitHub cache entry {url}: {str(e)}")
+    finally:
+        db.close()
+
+
+def cached_get(get, url, endpoint):
+    """
+    GET a GitHub URL through the cache.
+
+    `get` performs the real request (e.g. session.get) and must accept a
+    `headers` keyword. Returns a requests.Response or a CachedResponse.
+    """
+    if not GITHUB_CACHE_ENABLED:
+        return get(url)
+
+    metrics.increment("github_cache.lookups")
+    entry = _load(url)
+    ttl = timedelta(seconds=GITHUB_CACHE_TTLS.get(endpoint, 3600))
+
+    if entry is not None and entry.fetched_at and datetime.utcnow() - entry.fetched_at < ttl:
+        metrics.increment("github_cache.hits")
+        metrics.increment("github_cache.bytes_saved", len(entry.body))
+        return CachedResponse(entry.status_code, entry.body)
+
+    headers = {}
+    if entry is not None and entry.etag:
+        headers["If-None-Match"] = entry.etag
+
+    response = get(url, headers=headers)
+
+    if response.status_code == 304 and entry is not None:
+        metrics.increment("github_cache.revalidated")
+        metrics.increment("github_cache.bytes_saved", len(entry.body))
+        _touch(url)
+        return CachedResponse(entry.status_code, entry.body)
+
+    metrics.increment("github_cache.misses")
+    if response.status_code in CACHEABLE_STATUSES:
+        _save(url, endpoint, response.status_code, response.headers.get("ETag"), response.text)
+    return response
+
+
+def cache_stats():
+    """Hit rate and bytes saved by the GitHub cache"""
+    hits = metrics.get_counter("github_cache.hits")
+    revalidated = metrics.get_counter("github_cache.revalidated")
+    lookups = metrics.get_counter("github_cache.lookups")
+    return {
+        "enabled": GITHUB_CACHE_ENABLED,
+        "hits": hits,
+        "revalidated": revalidated,
+        "misses": metrics.get_counter("github_cache.misses"),
+        "hit_rate": round((hits + revalidated) / lookups, 4) if lookups else 0.0,
+        "bytes_saved": metrics.get_counter("github_cache.bytes_saved"),
+        "pruned": metrics.get_counter("github_cache.pruned"),
+        "ttls": GITHUB_CACHE_TTLS
+    }
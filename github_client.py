@@ -0,0 +1,186 @@
+"""
+Rate-limit-aware GitHub HTTP client.
+
+Tracks X-RateLimit-Remaining / X-RateLimit-Reset for every token in a
+pool, always uses the token with the most budget left, and smooths bursts
+with a token bucket so a wave of submissions doesn't trip GitHub's
+secondary rate limits. When every token is exhausted, callers wait for the
+reset if it is close enough and otherwise get GitHubRateLimitError, so
+enrichment can be deferred instead of silently returning nothing.
+"""
+
+import logging
+import os
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+import metrics
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated token pool; falls back to the single GITHUB_API_TOKEN
+GITHUB_API_TOKENS = [
+    token.strip()
+    for token in os.getenv("GITHUB_API_TOKENS", os.getenv("GITHUB_API_TOKEN") or "").split(",")
+    if token.strip()
+]
+# Sustained request rate and burst size of the client-side token bucket
+GITHUB_REQUESTS_PER_SECOND = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", "10"))
+GITHUB_BURST = int(os.getenv("GITHUB_BURST", "20"))
+# Longest a request may wait for rate-limit budget before giving up
+GITHUB_MAX_WAIT_SECONDS = float(os.getenv("GITHUB_MAX_WAIT_SECONDS", "30"))
+# Retries after a secondary rate limit (403/429 with Retry-After)
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "3"))
+
+
+class GitHubRateLimitError(Exception):
+    """Raised when no token has budget left within the allowed wait"""
+
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f"GitHub rate limit exhausted until {time.strftime('%H:%M:%S', time.localtime(reset_at))}")
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, at most `capacity` saved up"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Take one token, waiting up to `timeout` seconds; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class _TokenState:
+    def __init__(self, token):
+        self.token = token
+        self.remaining = None  # Unknown until the first response
+        self.reset_at = 0.0
+
+    def available(self, now):
+        return self.remaining is None or self.remaining > 0 or now >= self.reset_at
+
+
+class GitHubClient:
+    """Thread-safe HTTP client used for every GitHub call in agents.py"""
+
+    def __init__(self, tokens=None, requests_per_second=GITHUB_REQUESTS_PER_SECOND, burst=GITHUB_BURST,
+                 max_wait=GITHUB_MAX_WAIT_SECONDS, max_retries=GITHUB_MAX_RETRIES, pool_size=10):
+        # An empty pool still works, unauthenticated (60 requests/hour)
+        self._tokens = [_TokenState(token) for token in (tokens or [])] or [_TokenState(None)]
+        self._bucket = TokenBucket(requests_per_second, burst)
+        self._lock = threading.Lock()
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @property
+    def authenticated(self):
+        """True if at least one token is configured (GraphQL requires one)"""
+        return any(state.token for state in self._tokens)
+
+    def _pick_token(self):
+        """Token with the most remaining budget, or raise/wait if all are spent"""
+        deadline = time.time() + self.max_wait
+        while True:
+            now = time.time()
+            with self._lock:
+                candidates = [state for state in self._tokens if state.available(now)]
+                if candidates:
+                    return max(candidates, key=lambda state: float("inf") if state.remaining is None else state.remaining)
+                reset_at = min(state.reset_at for state in self._tokens)
+
+            if reset_at > deadline:
+                metrics.increment("github.rate_limit_deferred")
+                raise GitHubRateLimitError(reset_at)
+
+            # Budget comes back soon enough: queue until the reset
+            metrics.increment("github.rate_limit_waits")
+            logger.warning(f"All GitHub tokens exhausted, waiting {reset_at - now:.1f}s for reset")
+            time.sleep(max(reset_at - now, 0.01))
+
+    def _record(self, state, response):
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        with self._lock:
+            if remaining is not None:
+                state.remaining = int(remaining)
+                metrics.set_gauge("github.rate_limit_remaining", sum(
+                    s.remaining for s in self._tokens if s.remaining is not None
+                ))
+            if reset is not None:
+                state.reset_at = float(reset)
+
+    def get(self, url, headers=None):
+        """GET `url` with rate limiting, token rotation and secondary-limit backoff"""
+        return self.request("GET", url, headers=headers)
+
+    def post(self, url, json=None, headers=None):
+        """POST a JSON body (e.g. a GraphQL query) under the same limits as get()"""
+        return self.request("POST", url, headers=headers, json=json)
+
+    def request(self, method, url, headers=None, json=None):
+        """Send a request with rate limiting, token rotation and secondary-limit backoff"""
+        for attempt in range(self.max_retries + 1):
+            if not self._bucket.acquire(timeout=self.max_wait):
+                raise GitHubRateLimitError(time.time() + self.max_wait)
+
+            state = self._pick_token()
+            request_headers = dict(headers or {})
+            if state.token:
+                request_headers["Authorization"] = f"token {state.token}"
+
+            metrics.increment("github.requests")
+            response = self.session.request(method, url, headers=request_headers, json=json)
+            self._record(state, response)
+
+            if response.status_code not in (403, 429):
+                return response
+
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                # Primary limit on this token: rotate to another one
+                metrics.increment("github.rate_limited")
+                continue
+
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is None:
+                return response  # A plain 403 (e.g. private repo)
+
+            # Secondary rate limit: back off as instructed, doubling on repeats
+            delay = float(retry_after) * (2 ** attempt)
+            if delay > self.max_wait:
+                raise GitHubRateLimitError(time.time() + delay)
+            metrics.increment("github.secondary_rate_limited")
+            logger.warning(f"GitHub secondary rate limit, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        return response
@@ -0,0 +1,236 @@
+"""
+GraphQL enrichment backend for GitHub portfolios.
+
+The REST backend needs 3 calls per profile and 4 per repository. This
+module fetches the profiles, linked repositories, their languages and
+READMEs for one candidate in a single GraphQL query (split into a few
+queries only for very link-heavy resumes) and maps the result onto the
+same dicts that scrape_github_data() returns, with the same meaning:
+
+- GraphQL has no equivalent of the recent-events count the REST backend
+  reports as `contributions`, so the caller passes that REST fetch in and
+  it runs alongside the query.
+- A README is found like the REST readme endpoint does: any README file
+  at the root of the default branch (README.rst, README, readme.md...).
+  `HEAD:README.md` is read in the first query; any other README, or one
+  HEAD doesn't resolve to, costs one more query for the batch.
+- READMEs are cut to README_MAX_CHARS here, after the query. GraphQL's
+  Blob.text takes no length or byte-range argument, so the whole blob is
+  transferred; GitHub itself only truncates very large blobs
+  (Blob.isTruncated).
+"""
+
+import logging
+import os
+import re
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# GraphQL endpoint (override to point at a stub server)
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+# Profiles plus repositories per query; keeps each query well under GitHub's node limits
+GITHUB_GRAPHQL_BATCH = int(os.getenv("GITHUB_GRAPHQL_BATCH", "20"))
+# Same truncation as the REST backend's fetch_readme(); applied client-side, see the module docstring
+README_MAX_CHARS = 500
+
+# Root entries of the default branch, to find the README by name, plus the common case read directly
+README_FIELDS = """
+    defaultBranchRef { name target { ... on Commit { tree { entries { name type } } } } }
+    readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+"""
+
+# Root files taken as the README, preferring these extensions in order when there are several
+README_PATTERN = re.compile(r"^readme(\.[a-z0-9]+)?$", re.IGNORECASE)
+README_EXTENSIONS = (".md", ".markdown", ".rst", ".txt", "")
+
+PROFILE_FIELDS = """
+    url
+    name
+    bio
+    repositories(privacy: PUBLIC) { totalCount }
+    followers { totalCount }
+    following { totalCount }
+"""
+
+REPO_FIELDS = """
+    url
+    description
+    stargazerCount
+    forkCount
+    primaryLanguage { name }
+    languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { nodes { name } }
+""" + README_FIELDS
+
+
+class GitHubGraphQLError(Exception):
+    """Raised when the GraphQL endpoint fails as a whole"""
+
+
+def build_query(usernames, repos):
+    """
+    Build one aliased query for the given profiles and (owner, name) repos.
+
+    Returns (query, variables); logins and names are passed as variables,
+    never interpolated into the query text.
+    """
+    declarations = []
+    selections = []
+    variables = {}
+
+    for i, username in enumerate(usernames):
+        declarations.append(f"$login{i}: String!")
+        variables[f"login{i}"] = username
+        selections.append(f"p{i}: user(login: $login{i}) {{ {PROFILE_FIELDS} }}")
+        # The profile README lives in the username/username repository
+        selections.append(f"pr{i}: repository(owner: $login{i}, name: $login{i}) {{ {README_FIELDS} }}")
+
+    for i, (owner, name) in enumerate(repos):
+        declarations.append(f"$owner{i}: String!")
+        declarations.append(f"$name{i}: String!")
+        variables[f"owner{i}"] = owner
+        variables[f"name{i}"] = name
+        selections.append(f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{ {REPO_FIELDS} }}")
+
+    query = f"query Portfolio({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}"
+    return query, variables
+
+
+def build_readme_query(targets):
+    """Query reading one blob per (owner, name, expression) target; returns (query, variables)"""
+    declarations = []
+    selections = []
+    variables = {}
+    for i, (owner, name, expression) in enumerate(targets):
+        declarations += [f"$owner{i}: String!", f"$name{i}: String!", f"$expression{i}: String!"]
+        variables.update({f"owner{i}": owner, f"name{i}": name, f"expression{i}": expression})
+        selections.append(
+            f"b{i}: repository(owner: $owner{i}, name: $name{i}) "
+            f"{{ object(expression: $expression{i}) {{ ... on Blob {{ text }} }} }}"
+        )
+    query = f"query Readmes({', '.join(declarations)}) {{\n" + "\n".join(selections) + "\n}"
+    return query, variables
+
+
+def readme_expression(node):
+    """`branch:file` expression of the README at the root of the default branch, or None if there is none"""
+    branch = (node or {}).get("defaultBranchRef")
+    if not branch:
+        return None  # Missing or empty repository
+    entries = ((branch.get("target") or {}).get("tree") or {}).get("entries") or []
+    names = [entry["name"] for entry in entries if entry.get("type") == "blob" and README_PATTERN.match(entry["name"])]
+    if not names:
+        return None
+
+    def preference(name):
+        extension = os.path.splitext(name)[1].lower()
+        rank = README_EXTENSIONS.index(extension) if extension in README_EXTENSIONS else len(README_EXTENSIONS)
+        return rank, name
+
+    return f"{branch['name']}:{min(names, key=preference)}"
+
+
+def readme_text(text):
+    """Cleaned README text like fetch_readme(), or its 'not found' marker"""
+    if text is None:
+        return "README not found"
+    return re.sub(r"[\n\r]+", " ", text)[:README_MAX_CHARS]
+
+
+def map_profile(node, contributions, readme):
+    """GraphQL user node -> fetch_github_profile() dict plus contributions and README text"""
+    return {
+        "profile_url": node.get("url"),
+        "name": node.get("name"),
+        "bio": node.get("bio"),
+        "public_repos": (node.get("repositories") or {}).get("totalCount"),
+        "followers": (node.get("followers") or {}).get("totalCount"),
+        "following": (node.get("following") or {}).get("totalCount"),
+        "contributions": contributions,
+        "profile_readme": readme_text(readme)
+    }
+
+
+def map_repo(node, readme):
+    """GraphQL repository node -> fetch_github_repo() dict plus languages and README text"""
+    return {
+        "repo_url": node.get("url"),
+        "description": node.get("description"),
+        "stars": node.get("stargazerCount"),
+        "forks": node.get("forkCount"),
+        "language": (node.get("primaryLanguage") or {}).get("name"),
+        "languages": [language["name"] for language in (node.get("languages") or {}).get("nodes") or []],
+        "readme": readme_text(readme)
+    }
+
+
+def _post(client, query, variables):
+    response = client.post(GITHUB_GRAPHQL_URL, json={"query": query, "variables": variables})
+    if response.status_code != 200:
+        raise GitHubGraphQLError(f"GraphQL request failed with status {response.status_code}")
+
+    payload = response.json()
+    data = payload.get("data")
+    if data is None:
+        raise GitHubGraphQLError(f"GraphQL query failed: {payload.get('errors')}")
+    # Missing users or repos come back as null nodes plus NOT_FOUND errors; like REST, skip them
+    for error in payload.get("errors") or []:
+        logger.debug(f"GraphQL partial error: {error.get('message')}")
+    return data
+
+
+def _readmes(client, targets):
+    """README text (or None) of each (owner, name, repository node) target, in order"""
+    texts = [None] * len(targets)
+    lookups = []
+    for i, (owner, name, node) in enumerate(targets):
+        expression = readme_expression(node)
+        if expression is None:
+            continue
+        if expression.endswith(":README.md") and (node.get("readme") or {}).get("text") is not None:
+            texts[i] = node["readme"]["text"]  # Already read through HEAD
+        else:
+            lookups.append((i, (owner, name, expression)))
+
+    if lookups:
+        data = _post(client, *build_readme_query([target for _, target in lookups]))
+        for j, (i, _) in enumerate(lookups):
+            texts[i] = ((data.get(f"b{j}") or {}).get("object") or {}).get("text")
+    return texts
+
+
+def scrape_github_data_graphql(client, usernames, repos, fetch_contributions):
+    """
+    Fetch profiles and repos with batched GraphQL queries.
+
+    `usernames` and `repos` must already be deduplicated; the result has
+    the same {"profiles": [...], "projects": [...]} shape and order as the
+    REST backend. `fetch_contributions(username)` supplies each found
+    profile's contributions count.
+    """
+    github_data = {"profiles": [], "projects": []}
+
+    targets = [("profile", username) for username in usernames] + [("repo", repo) for repo in repos]
+    for start in range(0, len(targets), GITHUB_GRAPHQL_BATCH):
+        batch = targets[start:start + GITHUB_GRAPHQL_BATCH]
+        batch_users = [target for kind, target in batch if kind == "profile"]
+        batch_repos = [target for kind, target in batch if kind == "repo"]
+        data = _post(client, *build_query(batch_users, batch_repos))
+
+        # Missing users and repos are skipped, like REST 404s
+        profiles = [(username, data[f"p{i}"], data.get(f"pr{i}"))
+                    for i, username in enumerate(batch_users) if data.get(f"p{i}")]
+        projects = [(owner, name, data[f"r{i}"]) for i, (owner, name) in enumerate(batch_repos) if data.get(f"r{i}")]
+        readmes = _readmes(client, [(username, username, readme_node) for username, _, readme_node in profiles]
+                           + projects)
+
+        for (username, node, _), readme in zip(profiles, readmes):
+            github_data["profiles"].append(map_profile(node, fetch_contributions(username), readme))
+        for (_, _, node), readme in zip(projects, readmes[len(profiles):]):
+            github_data["projects"].append(map_repo(node, readme))
+
+    return github_data
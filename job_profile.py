@@ -0,0 +1,108 @@
+"""
+Compiled per-job profiles.
+
+Everything the scoring path derives from a JobDetails row (the job
+description block rendered into the prompt, the job title, the parsed
+skill list and the local scorer's keyword vector) is built once per job
+revision and kept in a small LRU. Profiles are keyed on the job id and
+checked against the row's current field values, so editing a job
+rebuilds its profile on the next submission.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+import metrics
+from local_scorer import JobVector
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Number of job profiles kept in memory
+JOB_PROFILE_CACHE_SIZE = int(os.getenv("JOB_PROFILE_CACHE_SIZE", "128"))
+
+# Separators of a skills requirement: "Python, Java; SQL", one per line, or bullet points
+SKILL_SEPARATOR_PATTERN = re.compile(r"[,;\n•]|\s-\s")
+
+_profiles = OrderedDict()
+_lock = threading.Lock()
+
+
+def render_job_description(job):
+    """Render a JobDetails row into the job description used in the scoring prompt"""
+    return f"""📌 Job Title: {job.job_title}
+
+            🔍 Job Requirements
+            1️⃣ Skills (Technical & Soft Skills):
+            {job.skills_requirement}
+
+            2️⃣ Experience:
+            {job.experience_requirement}
+
+            3️⃣ Educational Qualifications:
+            {job.education_requirement}
+
+            4️⃣ Additional Requirements:
+            {job.additional_requirements or "None"}
+            """
+
+
+def parse_skills(skills_requirement):
+    """Individual skills of a skills requirement, in order and without duplicates"""
+    skills = []
+    for part in SKILL_SEPARATOR_PATTERN.split(skills_requirement or ""):
+        skill = re.sub(r"^(?:[-*\s]+|and\s+)", "", part.strip()).strip(" .")
+        if skill and skill.lower() not in (s.lower() for s in skills):
+            skills.append(skill)
+    return skills
+
+
+def _job_fields(job):
+    """The JobDetails fields covered by JobDetails.fingerprint()"""
+    return (
+        job.job_title,
+        job.job_details,
+        job.skills_requirement,
+        job.education_requirement,
+        job.experience_requirement,
+        job.additional_requirements
+    )
+
+
+class JobProfile:
+    """What scoring and feedback need from one revision of a job"""
+
+    def __init__(self, job):
+        self.job_id = job.job_id
+        self.fields = _job_fields(job)
+        self.fingerprint = job.fingerprint()
+        self.title = job.job_title.strip()
+        self.description = render_job_description(job)
+        self.skills = tuple(parse_skills(job.skills_requirement))
+        self.vector = JobVector(self.description)
+
+
+def get_profile(job):
+    """Compiled JobProfile of a JobDetails row, rebuilt if the row changed since it was cached"""
+    # Comparing the fields is much cheaper than hashing them into a fingerprint on every call
+    fields = _job_fields(job)
+    with _lock:
+        profile = _profiles.get(job.job_id)
+        if profile is not None and profile.fields == fields:
+            _profiles.move_to_end(job.job_id)
+            metrics.increment("job_profile.hits")
+            return profile
+
+    profile = JobProfile(job)
+    metrics.increment("job_profile.builds")
+    with _lock:
+        _profiles[job.job_id] = profile
+        _profiles.move_to_end(job.job_id)
+        while len(_profiles) > JOB_PROFILE_CACHE_SIZE:
+            _profiles.popitem(last=False)
+    return profile
+
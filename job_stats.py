@@ -0,0 +1,122 @@
+"""
+Per-job score statistics, maintained incrementally.
+
+The job_stats table keeps one row per job with running totals over its
+candidates: how many there are, how many passed, the sum of each score
+component and a histogram of total scores. Code that inserts or rescores
+candidates calls record_candidates() or record_rescores() in the same
+transaction, so the totals commit or roll back with the rows they count
+and GET /job-details/{job_id}/stats reads one row instead of scanning
+the job's candidates.
+
+Totals are applied as an upsert that adds to the stored values
+(`candidate_count = candidate_count + 1`), so concurrent writers never
+overwrite each other's increments. rebuild() recomputes them from the
+candidates table.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from models import Candidate, JobDetails, JobStats
+
+# Minimum total score (out of 100) for an interview invitation
+PASS_THRESHOLD = 70
+
+# Width of the total score histogram buckets (the bucket_N columns of job_stats)
+BUCKET_WIDTH = 10
+BUCKETS = [f"bucket_{low}" for low in range(0, 100, BUCKET_WIDTH)]
+
+SCORE_COLUMNS = ("total_score", "parameter_score", "job_similarity_score", "github_score")
+
+# INSERT ... ON CONFLICT DO UPDATE for the supported backends
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def bucket_for(total_score):
+    """Histogram column counting a total score; scores outside 0-100 land in the first or last bucket"""
+    return BUCKETS[min(max(int(total_score // BUCKET_WIDTH), 0), len(BUCKETS) - 1)]
+
+
+def _add(totals, scores, sign=1):
+    """Add (sign=1) or remove (sign=-1) one candidate's scores to a job's totals"""
+    total_score = scores["total_score"]
+    totals["candidate_count"] += sign
+    if total_score >= PASS_THRESHOLD:
+        totals["pass_count"] += sign
+    totals[bucket_for(total_score)] += sign
+    for column in SCORE_COLUMNS:
+        totals[f"{column}_sum"] += sign * scores[column]
+
+
+def _apply(db, totals_by_job):
+    """Add each job's totals to its job_stats row, creating the row on a job's first candidate"""
+    upsert = _UPSERTS[db.get_bind().dialect.name]
+    # Rows are locked in job order, so two writers touching the same jobs can't deadlock on PostgreSQL
+    for job_id in sorted(totals_by_job):
+        totals = {column: value for column, value in totals_by_job[job_id].items() if value}
+        if not totals:
+            continue
+        statement = upsert(JobStats).values(job_id=job_id, **totals)
+        statement = statement.on_conflict_do_update(
+            index_elements=[JobStats.job_id],
+            set_={
+                **{column: getattr(JobStats, column) + statement.excluded[column] for column in totals},
+                "updated_at": statement.excluded.updated_at
+            }
+        )
+        db.execute(statement)
+
+
+def record_candidates(db, candidates):
+    """Count newly added candidates in their jobs' stats, in the session's transaction"""
+    totals_by_job = defaultdict(lambda: defaultdict(int))
+    for candidate in candidates:
+        scores = {column: getattr(candidate, column) or 0.0 for column in SCORE_COLUMNS}
+        _add(totals_by_job[candidate.job_id], scores)
+    _apply(db, totals_by_job)
+
+
+def record_rescores(db, job_id, changes):
+    """Move rescored candidates of a job from their old to their new scores; `changes` holds (old, new) pairs"""
+    totals = defaultdict(int)
+    for old, new in changes:
+        _add(totals, old, -1)
+        _add(totals, new)
+    _apply(db, {job_id: totals})
+
+
+def _in_bucket(index):
+    """SQL condition matching bucket_for(candidates.total_score) == BUCKETS[index]"""
+    low = index * BUCKET_WIDTH
+    conditions = []
+    if index > 0:
+        conditions.append(Candidate.total_score >= low)
+    if index < len(BUCKETS) - 1:
+        conditions.append(Candidate.total_score < low + BUCKET_WIDTH)
+    return and_(*conditions)
+
+
+def rebuild(db, job_id=None):
+    """Recompute job_stats from the candidates table, for one job or all; takes a Session or Connection"""
+    columns = {
+        "job_id": Candidate.job_id,
+        "candidate_count": func.count(),
+        "pass_count": func.sum(case((Candidate.total_score >= PASS_THRESHOLD, 1), else_=0)),
+        **{f"{column}_sum": func.sum(getattr(Candidate, column)) for column in SCORE_COLUMNS},
+        **{name: func.sum(case((_in_bucket(index), 1), else_=0)) for index, name in enumerate(BUCKETS)},
+    }
+    aggregate = select(*columns.values()).where(
+        # Candidates whose job is gone (only possible in databases older than the foreign key) get no row
+        Candidate.job_id.in_(select(JobDetails.job_id))
+    ).group_by(Candidate.job_id)
+    clear = delete(JobStats)
+    if job_id is not None:
+        aggregate = aggregate.where(Candidate.job_id == job_id)
+        clear = clear.where(JobStats.job_id == job_id)
+
+    db.execute(clear)
+    db.execute(insert(JobStats).from_select(list(columns), aggregate))
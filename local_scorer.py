@@ -0,0 +1,102 @@
+"""
+Local resume/job similarity, used when the LLM is unavailable.
+
+Job descriptions are compiled once into a vocabulary and a NumPy weight
+vector and kept in an LRU cache. A resume is then scored with BM25 term
+saturation and length normalisation against that vocabulary, which takes
+a fraction of a millisecond and, unlike a substring check, rewards
+repeated evidence with diminishing returns.
+"""
+
+import math
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+# BM25 term-frequency saturation and length normalisation
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Typical resume length in tokens, used as BM25's average document length
+AVERAGE_RESUME_TOKENS = 450
+# A term counts as fully covered once it appears this often in an average-length resume
+FULL_MATCH_FREQUENCY = 2
+# Upper bound of the SIMILARITY component
+MAX_SIMILARITY = 60
+
+# ASCII punctuation that separates terms; '+', '#', '.' and '/' are kept so c++, c#, node.js and
+# ci/cd stay whole. str.translate is only fast on ASCII text, hence split_terms()' encode step
+SEPARATORS = str.maketrans({ch: " " for ch in "!\"$%&'()*,:;<=>?@[\\]^_`{|}~"})
+
+# English function words, job-posting vocabulary that says nothing about fit and the labels of
+# job_profile.render_job_description(). There is no resume corpus to estimate document frequencies
+# from, so these get zero weight instead of a low IDF
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+for from had has have he her his how i if in into is it its may more most must my no not of on
+or our out over own per she should so some such than that the their them then there these they
+this those through to under up us very was we were what when where which while who will with
+within would you your
+ability able across candidate candidates company description experience environment etc excellent
+good great ideal including job knowledge looking plus position preferred strong required
+requirement requirements responsibilities role skills team work working year years
+title technical soft educational qualifications additional none
+""".split())
+
+
+def split_terms(text):
+    """
+    Lowercased whitespace/punctuation-separated terms, computed at C speed.
+    Non-ASCII characters (bullets, dashes, emoji) become '?' and so separators.
+    """
+    return text.lower().encode("ascii", "replace").decode("ascii").translate(SEPARATORS).split()
+
+
+def tokenize(text):
+    """Terms of `text` without sentence punctuation, stopwords or single characters (except c and r)"""
+    terms = (term.strip("./-") for term in split_terms(text))
+    return [term for term in terms if term not in STOPWORDS and (len(term) > 1 or term in ("c", "r"))]
+
+
+class JobVector:
+    """Vocabulary and term weights of one job description"""
+
+    def __init__(self, job_text):
+        counts = Counter(tokenize(job_text))
+        self.terms = list(counts)
+        self.index = {term: i for i, term in enumerate(self.terms)}
+        # Terms the posting repeats matter more, with diminishing returns
+        self.weights = np.array([1.0 + math.log(counts[term]) for term in self.terms])
+        self.total_weight = float(self.weights.sum())
+
+    def similarity(self, resume_text):
+        """Weighted share (0-1) of the job's terms the resume covers, BM25-saturated"""
+        resume_terms = split_terms(resume_text)
+        if not self.terms or not resume_terms:
+            return 0.0
+
+        # Count every resume term once in C, then look up only the job's vocabulary; a term at
+        # the end of a sentence keeps its full stop, and stripping it per token would cost more
+        counts = Counter(resume_terms)
+        tf = np.array([counts.get(term, 0) + counts.get(term + ".", 0) for term in self.terms], dtype=float)
+
+        length_norm = 1 - BM25_B + BM25_B * len(resume_terms) / AVERAGE_RESUME_TOKENS
+        saturated = tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+        full_match = FULL_MATCH_FREQUENCY * (BM25_K1 + 1) / (FULL_MATCH_FREQUENCY + BM25_K1)
+        coverage = np.minimum(saturated / full_match, 1.0)
+        return float(coverage @ self.weights) / self.total_weight
+
+    def score(self, resume_text):
+        """SIMILARITY component (0-60) of a resume against this job"""
+        return int(round(self.similarity(resume_text) * MAX_SIMILARITY))
+
+
+@lru_cache(maxsize=256)
+def job_vector(job_text):
+    """Compiled JobVector for a job description, reused across calls"""
+    return JobVector(job_text)
+
+
+def similarity_score(resume_text, job_text):
+    """SIMILARITY component (0-60) of a resume against a job description"""
+    return job_vector(job_text).score(resume_text)
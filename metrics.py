@@ -0,0 +1,74 @@
+"""
+In-process counters, gauges and timings.
+
+Modules record what they do here (cache hits, queue depth, call latency)
+and the API exposes a snapshot on GET /metrics. Values are per process and
+reset on restart.
+"""
+
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_gauges = {}
+_timings = {}
+
+
+def increment(name, value=1):
+    """Add `value` to a counter"""
+    with _lock:
+        _counters[name] += value
+
+
+def set_gauge(name, value):
+    """Record the current value of a gauge"""
+    with _lock:
+        _gauges[name] = value
+
+
+def observe(name, value):
+    """Record one observation (e.g. a duration in seconds) of a timing"""
+    with _lock:
+        count, total, maximum = _timings.get(name, (0, 0.0, 0.0))
+        _timings[name] = (count + 1, total + value, max(maximum, value))
+
+
+def get_counter(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def average(name):
+    """Mean of a timing's observations, or 0.0 if none were recorded"""
+    with _lock:
+        count, total, _ = _timings.get(name, (0, 0.0, 0.0))
+        return total / count if count else 0.0
+
+
+def ratio(numerator, denominator):
+    """Safe ratio of two counters, e.g. a hit rate"""
+    with _lock:
+        total = _counters.get(denominator, 0)
+        return round(_counters.get(numerator, 0) / total, 4) if total else 0.0
+
+
+def snapshot():
+    """All current values, ready to be returned as JSON"""
+    with _lock:
+        return {
+            "counters": dict(_counters),
+            "gauges": dict(_gauges),
+            "timings": {
+                name: {"count": count, "avg": round(total / count, 6), "max": round(maximum, 6)}
+                for name, (count, total, maximum) in _timings.items()
+            }
+        }
+
+
+def reset():
+    """Clear everything (used by tests and benchmarks)"""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _timings.clear()
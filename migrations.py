@@ -0,0 +1,138 @@
+"""
+Versioned schema migrations.
+
+Base.metadata.create_all() creates missing tables but never changes
+existing ones, so indexes, constraints and columns added to the models
+after a database was created need a migration. MIGRATIONS lists them in
+order. create_tables() applies the ones not yet recorded in the
+schema_migrations table, each in its own transaction together with its
+record.
+
+Migrations must also be safe on a fresh database, where create_all() has
+already built the tables from the current models.
+
+Several processes may start at once (uvicorn --workers, or API and worker
+hosts sharing a PostgreSQL database). On PostgreSQL create_tables() holds
+schema_lock() so only one of them creates tables and migrates at a time;
+on SQLite each migration takes the database write lock itself.
+"""
+
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import func, inspect, insert, select
+from sqlalchemy.schema import AddConstraint
+
+from job_stats import rebuild as rebuild_job_stats
+from models import Candidate, JobStats, SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+
+def _candidates_indexes_and_job_fk(conn):
+    """Composite listing indexes on candidates and a foreign key from candidates.job_id to job_details"""
+    inspector = inspect(conn)
+    has_job_fk = any(fk["referred_table"] == "job_details" for fk in inspector.get_foreign_keys("candidates"))
+
+    if not has_job_fk and conn.dialect.name == "sqlite":
+        # SQLite can't add a constraint to an existing table: rebuild it from the model and copy the rows.
+        # run_migrations() turns enforcement off for the copy, so rows referencing a missing job are kept
+        columns = ", ".join(
+            column["name"] for column in inspector.get_columns("candidates") if column["name"] in Candidate.__table__.c
+        )
+        conn.exec_driver_sql("ALTER TABLE candidates RENAME TO candidates_old")
+        for index in Candidate.__table__.indexes:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+        Candidate.__table__.create(conn)
+        conn.exec_driver_sql(f"INSERT INTO candidates ({columns}) SELECT {columns} FROM candidates_old")
+        conn.exec_driver_sql("DROP TABLE candidates_old")
+        orphans = conn.exec_driver_sql("PRAGMA foreign_key_check(candidates)").all()
+        if orphans:
+            logger.warning(f"{len(orphans)} candidates reference a missing job; updates to them will fail")
+        return
+
+    if not has_job_fk:
+        for constraint in Candidate.__table__.foreign_key_constraints:
+            conn.execute(AddConstraint(constraint))
+    for index in Candidate.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _job_stats_backfill(conn):
+    """job_stats rows for the candidates stored before the table existed"""
+    JobStats.__table__.create(conn, checkfirst=True)
+    rebuild_job_stats(conn)
+
+
+# (version, name, function taking a Connection); append only, never renumber
+MIGRATIONS = [
+    (1, "candidates_indexes_and_job_fk", _candidates_indexes_and_job_fk),
+    (2, "job_stats_backfill", _job_stats_backfill),
+]
+
+
+# Key of the PostgreSQL advisory lock taken by schema_lock(); any constant unique to this app
+SCHEMA_LOCK_KEY = 7_261_093
+
+
+@contextmanager
+def schema_lock(engine):
+    """Serialize schema changes across processes sharing a PostgreSQL database (no-op elsewhere)"""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        # A session-level lock on its own connection, held while other connections run the DDL
+        conn.execute(select(func.pg_advisory_lock(SCHEMA_LOCK_KEY)))
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(select(func.pg_advisory_unlock(SCHEMA_LOCK_KEY)))
+            conn.commit()
+
+
+def applied_versions(engine):
+    with engine.connect() as conn:
+        return {version for (version,) in conn.execute(select(SchemaMigration.version))}
+
+
+def run_migrations(engine):
+    """Apply pending migrations in order; returns the versions applied by this call"""
+    SchemaMigration.__table__.create(engine, checkfirst=True)
+    applied = applied_versions(engine)
+    newly_applied = []
+
+    for version, name, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+
+        with engine.connect() as conn:
+            foreign_keys = False
+            if conn.dialect.name == "sqlite":
+                # Table rebuilds must run with foreign key enforcement off, and SQLite ignores the pragma
+                # inside a transaction, so switch it off first and back on for the pooled connection after
+                foreign_keys = bool(conn.exec_driver_sql("PRAGMA foreign_keys").scalar())
+                conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+                # pysqlite doesn't open a transaction before DDL; take the write lock up front so the
+                # migration is atomic and processes starting at the same time apply it only once
+                conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                already_applied = conn.execute(
+                    select(SchemaMigration.version).where(SchemaMigration.version == version)
+                ).first()
+                if already_applied is None:
+                    migrate(conn)
+                    conn.execute(
+                        insert(SchemaMigration).values(version=version, name=name, applied_at=datetime.utcnow())
+                    )
+                    newly_applied.append(version)
+                    logger.info(f"Applied schema migration {version} ({name})")
+                conn.commit()
+            finally:
+                if foreign_keys:
+                    conn.rollback()
+                    conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+    return newly_applied
@@ -1,19 +1,27 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Index
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
+import hashlib
+import json
 import os
 
+from db_engine import DATABASE_URL, create_configured_async_engine, create_configured_engine
+
 # Create the database directory if it doesn't exist
 os.makedirs('database', exist_ok=True)
 
-# Create SQLite engine
-DATABASE_URL = "sqlite:///database/resume_scorer.db"
-engine = create_engine(DATABASE_URL)
+# Create the engine for DATABASE_URL (SQLite by default; pool settings and SQLite pragmas in db_engine.py)
+engine = create_configured_engine(DATABASE_URL)
 
 # Create session maker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for request handlers, so queries don't block the event loop
+async_engine = create_configured_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base class for models
 Base = declarative_base()
 
@@ -41,11 +49,31 @@ class JobDetails(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
+    def fingerprint(self):
+        """Hash of the fields that feed the scoring prompt; changes whenever the job is edited"""
+        fields = [
+            self.job_title,
+            self.job_details,
+            self.skills_requirement,
+            self.education_requirement,
+            self.experience_requirement,
+            self.additional_requirements or ""
+        ]
+        return hashlib.sha256(json.dumps(fields).encode("utf-8")).hexdigest()
+
 class Candidate(Base):
     __tablename__ = "candidates"
+    # Per-job and global listings by score or date (see candidate_listing.py). SQLite appends the
+    # rowid (id) to every index and scans backwards for DESC, so these also serve the id tiebreak
+    __table_args__ = (
+        Index("ix_candidates_job_id_total_score", "job_id", "total_score"),
+        Index("ix_candidates_job_id_created_at", "job_id", "created_at"),
+        Index("ix_candidates_total_score", "total_score"),
+        Index("ix_candidates_created_at", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    job_id = Column(Integer, default=200)
+    job_id = Column(Integer, ForeignKey("job_details.job_id"))
     user_name = Column(String(255), nullable=False)
     user_email = Column(String(255), nullable=False, unique=True)
     resume_url = Column(String(255), nullable=False)
@@ -69,9 +97,196 @@ class Candidate(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None
         }
 
+class Submission(Base):
+    """A resume submission tracked through the background scoring pipeline"""
+    __tablename__ = "submissions"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, nullable=False)
+    user_name = Column(String(255), nullable=False)
+    user_email = Column(String(255), nullable=False)
+    resume_url = Column(String(255), nullable=False)
+    stage = Column(String(32), nullable=False, default="queued")
+    evaluation = Column(Text, nullable=True)  # JSON-encoded score_resume() result
+    error = Column(Text, nullable=True)
+    candidate_id = Column(Integer, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "submission_id": self.id,
+            "job_id": self.job_id,
+            "user_name": self.user_name,
+            "user_email": self.user_email,
+            "resume_url": self.resume_url,
+            "stage": self.stage,
+            "evaluation": json.loads(self.evaluation) if self.evaluation else None,
+            "error": self.error,
+            "candidate_id": self.candidate_id,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class ExtractionCache(Base):
+    """PDF extraction results keyed by the SHA-256 of the uploaded bytes"""
+    __tablename__ = "extraction_cache"
+
+    sha256 = Column(String(64), primary_key=True)
+    text_content = Column(Text, nullable=False)
+    links = Column(Text, nullable=False)  # JSON-encoded list of URIs
+    size_bytes = Column(Integer, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class ScoreCache(Base):
+    """score_resume() results keyed by resume, job revision, model and prompt version"""
+    __tablename__ = "score_cache"
+
+    cache_key = Column(String(64), primary_key=True)
+    job_id = Column(Integer, nullable=False)
+    model_name = Column(String(255), nullable=False)
+    prompt_version = Column(String(64), nullable=False)
+    evaluation = Column(Text, nullable=False)  # JSON-encoded score_resume() result
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+class GitHubCacheEntry(Base):
+    """Cached GitHub API response, revalidated with its ETag once stale"""
+    __tablename__ = "github_cache"
+
+    url = Column(String(512), primary_key=True)
+    endpoint = Column(String(32), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    etag = Column(String(255), nullable=True)
+    body = Column(Text, nullable=False)
+    fetched_at = Column(DateTime, default=datetime.utcnow)
+
+class JobScreening(Base):
+    """Per-job pre-screen thresholds on the locally estimated total score"""
+    __tablename__ = "job_screening"
+
+    job_id = Column(Integer, primary_key=True)
+    reject_below = Column(Integer, nullable=False)  # Estimates below this are rejected without the LLM
+    accept_above = Column(Integer, nullable=False)  # Estimates at or above this are accepted without the LLM
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "job_id": self.job_id,
+            "reject_below": self.reject_below,
+            "accept_above": self.accept_above,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class RescoreRun(Base):
+    """Progress of a bulk re-scoring of a job's candidates, checkpointed per batch"""
+    __tablename__ = "rescore_runs"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(Integer, nullable=False, index=True)
+    job_fingerprint = Column(String(64), nullable=False)  # Job revision being scored against
+    status = Column(String(32), nullable=False, default="running")
+    last_candidate_id = Column(Integer, default=0, nullable=False)  # Checkpoint: candidates up to this id are done
+    total = Column(Integer, default=0, nullable=False)
+    processed = Column(Integer, default=0, nullable=False)
+    failed = Column(Integer, default=0, nullable=False)
+    elapsed_seconds = Column(Float, default=0.0, nullable=False)  # Scoring time across all resumed attempts
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            "run_id": self.id,
+            "job_id": self.job_id,
+            "status": self.status,
+            "last_candidate_id": self.last_candidate_id,
+            "total": self.total,
+            "processed": self.processed,
+            "failed": self.failed,
+            "resumes_per_minute": round(self.processed / self.elapsed_seconds * 60, 2) if self.elapsed_seconds else 0.0,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class JobStats(Base):
+    """Running score totals of a job's candidates, updated with every insert and rescore (see job_stats.py)"""
+    __tablename__ = "job_stats"
+
+    job_id = Column(Integer, ForeignKey("job_details.job_id"), primary_key=True)
+    candidate_count = Column(Integer, default=0, nullable=False)
+    pass_count = Column(Integer, default=0, nullable=False)  # Candidates at or above the pass threshold
+    total_score_sum = Column(Float, default=0.0, nullable=False)
+    parameter_score_sum = Column(Float, default=0.0, nullable=False)
+    job_similarity_score_sum = Column(Float, default=0.0, nullable=False)
+    github_score_sum = Column(Float, default=0.0, nullable=False)
+    # Candidates per total score bucket: bucket_N counts scores from N up to N + 10; bucket_90 includes 100
+    bucket_0 = Column(Integer, default=0, nullable=False)
+    bucket_10 = Column(Integer, default=0, nullable=False)
+    bucket_20 = Column(Integer, default=0, nullable=False)
+    bucket_30 = Column(Integer, default=0, nullable=False)
+    bucket_40 = Column(Integer, default=0, nullable=False)
+    bucket_50 = Column(Integer, default=0, nullable=False)
+    bucket_60 = Column(Integer, default=0, nullable=False)
+    bucket_70 = Column(Integer, default=0, nullable=False)
+    bucket_80 = Column(Integer, default=0, nullable=False)
+    bucket_90 = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        count = self.candidate_count or 0
+
+        def mean(total):
+            return round((total or 0.0) / count, 2) if count else 0.0
+
+        return {
+            "job_id": self.job_id,
+            "candidate_count": count,
+            "pass_count": self.pass_count or 0,
+            "pass_rate": round((self.pass_count or 0) / count, 4) if count else 0.0,
+            "mean_total_score": mean(self.total_score_sum),
+            "score_sums": {
+                "total_score": self.total_score_sum or 0.0,
+                "parameter_score": self.parameter_score_sum or 0.0,
+                "job_similarity_score": self.job_similarity_score_sum or 0.0,
+                "github_score": self.github_score_sum or 0.0
+            },
+            "score_means": {
+                "total_score": mean(self.total_score_sum),
+                "parameter_score": mean(self.parameter_score_sum),
+                "job_similarity_score": mean(self.job_similarity_score_sum),
+                "github_score": mean(self.github_score_sum)
+            },
+            "histogram": [
+                {"min": low, "max": low + 10, "count": getattr(self, f"bucket_{low}") or 0}
+                for low in range(0, 100, 10)
+            ],
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
+
+class SchemaMigration(Base):
+    """Versions of migrations.MIGRATIONS applied to this database"""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow)
+
 # Create tables
 def create_tables():
-    Base.metadata.create_all(bind=engine)
+    """Create missing tables, then bring existing ones up to date with migrations.MIGRATIONS"""
+    # Imported here: migrations needs the models defined above
+    from migrations import run_migrations, schema_lock
+    # Workers starting together take turns, so tables and migrations are created once
+    with schema_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
 
 def get_db():
     """Get database session"""
@@ -81,6 +296,11 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Get async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # Run this to create tables if not exists
 if __name__ == "__main__":
     create_tables() 
\ No newline at end of file
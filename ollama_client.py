@@ -0,0 +1,169 @@
+"""
+Shared, pooled Ollama client.
+
+One ollama.AsyncClient (and so one httpx connection pool) lives on a
+dedicated event-loop thread for the whole process. Worker threads submit
+generations to it and block on the result; coroutines on other loops can
+await them. Timeouts cancel the in-flight request, which closes its
+connection so the Ollama server aborts the generation instead of finishing
+it for nobody.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+
+import httpx
+import ollama
+from dotenv import load_dotenv
+
+import metrics
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Ollama server URL (the ollama library defaults to http://localhost:11434)
+OLLAMA_HOST = os.getenv("OLLAMA_HOST")
+# Wall-clock limit for one generation
+OLLAMA_TIMEOUT_SECONDS = float(os.getenv("OLLAMA_TIMEOUT_SECONDS", "20"))
+# Size of the persistent connection pool
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+
+
+class OllamaTimeoutError(TimeoutError):
+    """A generation exceeded its timeout and was cancelled"""
+
+
+def _record_prompt_eval(response):
+    """Prompt tokens Ollama had to evaluate, i.e. those not served from its KV cache"""
+    if response.get("prompt_eval_count") is not None:
+        metrics.observe("ollama.prompt_eval_tokens", response["prompt_eval_count"])
+    if response.get("prompt_eval_duration"):
+        metrics.observe("ollama.prompt_eval_seconds", response["prompt_eval_duration"] / 1e9)
+
+
+class OllamaClientPool:
+    """Process-wide async Ollama client running on its own event loop"""
+
+    def __init__(self, host=OLLAMA_HOST, timeout=OLLAMA_TIMEOUT_SECONDS, max_connections=OLLAMA_MAX_CONNECTIONS):
+        self.host = host
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="ollama-client", daemon=True).start()
+                self._client = ollama.AsyncClient(
+                    host=self.host,
+                    # The overall deadline is enforced by generate_async(); this only bounds connecting
+                    timeout=httpx.Timeout(None, connect=5.0),
+                    limits=httpx.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_connections
+                    )
+                )
+                self._loop = loop
+        return self._loop
+
+    async def generate_async(self, timeout=None, **kwargs):
+        """
+        ollama generate() with a hard deadline; must run on the pool's loop.
+
+        On timeout the request task is cancelled (closing its connection) and
+        OllamaTimeoutError is raised.
+        """
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        metrics.increment("ollama.requests")
+        try:
+            result = await asyncio.wait_for(self._client.generate(**kwargs), timeout)
+        except asyncio.TimeoutError:
+            metrics.increment("ollama.timeouts")
+            raise OllamaTimeoutError(f"Ollama request timed out after {timeout} seconds")
+        except Exception:
+            metrics.increment("ollama.errors")
+            raise
+        metrics.observe("ollama.latency_seconds", time.perf_counter() - start)
+        if result.get("eval_count"):
+            metrics.observe("ollama.completion_tokens", result["eval_count"])
+        _record_prompt_eval(result)
+        return result
+
+    async def stream_async(self, on_token, timeout=None, **kwargs):
+        """
+        Streaming generate() that can stop early; must run on the pool's loop.
+
+        `on_token(text)` is called for every streamed chunk and returns True
+        to stop. Stopping closes the response, which makes the Ollama server
+        abort the generation. Returns a dict with the text received, the
+        number of chunks (one per token), whether it stopped early and, if
+        the model finished on its own, Ollama's eval_count.
+        """
+        timeout = timeout or self.timeout
+        start = time.perf_counter()
+        metrics.increment("ollama.requests")
+        result = {"response": "", "tokens": 0, "stopped_early": False, "eval_count": None}
+
+        async def consume():
+            try:
+                stream = await self._client.generate(stream=True, **kwargs)
+                async for part in stream:
+                    if result["tokens"] == 0:
+                        # Dominated by prompt evaluation, so it shows how much of the prompt was reused
+                        metrics.observe("ollama.time_to_first_token_seconds", time.perf_counter() - start)
+                    result["response"] += part["response"]
+                    result["tokens"] += 1
+                    if part["done"]:
+                        result["eval_count"] = part.get("eval_count")
+                        _record_prompt_eval(part)
+                    elif on_token(part["response"]):
+                        result["stopped_early"] = True
+                        break
+                # Closing the generator closes the HTTP response and so the generation
+                await stream.aclose()
+            except httpx.ConnectError:
+                # Streaming requests bypass the client's own ConnectionError translation
+                raise ConnectionError(f"Failed to connect to Ollama at {self.host or 'localhost:11434'}") from None
+
+        try:
+            await asyncio.wait_for(consume(), timeout)
+        except asyncio.TimeoutError:
+            metrics.increment("ollama.timeouts")
+            raise OllamaTimeoutError(f"Ollama request timed out after {timeout} seconds")
+        except Exception:
+            metrics.increment("ollama.errors")
+            raise
+        metrics.observe("ollama.latency_seconds", time.perf_counter() - start)
+        if result["eval_count"]:
+            metrics.observe("ollama.completion_tokens", result["eval_count"])
+        return result
+
+    def stream(self, on_token, timeout=None, **kwargs):
+        """Blocking stream_async() for worker threads"""
+        return self.submit(self.stream_async, on_token, timeout=timeout, **kwargs).result()
+
+    def submit(self, coroutine_function, *args, **kwargs):
+        """Schedule `coroutine_function(*args, **kwargs)` on the pool's loop; returns a concurrent Future"""
+        loop = self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coroutine_function(*args, **kwargs), loop)
+
+    def generate(self, timeout=None, **kwargs):
+        """Blocking generate() for worker threads"""
+        return self.submit(self.generate_async, timeout=timeout, **kwargs).result()
+
+    async def agenerate(self, timeout=None, **kwargs):
+        """generate() for coroutines running on another event loop (e.g. FastAPI's)"""
+        return await asyncio.wrap_future(self.submit(self.generate_async, timeout=timeout, **kwargs))
+
+
+# Shared by every scoring call in the process
+ollama_pool = OllamaClientPool()
@@ -0,0 +1,168 @@
+"""
+PDF text and link extraction.
+
+PyMuPDF parsing is CPU bound and holds the GIL, so it runs in a
+ProcessPoolExecutor instead of on the event loop. Long documents are split
+into page ranges that are parsed in parallel.
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Worker processes used for parsing (0 parses in the calling process)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(os.cpu_count() or 1, 4))))
+# Uploads larger than this are rejected before parsing
+PDF_MAX_BYTES = int(os.getenv("PDF_MAX_BYTES", str(10 * 1024 * 1024)))
+# Only the first PDF_MAX_PAGES pages of a document are extracted
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "30"))
+# Documents longer than this are parsed page-parallel in chunks of this size
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "8"))
+
+_executor = None
+
+
+class PDFExtractionError(ValueError):
+    """Raised when an upload can't be parsed or exceeds the configured caps"""
+
+
+def check_pdf_size(pdf_content):
+    """Reject empty, non-PDF or oversized uploads before any parsing"""
+    if not pdf_content:
+        raise PDFExtractionError("Uploaded resume is empty")
+    if len(pdf_content) > PDF_MAX_BYTES:
+        raise PDFExtractionError(
+            f"Uploaded resume is {len(pdf_content)} bytes, the limit is {PDF_MAX_BYTES} bytes"
+        )
+    if not pdf_content.startswith(b"%PDF"):
+        raise PDFExtractionError("Uploaded resume is not a PDF file")
+
+
+def _extract_pages(pdf_content, start, stop):
+    """
+    Extract text and link URIs from pages [start, stop) of a PDF.
+
+    Runs inside a pool worker. Returns (text, links, page_count) where
+    page_count is the length of the whole document.
+    """
+    try:
+        doc = fitz.open(stream=io.BytesIO(pdf_content), filetype="pdf")
+    except Exception as e:
+        raise PDFExtractionError(f"Could not open PDF: {str(e)}")
+
+    try:
+        page_count = doc.page_count
+        text_content = ""
+        links = []
+
+        for page_number in range(start, min(stop, page_count)):
+            page = doc[page_number]
+            # Extract text
+            text_content += page.get_text()
+
+            # Extract links
+            for link in page.get_links():
+                if 'uri' in link:
+                    links.append(link['uri'])
+
+        return text_content, links, page_count
+    finally:
+        doc.close()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None and PDF_WORKERS > 0:
+        # spawn: forking a process that already runs worker threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_pool():
+    """Stop the parser processes (called on app shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _page_ranges(page_count):
+    """Split the pages after the first chunk into per-task ranges"""
+    last_page = min(page_count, PDF_MAX_PAGES)
+    return [
+        (start, min(start + PDF_PAGES_PER_TASK, last_page))
+        for start in range(PDF_PAGES_PER_TASK, last_page, PDF_PAGES_PER_TASK)
+    ]
+
+
+def _log_truncation(page_count):
+    if page_count > PDF_MAX_PAGES:
+        logger.warning(f"PDF has {page_count} pages, only the first {PDF_MAX_PAGES} were extracted")
+
+
+def extract_pdf_content(pdf_content):
+    """
+    Extract text and links from PDF bytes, blocking until done.
+
+    For worker threads and scripts; request handlers should await
+    extract_pdf_content_async() instead.
+    """
+    check_pdf_size(pdf_content)
+    executor = _get_executor()
+    first_stop = min(PDF_PAGES_PER_TASK, PDF_MAX_PAGES)
+
+    if executor is None:
+        text_content, links, page_count = _extract_pages(pdf_content, 0, first_stop)
+        chunks = [_extract_pages(pdf_content, start, stop) for start, stop in _page_ranges(page_count)]
+    else:
+        text_content, links, page_count = executor.submit(_extract_pages, pdf_content, 0, first_stop).result()
+        futures = [executor.submit(_extract_pages, pdf_content, start, stop) for start, stop in _page_ranges(page_count)]
+        chunks = [future.result() for future in futures]
+
+    for chunk_text, chunk_links, _ in chunks:
+        text_content += chunk_text
+        links.extend(chunk_links)
+
+    _log_truncation(page_count)
+    return text_content, links
+
+
+async def extract_pdf_content_async(pdf_content):
+    """Extract text and links from PDF bytes without blocking the event loop"""
+    check_pdf_size(pdf_content)
+    executor = _get_executor()
+    if executor is None:
+        return await asyncio.to_thread(extract_pdf_content, pdf_content)
+
+    loop = asyncio.get_running_loop()
+    first_stop = min(PDF_PAGES_PER_TASK, PDF_MAX_PAGES)
+
+    # The first chunk also tells us how many pages are left to fan out
+    text_content, links, page_count = await loop.run_in_executor(
+        executor, _extract_pages, pdf_content, 0, first_stop
+    )
+    chunks = await asyncio.gather(*[
+        loop.run_in_executor(executor, _extract_pages, pdf_content, start, stop)
+        for start, stop in _page_ranges(page_count)
+    ])
+
+    for chunk_text, chunk_links, _ in chunks:
+        text_content += chunk_text
+        links.extend(chunk_links)
+
+    _log_truncation(page_count)
+    return text_content, links
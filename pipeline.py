@@ -0,0 +1,476 @@
+"""
+Resume submission pipeline.
+
+Holds the steps shared by the synchronous /submit-resume handler and the
+background worker pool: job description rendering, scoring, candidate
+storage and the result email. In async mode the API only persists
+the upload and a `submissions` row; workers claim rows from the database, so
+in-flight work survives restarts and can run in a separate process:
+
+    python pipeline.py
+
+A claim is a lease: the worker keeps it alive with a heartbeat while a
+stage runs, and every write it makes is conditional on still holding it
+(the claim's `attempts` count), so a worker whose lease expired and was
+reclaimed elsewhere stops instead of scoring or emailing a second time.
+Transient errors put the submission back in the queue with a backoff;
+it fails for good only once SUBMISSION_MAX_ATTEMPTS claims are used up.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
+
+from models import SessionLocal, JobDetails, Candidate, Submission
+from file_storage import get_file_path
+from extraction_cache import extract_with_cache
+from pdf_extraction import PDFExtractionError
+from job_profile import get_profile
+from agents import OllamaOverloadedError, score_resume
+from github_client import GitHubRateLimitError
+from email_service import send_interview_invitation, send_rejection_feedback
+from job_stats import PASS_THRESHOLD, record_candidates
+from write_queue import candidate_writer
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Number of submissions scored concurrently by this process (0 disables in-process workers)
+SUBMISSION_WORKERS = int(os.getenv("SUBMISSION_WORKERS", "2"))
+# How often idle workers look for queued or abandoned submissions
+SUBMISSION_POLL_SECONDS = float(os.getenv("SUBMISSION_POLL_SECONDS", "5"))
+# A claimed submission with no progress for this long is considered abandoned
+SUBMISSION_LEASE_SECONDS = int(os.getenv("SUBMISSION_LEASE_SECONDS", "300"))
+# How often a worker refreshes the lease of the submission it is processing
+SUBMISSION_HEARTBEAT_SECONDS = float(os.getenv("SUBMISSION_HEARTBEAT_SECONDS", str(SUBMISSION_LEASE_SECONDS / 5)))
+# Give up on a submission after this many claims (e.g. it keeps crashing the worker)
+SUBMISSION_MAX_ATTEMPTS = int(os.getenv("SUBMISSION_MAX_ATTEMPTS", "3"))
+# Delay before retrying a submission after a transient error; doubles with each attempt
+SUBMISSION_RETRY_SECONDS = float(os.getenv("SUBMISSION_RETRY_SECONDS", "30"))
+
+# Pipeline stages, in order
+STAGE_QUEUED = "queued"
+STAGE_EXTRACTING = "extracting"
+STAGE_SCORING = "scoring"
+STAGE_STORING = "storing"
+STAGE_NOTIFYING = "notifying"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+TERMINAL_STAGES = (STAGE_COMPLETED, STAGE_FAILED)
+
+# Errors retrying can't fix: the upload itself is unusable
+PERMANENT_ERRORS = (PDFExtractionError, FileNotFoundError)
+
+
+class LeaseLostError(Exception):
+    """Raised when another worker reclaimed a submission this worker was processing"""
+
+
+def notify_candidate(name, email, job_title, scoring_result):
+    """Send the interview invitation or rejection email; returns True if it was sent"""
+    # Calculate total score as a percentage
+    total_score_percentage = (scoring_result["Total Score"] / 100) * 100
+    logger.debug(f"Total score percentage: {total_score_percentage}%")
+
+    if total_score_percentage >= PASS_THRESHOLD:
+        logger.debug(f"Score is above threshold. Sending interview invitation to {email}")
+        email_sent = send_interview_invitation(name, email, job_title)
+        if email_sent:
+            print(f"\n==== EMAIL SENT ====")
+            print(f"Invitation email sent to {name} ({email})")
+            print(f"Total Score: {total_score_percentage}% - QUALIFIED FOR INTERVIEW")
+            print(f"==== END OF EMAIL INFO ====\n")
+        else:
+            print(f"\n==== EMAIL FAILED ====")
+            print(f"Failed to send invitation email to {name} ({email})")
+            print(f"==== END OF EMAIL INFO ====\n")
+    else:
+        logger.debug(f"Score is below threshold. Sending rejection to {email}")
+
+        # Use the feedback generated by our scoring function
+        feedback = scoring_result.get("Feedback", "")
+        email_sent = send_rejection_feedback(name, email, job_title, feedback)
+
+        if email_sent:
+            print(f"\n==== EMAIL SENT ====")
+            print(f"Rejection email sent to {name} ({email})")
+            print(f"Total Score: {total_score_percentage}% - NOT QUALIFIED FOR INTERVIEW")
+            print(f"Feedback: {feedback[:100]}...")  # Print first 100 chars of feedback
+            print(f"==== END OF EMAIL INFO ====\n")
+        else:
+            print(f"\n==== EMAIL FAILED ====")
+            print(f"Failed to send rejection email to {name} ({email})")
+            print(f"==== END OF EMAIL INFO ====\n")
+
+    return email_sent
+
+
+def normalize_email(email):
+    """Canonical form of an applicant's email, so the same address is one candidate whatever its case"""
+    return email.strip().lower()
+
+
+def build_candidate(job_id, name, email, resume_url, scoring_result):
+    """Candidate row for a scored resume"""
+    return Candidate(
+        job_id=job_id,
+        user_name=name,
+        user_email=email,
+        resume_url=resume_url,
+        parameter_score=scoring_result["Parameter Score"],
+        job_similarity_score=scoring_result["Job Similarity Score"],
+        github_score=scoring_result["GitHub Score"],
+        total_score=scoring_result["Total Score"]
+    )
+
+
+def create_submission(db, name, email, job_id, resume_url):
+    """Persist a new queued submission and return it"""
+    submission = Submission(
+        job_id=job_id,
+        user_name=name,
+        user_email=email,
+        resume_url=resume_url,
+        stage=STAGE_QUEUED
+    )
+    db.add(submission)
+    db.commit()
+    db.refresh(submission)
+    return submission
+
+
+def _update_leased(db, submission_id, lease, values):
+    """
+    Update a submission only if it is still held under `lease` (the attempts
+    count of this worker's claim); raises LeaseLostError otherwise
+    """
+    updated = (
+        db.query(Submission)
+        .filter(Submission.id == submission_id, Submission.attempts == lease)
+        .update(values, synchronize_session=False)
+    )
+    if updated != 1:
+        raise LeaseLostError(f"Submission {submission_id} was reclaimed by another worker")
+
+
+def _set_stage(db, submission, lease, stage, **fields):
+    """Move a submission to the next stage; also refreshes its lease"""
+    values = {Submission.stage: stage, Submission.updated_at: datetime.utcnow()}
+    values.update({getattr(Submission, name): value for name, value in fields.items()})
+    try:
+        _update_leased(db, submission.id, lease, values)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    db.refresh(submission)
+    logger.debug(f"Submission {submission.id} -> {stage}")
+
+
+def _defer(db, submission, lease, run_at, reason="GitHub rate limit resets", error=None):
+    """
+    Put a submission back in the queue until `run_at` (a Unix timestamp).
+    Waiting for rate-limit budget or scoring capacity is not a failed
+    attempt; a retry after an `error` is.
+    """
+    logger.info(f"Deferring submission {submission.id} until {reason}")
+    values = {Submission.stage: STAGE_QUEUED, Submission.updated_at: datetime.utcfromtimestamp(run_at)}
+    if error is None:
+        values[Submission.attempts] = max(lease - 1, 0)
+    else:
+        values[Submission.error] = error
+    try:
+        _update_leased(db, submission.id, lease, values)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+@contextmanager
+def _heartbeat(submission_id, lease, interval=None):
+    """Keep refreshing a submission's lease while a long stage (extraction, scoring) runs"""
+    interval = SUBMISSION_HEARTBEAT_SECONDS if interval is None else interval
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(interval):
+            db = SessionLocal()
+            try:
+                _update_leased(db, submission_id, lease, {Submission.updated_at: datetime.utcnow()})
+                db.commit()
+            except LeaseLostError:
+                logger.warning(f"Lost the lease on submission {submission_id}")
+                return
+            except Exception as e:
+                db.rollback()
+                logger.error(f"Failed to refresh the lease on submission {submission_id}: {str(e)}")
+            finally:
+                db.close()
+
+    thread = threading.Thread(target=beat, name=f"lease-{submission_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def find_runnable_submissions(limit):
+    """Ids of submissions that are queued or whose worker's lease has expired"""
+    now = datetime.utcnow()
+    stale_before = now - timedelta(seconds=SUBMISSION_LEASE_SECONDS)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(Submission.id)
+            .filter(Submission.stage.notin_(TERMINAL_STAGES))
+            # For queued rows updated_at is the earliest time they may run (see _defer)
+            .filter(
+                ((Submission.stage == STAGE_QUEUED) & (Submission.updated_at <= now))
+                | ((Submission.stage != STAGE_QUEUED) & (Submission.updated_at < stale_before))
+            )
+            .order_by(Submission.id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+    finally:
+        db.close()
+
+
+def claim_submission(submission_id):
+    """
+    Atomically take ownership of a submission.
+
+    Uses a compare-and-set on (stage, updated_at) so that several worker
+    processes polling the same database never process a row twice.
+    Returns True if this worker now owns the submission.
+    """
+    db = SessionLocal()
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if not submission or submission.stage in TERMINAL_STAGES:
+            return False
+
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=SUBMISSION_LEASE_SECONDS)
+        if submission.stage != STAGE_QUEUED and submission.updated_at and submission.updated_at >= stale_before:
+            return False  # Another worker holds a live lease
+        if submission.stage == STAGE_QUEUED and submission.updated_at and submission.updated_at > now:
+            return False  # Deferred until later
+
+        if submission.attempts >= SUBMISSION_MAX_ATTEMPTS:
+            try:
+                _set_stage(db, submission, submission.attempts, STAGE_FAILED,
+                           error=submission.error or f"Gave up after {submission.attempts} attempts")
+            except LeaseLostError:
+                pass
+            return False
+
+        # Leaving "queued" marks fresh work as taken; recovered work keeps its stage
+        next_stage = STAGE_EXTRACTING if submission.stage == STAGE_QUEUED else submission.stage
+        claimed = (
+            db.query(Submission)
+            .filter(
+                Submission.id == submission.id,
+                Submission.stage == submission.stage,
+                Submission.updated_at == submission.updated_at
+            )
+            .update(
+                {
+                    Submission.stage: next_stage,
+                    Submission.updated_at: datetime.utcnow(),
+                    Submission.attempts: Submission.attempts + 1
+                },
+                synchronize_session=False
+            )
+        )
+        db.commit()
+        return claimed == 1
+    finally:
+        db.close()
+
+
+def process_submission(submission_id):
+    """
+    Run the remaining pipeline stages for a claimed submission.
+
+    Each stage's output is committed before the next starts, so a
+    submission recovered after a crash resumes where it stopped instead of
+    paying for the Ollama call again.
+    """
+    db = SessionLocal()
+    submission = lease = None
+    try:
+        submission = db.query(Submission).filter(Submission.id == submission_id).first()
+        if not submission or submission.stage in TERMINAL_STAGES:
+            return
+        # claim_submission() counted this claim; a reclaim by another worker counts again
+        lease = submission.attempts
+
+        job = db.query(JobDetails).filter(JobDetails.job_id == submission.job_id).first()
+        if not job:
+            _set_stage(db, submission, lease, STAGE_FAILED, error=f"Job with ID {submission.job_id} not found")
+            return
+
+        if submission.evaluation is None:
+            _set_stage(db, submission, lease, STAGE_EXTRACTING)
+            with _heartbeat(submission_id, lease):
+                with open(get_file_path(submission.resume_url), "rb") as f:
+                    text_content, links = extract_with_cache(f.read())
+
+            _set_stage(db, submission, lease, STAGE_SCORING)
+            try:
+                # Waiting for an Ollama slot can outlast the lease, so keep it alive
+                with _heartbeat(submission_id, lease):
+                    scoring_result = score_resume(
+                        text_content, get_profile(job).description, links, job=job, defer_github=True
+                    )
+            except GitHubRateLimitError as e:
+                _defer(db, submission, lease, e.reset_at)
+                return
+            except OllamaOverloadedError as e:
+                _defer(db, submission, lease, time.time() + e.retry_after, reason="the scoring queue drains")
+                return
+            _set_stage(db, submission, lease, STAGE_STORING, evaluation=json.dumps(scoring_result))
+
+        scoring_result = json.loads(submission.evaluation)
+
+        if submission.candidate_id is None:
+            job_id, name, email, resume_url = (
+                job.job_id, submission.user_name, submission.user_email, submission.resume_url
+            )
+
+            def store(writer_db):
+                # Candidate row and stage change commit together, in the writer's group
+                added = build_candidate(job_id, name, email, resume_url, scoring_result)
+                writer_db.add(added)
+                writer_db.flush()
+                record_candidates(writer_db, [added])
+                # Raising rolls back the candidate too if another worker took over
+                _update_leased(writer_db, submission_id, lease, {
+                    Submission.stage: STAGE_NOTIFYING,
+                    Submission.updated_at: datetime.utcnow(),
+                    Submission.candidate_id: added.id
+                })
+
+            try:
+                candidate_writer.run(store)
+            except IntegrityError as e:
+                _set_stage(db, submission, lease, STAGE_FAILED, error=f"Failed to store in database: {str(e)}")
+                return
+            db.refresh(submission)
+            logger.debug(f"Submission {submission.id} -> {STAGE_NOTIFYING}")
+        else:
+            _set_stage(db, submission, lease, STAGE_NOTIFYING)
+
+        notify_candidate(submission.user_name, submission.user_email, job.job_title, scoring_result)
+        # Clear the error of an earlier, retried attempt
+        _set_stage(db, submission, lease, STAGE_COMPLETED, error=None)
+
+    except LeaseLostError as e:
+        # The worker that reclaimed the submission finishes it
+        logger.warning(str(e))
+    except Exception as e:
+        logger.error(f"Error processing submission {submission_id}: {str(e)}")
+        db.rollback()
+        if lease is not None:
+            _fail_or_retry(db, submission, lease, e)
+    finally:
+        db.close()
+
+
+def _fail_or_retry(db, submission, lease, error):
+    """Queue a retry after a transient error; fail once the upload is unusable or attempts are used up"""
+    message = f"Failed to process resume: {str(error)}"
+    try:
+        if isinstance(error, PERMANENT_ERRORS) or lease >= SUBMISSION_MAX_ATTEMPTS:
+            _set_stage(db, submission, lease, STAGE_FAILED, error=message)
+        else:
+            delay = SUBMISSION_RETRY_SECONDS * 2 ** (lease - 1)
+            _defer(db, submission, lease, time.time() + delay, reason=f"retry in {delay:.0f}s", error=message)
+    except LeaseLostError as e:
+        logger.warning(str(e))
+
+
+class SubmissionWorkerPool:
+    """
+    Thread pool that claims submissions from the database and runs them.
+
+    A poller thread dispatches only as many claims as there are free
+    workers, so a row is never held in a local backlog long enough for its
+    lease to expire.
+    """
+
+    def __init__(self, workers=SUBMISSION_WORKERS, poll_interval=SUBMISSION_POLL_SECONDS):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="submission")
+        self._slots = threading.BoundedSemaphore(workers)
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._poll_loop, name="submission-poller", daemon=True)
+        self._thread.start()
+        logger.info(f"Submission worker pool started with {self.workers} workers")
+
+    def stop(self, wait=True):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+        self._executor.shutdown(wait=wait)
+
+    def notify(self):
+        """Wake the poller, e.g. right after a new submission was queued"""
+        self._wake.set()
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            try:
+                self._dispatch()
+            except Exception as e:
+                logger.error(f"Submission poller error: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def _dispatch(self):
+        for submission_id in find_runnable_submissions(limit=self.workers * 2):
+            if not self._slots.acquire(blocking=False):
+                return
+            if not claim_submission(submission_id):
+                self._slots.release()
+                continue
+            future = self._executor.submit(process_submission, submission_id)
+            future.add_done_callback(self._on_done)
+
+    def _on_done(self, _future):
+        self._slots.release()
+        self._wake.set()
+
+
+# Standalone worker process: scales scoring separately from request intake
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    pool = SubmissionWorkerPool(workers=max(SUBMISSION_WORKERS, 1))
+    pool.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping submission workers...")
+        pool.stop()
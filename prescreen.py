@@ -0,0 +1,123 @@
+"""
+Two-stage scoring cascade.
+
+A cheap local first stage estimates the total score from BM25 similarity
+to the job and structural checks on the extracted text. Clear rejects and
+clear accepts are decided on that estimate; only resumes whose estimate
+falls into the job's uncertainty band around the pass threshold are sent
+to the LLM. GitHub links are only counted, not checked, so they count
+against a reject but never toward an accept.
+"""
+
+import logging
+import os
+import re
+
+from dotenv import load_dotenv
+
+import metrics
+from local_scorer import MAX_SIMILARITY, similarity_score
+from models import SessionLocal, JobScreening
+from prompt_compaction import normalize_text, split_sections
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Set SCORING_CASCADE_ENABLED=true to pre-screen resumes before the LLM
+SCORING_CASCADE_ENABLED = os.getenv("SCORING_CASCADE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Default band for jobs without a job_screening row; estimates in [reject_below, accept_above) go to the LLM
+CASCADE_REJECT_BELOW = int(os.getenv("CASCADE_REJECT_BELOW", "40"))
+CASCADE_ACCEPT_ABOVE = int(os.getenv("CASCADE_ACCEPT_ABOVE", "90"))
+
+DECISION_ACCEPT = "accept"
+DECISION_REJECT = "reject"
+DECISION_ESCALATE = "escalate"
+
+# Quantified achievements: percentages, money, multipliers and larger numbers
+QUANTIFIED_PATTERN = re.compile(r"\d+(\.\d+)?\s*%|[$€£]\s?\d|\b\d+(\.\d+)?\s*[kmb]\b|\b\d+x\b|\b\d{2,}\b", re.IGNORECASE)
+# Resumes shorter than this are treated as thin on format and language
+MIN_RESUME_WORDS = 150
+
+
+def get_thresholds(job_id):
+    """(reject_below, accept_above) for a job, falling back to the configured defaults"""
+    db = SessionLocal()
+    try:
+        screening = db.query(JobScreening).filter(JobScreening.job_id == job_id).first()
+        if screening is not None:
+            return screening.reject_below, screening.accept_above
+    except Exception as e:
+        logger.error(f"Failed to load screening thresholds for job {job_id}: {str(e)}")
+    finally:
+        db.close()
+    return CASCADE_REJECT_BELOW, CASCADE_ACCEPT_ABOVE
+
+
+def set_thresholds(db, job_id, reject_below, accept_above):
+    """Create or update a job's thresholds; returns the JobScreening row"""
+    screening = db.merge(JobScreening(job_id=job_id, reject_below=reject_below, accept_above=accept_above))
+    db.commit()
+    return screening
+
+
+def estimate_scores(resume_text, job_description, links, vector=None):
+    """Local estimate of the seven scores the LLM would return; `vector` is the job's compiled JobVector"""
+    lines = normalize_text(resume_text)
+    words = sum(len(line.split()) for line in lines)
+    headings = sum(1 for heading, _ in split_sections(lines) if heading)
+    quantified = sum(1 for line in lines if QUANTIFIED_PATTERN.search(line))
+    github_links = {link.rstrip("/").lower() for link in links or [] if "github.com/" in link.lower()}
+
+    similarity = vector.score(resume_text) if vector is not None else similarity_score(resume_text, job_description)
+    scores = {
+        "IMPACT": min(5, 1 + quantified // 2),
+        "FORMAT": min(5, 1 + headings) if words >= MIN_RESUME_WORDS else min(2, 1 + headings),
+        "LANGUAGE": 3 if words >= MIN_RESUME_WORDS else 2,  # Not judged locally
+        "SKILLS": round(5 * similarity / MAX_SIMILARITY),
+        "SIMILARITY": similarity,
+        "GITHUB": min(20, 8 * len(github_links))
+    }
+    scores["TOTAL"] = sum(scores.values())
+    return scores
+
+
+def prescreen(resume_text, job_description, links, job_id, vector=None):
+    """
+    First cascade stage. Returns (decision, estimated_scores); the decision
+    is DECISION_ESCALATE when the LLM should score the resume.
+    """
+    scores = estimate_scores(resume_text, job_description, links, vector)
+    reject_below, accept_above = get_thresholds(job_id)
+    # GitHub links are counted but never fetched here. They may keep a resume from a local reject,
+    # but an accept sends an interview invite, so it has to clear the bar with GITHUB at 0
+    unverified = {**scores, "GITHUB": 0, "TOTAL": scores["TOTAL"] - scores["GITHUB"]}
+
+    if scores["TOTAL"] < reject_below:
+        decision = DECISION_REJECT
+    elif unverified["TOTAL"] >= accept_above:
+        decision = DECISION_ACCEPT
+        scores = unverified
+    else:
+        decision = DECISION_ESCALATE
+
+    metrics.increment("cascade.screened")
+    metrics.increment(f"cascade.{decision}")
+    logger.info(f"Pre-screen for job {job_id}: estimated total {scores['TOTAL']} -> {decision}")
+    return decision, scores
+
+
+def cascade_stats():
+    """How many resumes the cascade decided locally, i.e. LLM calls avoided"""
+    screened = metrics.get_counter("cascade.screened")
+    avoided = metrics.get_counter(f"cascade.{DECISION_ACCEPT}") + metrics.get_counter(f"cascade.{DECISION_REJECT}")
+    return {
+        "enabled": SCORING_CASCADE_ENABLED,
+        "screened": screened,
+        "accepted": metrics.get_counter(f"cascade.{DECISION_ACCEPT}"),
+        "rejected": metrics.get_counter(f"cascade.{DECISION_REJECT}"),
+        "escalated": metrics.get_counter(f"cascade.{DECISION_ESCALATE}"),
+        "llm_calls_avoided": avoided,
+        "llm_calls_avoided_rate": round(avoided / screened, 4) if screened else 0.0
+    }
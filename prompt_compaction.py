@@ -0,0 +1,247 @@
+"""
+Prompt compaction for resume scoring.
+
+Raw PyMuPDF text carries repeated page headers and footers, whitespace
+runs and contact blocks, and the GitHub data used to be pasted as indented
+JSON. On CPU inference prompt tokens are the dominant cost, so both are
+normalised, deduplicated and fitted into a token budget before they reach
+the prompt. Truncation is section-aware: every resume section keeps its
+heading and a fair share of the budget instead of the tail being cut off.
+"""
+
+import json
+import logging
+import os
+import re
+import unicodedata
+
+from dotenv import load_dotenv
+
+import metrics
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Set PROMPT_COMPACTION_ENABLED=false to send the raw text
+PROMPT_COMPACTION_ENABLED = os.getenv("PROMPT_COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Approximate token budgets for the resume and the GitHub portfolio
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "1500"))
+GITHUB_TOKEN_BUDGET = int(os.getenv("GITHUB_TOKEN_BUDGET", "600"))
+
+# Words, numbers and single punctuation marks; close to BPE token counts for English text
+TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+# Lines that are only page furniture
+PAGE_NUMBER_PATTERN = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+# Contact details; the links themselves are passed to the scorer separately
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+URL_PATTERN = re.compile(r"(https?://|www\.)\S+|\b(linkedin|github)\.com/\S*", re.IGNORECASE)
+# Digit runs with separators; only those with 9+ digits are phone numbers, not date ranges
+PHONE_PATTERN = re.compile(r"\+?[\d(][\d\s().-]{7,}\d")
+
+# Common resume section headings
+SECTION_HEADINGS = {
+    "summary", "profile", "objective", "about me", "experience", "work experience",
+    "professional experience", "employment", "employment history", "education", "skills",
+    "technical skills", "core competencies", "projects", "personal projects", "certifications",
+    "certificates", "awards", "achievements", "publications", "languages", "interests",
+    "volunteering", "volunteer experience", "activities", "leadership", "references"
+}
+
+TRUNCATION_MARKER = "[...]"
+
+
+def count_tokens(text):
+    """Approximate number of LLM tokens in `text`"""
+    return len(TOKEN_PATTERN.findall(text))
+
+
+def normalize_text(text):
+    """Unicode-normalise and collapse whitespace; returns non-empty stripped lines"""
+    text = unicodedata.normalize("NFKC", text)
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r"\s+", " ", line).strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def _is_contact_line(line):
+    """True if the line is mostly email addresses, phone numbers and URLs"""
+    remainder = EMAIL_PATTERN.sub("", line)
+    remainder = URL_PATTERN.sub("", remainder)
+    remainder = PHONE_PATTERN.sub(
+        lambda match: "" if sum(ch.isdigit() for ch in match.group()) >= 9 else match.group(), remainder
+    )
+    if remainder == line:
+        return False
+    # Whatever is left besides separators, e.g. a city name
+    return len(re.sub(r"[\W_]+", "", remainder)) <= len(line) * 0.3
+
+
+def _signature(line):
+    # Page headers and footers differ only in their page numbers
+    return re.sub(r"\d+", "#", line.lower())
+
+
+def drop_boilerplate(lines):
+    """
+    Remove page numbers, contact lines, page headers/footers (short lines
+    on three or more pages) and exact repeats of long lines such as
+    duplicated bullets. Short repeats, like the same job title at two
+    employers, are kept.
+    """
+    counts = {}
+    for line in lines:
+        counts[_signature(line)] = counts.get(_signature(line), 0) + 1
+
+    seen = set()
+    kept = []
+    for line in lines:
+        if PAGE_NUMBER_PATTERN.match(line) or _is_contact_line(line):
+            continue
+        if len(line) <= 60 and counts[_signature(line)] >= 3 and line.strip(" :").lower() not in SECTION_HEADINGS:
+            continue
+        if len(line) >= 40 and line.lower() in seen:
+            continue
+        seen.add(line.lower())
+        kept.append(line)
+    return kept
+
+
+def _is_heading(line):
+    stripped = line.strip(" :").lower()
+    if stripped in SECTION_HEADINGS:
+        return True
+    # Short all-caps lines such as "WORK HISTORY", but not skill lists like "AWS, GCP" or "SQL"
+    letters = sum(ch.isalpha() for ch in line)
+    return line.isupper() and len(line.split()) <= 4 and letters >= 4 and not re.search(r"[\d,/|]", line)
+
+
+def split_sections(lines):
+    """Group lines into (heading, body_lines) sections; text before the first heading has heading None"""
+    sections = [(None, [])]
+    for line in lines:
+        if _is_heading(line):
+            sections.append((line, []))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, body) for heading, body in sections if heading or body]
+
+
+def _allocate(sizes, budget):
+    """Water-filling: every section gets up to an equal share, and unused share goes to the larger ones"""
+    allocation = [0] * len(sizes)
+    remaining = budget
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i])
+    for position, index in enumerate(order):
+        share = remaining // (len(sizes) - position)
+        allocation[index] = min(sizes[index], share)
+        remaining -= allocation[index]
+    return allocation
+
+
+def _truncate_lines(lines, budget):
+    """Keep leading lines within `budget` tokens, cutting the last one at a word boundary"""
+    kept = []
+    used = 0
+    for line in lines:
+        tokens = count_tokens(line)
+        if used + tokens <= budget:
+            kept.append(line)
+            used += tokens
+            continue
+        words = []
+        for word in line.split():
+            if used + count_tokens(" ".join(words + [word])) > budget:
+                break
+            words.append(word)
+        if words:
+            kept.append(" ".join(words))
+        kept.append(TRUNCATION_MARKER)
+        break
+    return kept
+
+
+def fit_sections(sections, budget):
+    """Truncate section bodies so the whole resume fits in `budget` tokens, keeping every heading"""
+    heading_tokens = sum(count_tokens(heading) for heading, _ in sections if heading)
+    sizes = [sum(count_tokens(line) for line in body) for _, body in sections]
+    if heading_tokens + sum(sizes) <= budget:
+        return sections
+
+    allocation = _allocate(sizes, max(budget - heading_tokens, 0))
+    return [
+        (heading, body if share >= size else _truncate_lines(body, share))
+        for (heading, body), size, share in zip(sections, sizes, allocation)
+    ]
+
+
+def compact_resume(text, budget=RESUME_TOKEN_BUDGET):
+    """Normalised, deduplicated resume text fitted into `budget` tokens"""
+    if not PROMPT_COMPACTION_ENABLED:
+        return text
+
+    sections = fit_sections(split_sections(drop_boilerplate(normalize_text(text))), budget)
+    lines = []
+    for heading, body in sections:
+        if heading:
+            lines.append(heading)
+        lines.extend(body)
+    compacted = "\n".join(lines)
+
+    before, after = count_tokens(text), count_tokens(compacted)
+    metrics.increment("prompt.resume_tokens_before", before)
+    metrics.increment("prompt.resume_tokens_after", after)
+    logger.info(f"Compacted resume from ~{before} to ~{after} tokens (budget {budget})")
+    return compacted
+
+
+def _without_empty(value):
+    """Drop None, empty strings and empty collections from nested dicts and lists"""
+    if isinstance(value, dict):
+        value = {key: _without_empty(item) for key, item in value.items()}
+        return {key: item for key, item in value.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        return [_without_empty(item) for item in value]
+    return value
+
+
+def compact_github_data(github_data, budget=GITHUB_TOKEN_BUDGET):
+    """
+    Minified JSON of the GitHub data within `budget` tokens.
+
+    READMEs are shortened first (they are the bulk of the payload), then the
+    last projects are dropped.
+    """
+    if not PROMPT_COMPACTION_ENABLED:
+        return json.dumps(github_data, indent=2)
+
+    data = _without_empty(json.loads(json.dumps(github_data)))
+    before = count_tokens(json.dumps(github_data, indent=2))
+
+    def render():
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    readme_chars = 500
+    while count_tokens(render()) > budget and readme_chars > 0:
+        readme_chars = readme_chars // 2 if readme_chars > 50 else 0
+        for item in data.get("profiles", []) + data.get("projects", []):
+            for key in ("readme", "profile_readme"):
+                if key in item:
+                    item[key] = item[key][:readme_chars]
+                    if not item[key]:
+                        del item[key]
+
+    while count_tokens(render()) > budget and data.get("projects"):
+        data["projects"].pop()
+
+    compacted = render()
+    after = count_tokens(compacted)
+    metrics.increment("prompt.github_tokens_before", before)
+    metrics.increment("prompt.github_tokens_after", after)
+    logger.info(f"Compacted GitHub data from ~{before} to ~{after} tokens (budget {budget})")
+    return compacted
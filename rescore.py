@@ -0,0 +1,253 @@
+"""
+Bulk re-scoring of a job's candidates.
+
+Editing a JobDetails row leaves the stored scores of its candidates stale.
+A rescore run walks the job's candidates in id order, scores each stored
+resume again on a small worker pool and writes every batch of results in
+one transaction together with the run's checkpoint, so an interrupted run
+resumes after the last committed batch:
+
+    python rescore.py <job_id> [--workers 2] [--batch-size 20] [--restart]
+
+Ollama calls go through ollama_scheduler at batch priority, so interactive
+submissions are still served first while a run is in progress.
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from sqlalchemy import update
+
+import metrics
+from models import SessionLocal, create_tables, Candidate, JobDetails, RescoreRun
+from file_storage import get_file_path
+from extraction_cache import extract_with_cache
+from agents import OLLAMA_MAX_PARALLEL, PRIORITY_BATCH, OllamaOverloadedError, score_resume
+from github_client import GitHubRateLimitError
+from job_profile import get_profile
+from job_stats import SCORE_COLUMNS, record_rescores
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Resumes scored concurrently; more than OLLAMA_MAX_PARALLEL would only wait in the Ollama queue
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", str(OLLAMA_MAX_PARALLEL)))
+# Candidates scored and committed per transaction (also the checkpoint granularity)
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "20"))
+
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+STATUS_SUPERSEDED = "superseded"
+
+# Jobs with a run in progress in this process
+_active_jobs = set()
+_active_lock = threading.Lock()
+
+
+def score_in_batch(text_content, links, job, job_description, fallback=True):
+    """score_resume() at batch priority, waiting out GitHub rate limits and a full Ollama queue"""
+    while True:
+        try:
+            return score_resume(
+                text_content, job_description, links, job=job, defer_github=True, priority=PRIORITY_BATCH,
+                fallback=fallback
+            )
+        except GitHubRateLimitError as e:
+            # Bulk work can afford to wait for the reset rather than drop the GitHub score
+            wait = max(e.reset_at - time.time(), 1)
+            logger.info(f"Waiting {wait:.0f}s for the GitHub rate limit to reset")
+            time.sleep(wait)
+        except OllamaOverloadedError as e:
+            time.sleep(e.retry_after)
+
+
+def rescore_candidate(candidate_id, resume_url, job, job_description):
+    """Score one stored resume against the job; returns the score_resume() result"""
+    with open(get_file_path(resume_url), "rb") as f:
+        text_content, links = extract_with_cache(f.read())
+    result = score_in_batch(text_content, links, job, job_description, fallback=False)
+    if result is None:
+        # Default scores would overwrite the candidate's real ones
+        raise RuntimeError("The model was unavailable or its reply could not be parsed")
+    return result
+
+
+def _open_run(db, job, restart):
+    """Resume the job's unfinished run for this job revision, or start a new one"""
+    fingerprint = job.fingerprint()
+    run = latest_run(db, job.job_id)
+    if run is not None and run.status == STATUS_COMPLETED:
+        run = None
+    elif run is not None and (restart or run.job_fingerprint != fingerprint):
+        # Scores committed before the job was edited again are stale too, so start over
+        run.status = STATUS_SUPERSEDED
+        run = None
+
+    if run is None:
+        run = RescoreRun(job_id=job.job_id, job_fingerprint=fingerprint, status=STATUS_RUNNING)
+        db.add(run)
+    else:
+        logger.info(f"Resuming rescore run {run.id} for job {job.job_id} after candidate {run.last_candidate_id}")
+        run.status = STATUS_RUNNING
+        run.error = None
+
+    run.total = db.query(Candidate).filter(Candidate.job_id == job.job_id).count()
+    db.commit()
+    return run
+
+
+def _reserve(job_id):
+    """Mark a job as being rescored by this process; raises RuntimeError if it already is"""
+    with _active_lock:
+        if job_id in _active_jobs:
+            raise RuntimeError(f"A rescore of job {job_id} is already running")
+        _active_jobs.add(job_id)
+
+
+def rescore_job(job_id, workers=RESCORE_WORKERS, batch_size=RESCORE_BATCH_SIZE, restart=False, reserved=False):
+    """
+    Re-score every candidate of a job from their stored resumes.
+
+    Returns the RescoreRun as a dict. Candidates whose resume can't be read
+    or scored by the model keep their old scores and are counted as failed;
+    fallback scores never overwrite them. `reserved` means the caller has
+    already reserved the job with _reserve(); the reservation is released
+    when the run ends either way.
+    """
+    if not reserved:
+        _reserve(job_id)
+
+    db = SessionLocal()
+    run = None
+    try:
+        job = db.query(JobDetails).filter(JobDetails.job_id == job_id).first()
+        if not job:
+            raise ValueError(f"Job with ID {job_id} not found")
+        # Workers read the job while this session commits batches, which would expire it
+        db.expunge(job)
+
+        job_description = get_profile(job).description
+        run = _open_run(db, job, restart)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rescore") as executor:
+            while True:
+                batch = (
+                    db.query(Candidate.id, Candidate.resume_url,
+                             *(getattr(Candidate, column) for column in SCORE_COLUMNS))
+                    .filter(Candidate.job_id == job_id, Candidate.id > run.last_candidate_id)
+                    .order_by(Candidate.id)
+                    .limit(batch_size)
+                    .all()
+                )
+                if not batch:
+                    break
+
+                start = time.perf_counter()
+                futures = [
+                    (row, executor.submit(rescore_candidate, row.id, row.resume_url, job, job_description))
+                    for row in batch
+                ]
+                updates, changes, failed = [], [], 0
+                for row, future in futures:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"Failed to rescore candidate {row.id}: {str(e)}")
+                        failed += 1
+                        continue
+                    updates.append({
+                        "id": row.id,
+                        "parameter_score": result["Parameter Score"],
+                        "job_similarity_score": result["Job Similarity Score"],
+                        "github_score": result["GitHub Score"],
+                        "total_score": result["Total Score"]
+                    })
+                    changes.append((row._mapping, updates[-1]))
+                elapsed = time.perf_counter() - start
+
+                # Scores, job stats and checkpoint commit together, so a crash never skips or repeats a batch
+                if updates:
+                    db.execute(update(Candidate), updates)
+                    record_rescores(db, job_id, changes)
+                run.last_candidate_id = batch[-1].id
+                run.processed += len(updates)
+                run.failed += failed
+                run.elapsed_seconds += elapsed
+                db.commit()
+
+                metrics.increment("rescore.resumes", len(updates))
+                metrics.increment("rescore.failures", failed)
+                metrics.observe("rescore.batch_seconds", elapsed)
+                progress = run.to_dict()
+                metrics.set_gauge("rescore.resumes_per_minute", progress["resumes_per_minute"])
+                print(f"Rescore job {job_id}: {run.processed + run.failed}/{run.total} candidates, "
+                      f"{progress['resumes_per_minute']} resumes/minute")
+
+        run.status = STATUS_COMPLETED
+        db.commit()
+        return run.to_dict()
+
+    except Exception as e:
+        db.rollback()
+        if run is not None:
+            run.status = STATUS_FAILED
+            run.error = str(e)
+            db.commit()
+        raise
+    finally:
+        db.close()
+        with _active_lock:
+            _active_jobs.discard(job_id)
+
+
+def start_rescore(job_id, restart=False):
+    """
+    Run rescore_job() on a background thread (for the admin endpoint).
+
+    The job is reserved before the thread starts, so a concurrent call
+    raises RuntimeError here instead of starting a thread that fails.
+    """
+    _reserve(job_id)
+
+    def run():
+        try:
+            rescore_job(job_id, restart=restart, reserved=True)
+        except Exception as e:
+            logger.error(f"Rescore of job {job_id} failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name=f"rescore-{job_id}", daemon=True)
+    try:
+        thread.start()
+    except Exception:
+        with _active_lock:
+            _active_jobs.discard(job_id)
+        raise
+    return thread
+
+
+def latest_run(db, job_id):
+    """Most recent RescoreRun of a job, or None"""
+    return db.query(RescoreRun).filter(RescoreRun.job_id == job_id).order_by(RescoreRun.id.desc()).first()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score all candidates of a job from their stored resumes")
+    parser.add_argument("job_id", type=int)
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=RESCORE_BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint of an unfinished run")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    create_tables()
+    summary = rescore_job(args.job_id, workers=args.workers, batch_size=args.batch_size, restart=args.restart)
+    print(f"Rescored {summary['processed']} of {summary['total']} candidates "
+          f"({summary['failed']} failed) at {summary['resumes_per_minute']} resumes/minute")
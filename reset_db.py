@@ -8,11 +8,25 @@ import os
 import shutil
 from pathlib import Path
 
+from sqlalchemy.engine import make_url
+
+from db_engine import DATABASE_URL
+
 # Remove existing database
-db_file = Path('database/resume_scorer.db')
-if db_file.exists():
-    os.remove(db_file)
-    print("Removed existing database")
+url = make_url(DATABASE_URL)
+if url.get_backend_name() == "sqlite" and url.database:
+    db_file = Path(url.database)
+    if db_file.exists():
+        os.remove(db_file)
+        print("Removed existing database")
+    # WAL mode's side files belong to the removed database
+    for suffix in ("-wal", "-shm"):
+        Path(f"{url.database}{suffix}").unlink(missing_ok=True)
+elif url.get_backend_name() != "sqlite":
+    # Server databases (e.g. PostgreSQL) keep the database and drop the app's tables
+    from models import Base, engine
+    Base.metadata.drop_all(bind=engine)
+    print("Dropped existing tables")
 
 # Initialize database
 from init_db import create_tables, seed_job_details
@@ -0,0 +1,117 @@
+"""
+Persistent cache of LLM scoring results.
+
+Retries, re-submissions and bulk rescoring send the same resume against
+the same job again. Results are keyed on the resume text (and links), the
+job id plus a hash of the job's fields, the model and the prompt version,
+so editing a job or the prompt naturally misses the old entries.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+
+import metrics
+from models import SessionLocal, ScoreCache
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Set SCORE_CACHE_ENABLED=false to always call the model
+SCORE_CACHE_ENABLED = os.getenv("SCORE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Least recently used entries beyond this count are evicted
+SCORE_CACHE_MAX_ENTRIES = int(os.getenv("SCORE_CACHE_MAX_ENTRIES", "50000"))
+
+
+def score_cache_key(resume_text, links, job_id, job_fingerprint, model_name, prompt_version):
+    """Cache key for one (resume, job revision, model, prompt version) combination"""
+    resume_hash = hashlib.sha256(
+        json.dumps([resume_text, list(links or [])]).encode("utf-8")
+    ).hexdigest()
+    parts = [resume_hash, job_id, job_fingerprint, model_name, prompt_version]
+    return hashlib.sha256(json.dumps(parts).encode("utf-8")).hexdigest()
+
+
+def get_cached_score(cache_key):
+    """Return the cached evaluation dict, or None on a miss"""
+    if not SCORE_CACHE_ENABLED:
+        return None
+
+    metrics.increment("score_cache.lookups")
+    db = SessionLocal()
+    try:
+        entry = db.query(ScoreCache).filter(ScoreCache.cache_key == cache_key).first()
+        if entry is None:
+            metrics.increment("score_cache.misses")
+            return None
+
+        entry.hit_count += 1
+        entry.last_used_at = datetime.utcnow()
+        db.commit()
+        metrics.increment("score_cache.hits")
+        return json.loads(entry.evaluation)
+    except Exception as e:
+        logger.error(f"Score cache lookup failed: {str(e)}")
+        return None
+    finally:
+        db.close()
+
+
+def store_score(cache_key, job_id, model_name, prompt_version, evaluation):
+    """Remember an evaluation produced by the model"""
+    if not SCORE_CACHE_ENABLED:
+        return
+
+    db = SessionLocal()
+    try:
+        db.merge(ScoreCache(
+            cache_key=cache_key,
+            job_id=job_id,
+            model_name=model_name,
+            prompt_version=prompt_version,
+            evaluation=json.dumps(evaluation),
+            last_used_at=datetime.utcnow()
+        ))
+        db.commit()
+        _evict(db)
+    except Exception as e:
+        # A failed cache write must never fail the submission
+        db.rollback()
+        logger.error(f"Failed to cache score: {str(e)}")
+    finally:
+        db.close()
+
+
+def _evict(db):
+    """Delete least recently used entries beyond SCORE_CACHE_MAX_ENTRIES"""
+    entries = db.query(func.count(ScoreCache.cache_key)).scalar()
+    excess = entries - SCORE_CACHE_MAX_ENTRIES
+    if excess > 0:
+        victims = [
+            row.cache_key
+            for row in db.query(ScoreCache.cache_key).order_by(ScoreCache.last_used_at).limit(excess)
+        ]
+        db.query(ScoreCache).filter(ScoreCache.cache_key.in_(victims)).delete(synchronize_session=False)
+        db.commit()
+        metrics.increment("score_cache.evictions", len(victims))
+        entries -= len(victims)
+    metrics.set_gauge("score_cache.entries", entries)
+
+
+def cache_stats():
+    """Hit/miss counters of the scoring cache"""
+    return {
+        "enabled": SCORE_CACHE_ENABLED,
+        "hits": metrics.get_counter("score_cache.hits"),
+        "misses": metrics.get_counter("score_cache.misses"),
+        "hit_rate": metrics.ratio("score_cache.hits", "score_cache.lookups"),
+        "evictions": metrics.get_counter("score_cache.evictions"),
+        "max_entries": SCORE_CACHE_MAX_ENTRIES
+    }
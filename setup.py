@@ -3,7 +3,7 @@
 Setup script for Resume Scorer
 
 This script initializes all required components:
-1. Creates the SQLite database and tables
+1. Creates the database tables (SQLite unless DATABASE_URL names another database)
 2. Creates required directories
 3. Seeds initial data
 """
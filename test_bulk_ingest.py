@@ -0,0 +1,124 @@
+import zipfile
+
+import fitz
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import bulk_ingest
+from models import Base, Candidate, JobDetails
+from pdf_extraction import extract_pdf_content
+
+SCORES = {"Parameter Score": 12, "Job Similarity Score": 45, "GitHub Score": 8, "Total Score": 65}
+
+
+def make_pdf(text):
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+@pytest.fixture
+def session_factory(monkeypatch, tmp_path):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(bulk_ingest, "SessionLocal", factory)
+    monkeypatch.setattr(bulk_ingest, "extract_with_cache", extract_pdf_content)
+    monkeypatch.setattr(bulk_ingest, "score_in_batch", lambda *args: SCORES)
+    monkeypatch.setattr(bulk_ingest, "save_file_bytes",
+                        lambda content, name: (str(tmp_path / name), f"/uploads/{name}"))
+
+    db = factory()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.add(Candidate(job_id=1, user_name="Known", user_email="known@example.com", resume_url="/uploads/k.pdf"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_zip_ingest_reports_every_file(session_factory, tmp_path):
+    """Test a zip is ingested in batches with duplicates and unreadable resumes reported per file"""
+    archive_path = tmp_path / "fair.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("jane.pdf", make_pdf("Jane Doe\njane.doe@example.com\nPython developer"))
+        archive.writestr("jane_again.pdf", make_pdf("Jane Doe\nJane.Doe@example.com\nPython developer"))
+        archive.writestr("known.pdf", make_pdf("Known Person\nknown@example.com"))
+        archive.writestr("anon.pdf", make_pdf("Python developer, no contact details"))
+        archive.writestr("john_smith.pdf", make_pdf("SUMMARY OF SKILLS AND PROJECTS HERE\njohn@example.org"))
+        archive.writestr("notes.txt", "not a resume")
+
+    summary = bulk_ingest.BulkIngest(1, workers=1, batch_size=2).run([str(archive_path)])
+
+    statuses = {entry["file"]: entry["status"] for entry in summary["report"]}
+    assert statuses == {
+        "jane.pdf": "ingested",
+        "jane_again.pdf": "duplicate",
+        "known.pdf": "duplicate",
+        "anon.pdf": "failed",
+        "john_smith.pdf": "ingested"
+    }
+    assert (summary["ingested"], summary["duplicate"], summary["failed"]) == (2, 2, 1)
+
+    db = session_factory()
+    names = {c.user_email: c.user_name for c in db.query(Candidate).filter(Candidate.user_email != "known@example.com")}
+    assert names == {"jane.doe@example.com": "Jane Doe", "john@example.org": "John Smith"}
+    db.close()
+
+
+def test_emails_match_stored_candidates_whatever_their_case(session_factory, tmp_path):
+    """Test a resume is a duplicate of a candidate stored with a differently cased email"""
+    db = session_factory()
+    db.add(Candidate(job_id=1, user_name="Mixed", user_email="Mixed.Case@Example.com", resume_url="/uploads/m.pdf"))
+    db.commit()
+    db.close()
+    resume = tmp_path / "mixed.pdf"
+    resume.write_bytes(make_pdf("Mixed Case\nmixed.case@example.com"))
+
+    summary = bulk_ingest.BulkIngest(1, workers=1).run([str(resume)])
+    assert [(entry["status"], entry["email"]) for entry in summary["report"]] == [
+        ("duplicate", "mixed.case@example.com")
+    ]
+
+
+def test_resume_files_are_never_shared_or_left_behind(session_factory, tmp_path, monkeypatch):
+    """Test each resume gets its own file name, and the file of a candidate lost to a race is deleted"""
+    saved, deleted = [], []
+    monkeypatch.setattr(bulk_ingest, "save_file_bytes",
+                        lambda content, name: saved.append(name) or (str(tmp_path / name), f"/uploads/{name}"))
+    monkeypatch.setattr(bulk_ingest, "delete_file", deleted.append)
+
+    def score_while_applicant_submits(text_content, *args):
+        # The same applicant applies through /submit-resume while their resume is being scored
+        if "late@example.com" in text_content:
+            db = session_factory()
+            db.add(Candidate(job_id=1, user_name="Late", user_email="late@example.com",
+                             resume_url="/uploads/late@example.com_resume.pdf"))
+            db.commit()
+            db.close()
+        return SCORES
+
+    monkeypatch.setattr(bulk_ingest, "score_in_batch", score_while_applicant_submits)
+    for name in ("late", "ok"):
+        (tmp_path / f"{name}.pdf").write_bytes(make_pdf(f"Some One\n{name}@example.com"))
+
+    summary = bulk_ingest.BulkIngest(1, workers=1).run([str(tmp_path / "late.pdf"), str(tmp_path / "ok.pdf")])
+
+    assert {entry["file"]: entry["status"] for entry in summary["report"]} == {
+        "late.pdf": "duplicate", "ok.pdf": "ingested"
+    }
+    assert len(saved) == 2 and "late@example.com_resume.pdf" not in saved
+    assert deleted == [f"/uploads/{saved[0]}"]
+
+
+def test_finished_ingests_are_forgotten_after_retention(monkeypatch):
+    """Test the in-memory registry of API ingests drops finished ones once they expire"""
+    monkeypatch.setattr(bulk_ingest, "_ingests", {})
+    old, running = bulk_ingest.BulkIngest(1), bulk_ingest.BulkIngest(1)
+    old.finished_at = 0
+    bulk_ingest._ingests.update({old.id: old, running.id: running})
+
+    assert bulk_ingest.get_ingest(old.id) is None
+    assert bulk_ingest.get_ingest(running.id) is running
@@ -0,0 +1,125 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from candidate_listing import CursorError, list_candidates, list_candidates_async
+from db_engine import create_configured_async_engine, create_configured_engine
+from models import Base, Candidate, JobDetails
+
+START = datetime(2025, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    # Scores repeat so ties are broken by id; created_at repeats too
+    session.add_all(
+        Candidate(job_id=1 + i % 2, user_name=f"c{i}", user_email=f"c{i}@example.com", resume_url="/uploads/c.pdf",
+                  total_score=float(i % 7 * 10), created_at=START + timedelta(hours=i // 3))
+        for i in range(40)
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+def collect(db, **kwargs):
+    items, cursor = [], None
+    while True:
+        page = list_candidates(db, cursor=cursor, **kwargs)
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return items
+
+
+@pytest.mark.parametrize("sort,order", [("total_score", "desc"), ("total_score", "asc"), ("created_at", "desc")])
+def test_pages_cover_every_row_once_in_order(db, sort, order):
+    """Test keyset pages match a single ordered query, ties included"""
+    items = collect(db, limit=7, sort=sort, order=order, job_id=1, min_score=10)
+
+    expected = (
+        db.query(Candidate).filter(Candidate.job_id == 1, Candidate.total_score >= 10)
+        .order_by(getattr(Candidate, sort).desc() if order == "desc" else getattr(Candidate, sort),
+                  Candidate.id.desc() if order == "desc" else Candidate.id)
+        .all()
+    )
+    assert [item["id"] for item in items] == [candidate.id for candidate in expected]
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+def test_rows_without_created_at_are_listed_last(db, order):
+    """Test candidates with a NULL created_at are paged after the dated ones instead of dropped"""
+    db.add_all(Candidate(job_id=1, user_name=f"n{i}", user_email=f"n{i}@example.com", resume_url="/uploads/n.pdf")
+               for i in range(5))
+    db.flush()
+    # The column default fills in an explicit None, so clear it like rows written before the column existed
+    db.query(Candidate).filter(Candidate.user_name.like("n%")).update({Candidate.created_at: None})
+    db.commit()
+
+    # Page size 3 makes pages end both between the two groups and on a NULL row
+    items = collect(db, limit=3, sort="created_at", order=order, job_id=1)
+
+    dated = (
+        db.query(Candidate).filter(Candidate.job_id == 1, Candidate.created_at.isnot(None))
+        .order_by(*((Candidate.created_at.desc(), Candidate.id.desc()) if order == "desc"
+                    else (Candidate.created_at, Candidate.id)))
+        .all()
+    )
+    undated = sorted((c.id for c in db.query(Candidate).filter(Candidate.created_at.is_(None))),
+                     reverse=order == "desc")
+    assert len(undated) == 5
+    assert [item["id"] for item in items] == [candidate.id for candidate in dated] + undated
+    assert [item["created_at"] for item in items[-5:]] == [None] * 5
+
+
+def test_field_selection_and_cursor_validation(db):
+    """Test only requested fields are returned and cursors can't switch sort order"""
+    page = list_candidates(db, limit=2, fields="id,total_score", sort="total_score")
+    assert set(page["items"][0]) == {"id", "total_score"}
+
+    with pytest.raises(CursorError):
+        list_candidates(db, cursor=page["next_cursor"], sort="created_at")
+    with pytest.raises(ValueError):
+        list_candidates(db, fields="id,password")
+
+
+def test_async_listing_matches_sync(tmp_path):
+    """Test list_candidates_async() returns the same pages as list_candidates()"""
+    url = f"sqlite:///{tmp_path / 'candidates.db'}"
+    engine = create_configured_engine(url)
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        # The configured engine enforces the candidates -> job_details foreign key
+        session.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                               education_requirement="-", experience_requirement="-"))
+        session.commit()
+        session.add_all(
+            Candidate(job_id=1, user_name=f"c{i}", user_email=f"c{i}@example.com", resume_url="/uploads/c.pdf",
+                      total_score=float(i % 4 * 10))
+            for i in range(12)
+        )
+        session.commit()
+        first = list_candidates(session, limit=5, sort="total_score", fields="id,total_score")
+        second = list_candidates(session, limit=5, sort="total_score", fields="id,total_score",
+                                 cursor=first["next_cursor"])
+
+    async def fetch():
+        async_engine = create_configured_async_engine(url)
+        try:
+            async with async_sessionmaker(async_engine)() as session:
+                page = await list_candidates_async(session, limit=5, sort="total_score", fields="id,total_score")
+                next_page = await list_candidates_async(session, limit=5, sort="total_score", fields="id,total_score",
+                                                        cursor=page["next_cursor"])
+                return page, next_page
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(fetch()) == (first, second)
+    engine.dispose()
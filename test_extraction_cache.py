@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import extraction_cache
+from models import Base, ExtractionCache
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(extraction_cache, "SessionLocal", factory)
+    return factory
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Stand-in for the PDF extraction; records which PDFs were really extracted"""
+    extracted = []
+
+    def fake_extract(pdf_content):
+        extracted.append(pdf_content)
+        return f"text of {pdf_content.decode()}", [f"https://github.com/{pdf_content.decode()}"]
+
+    monkeypatch.setattr(extraction_cache, "check_pdf_size", lambda pdf_content: None)
+    monkeypatch.setattr(extraction_cache, "extract_pdf_content", fake_extract)
+    return extracted
+
+
+def test_repeat_upload_is_served_from_the_cache(session_factory, extractions):
+    """Test a miss extracts and stores, and a hit returns the same result without extracting"""
+    assert extraction_cache.extract_with_cache(b"ann") == ("text of ann", ["https://github.com/ann"])
+    assert extraction_cache.extract_with_cache(b"ann") == ("text of ann", ["https://github.com/ann"])
+    assert extraction_cache.extract_with_cache(b"bo")[0] == "text of bo"
+
+    assert extractions == [b"ann", b"bo"]
+    db = session_factory()
+    assert db.query(ExtractionCache.hit_count).filter(
+        ExtractionCache.sha256 == extraction_cache.pdf_digest(b"ann")
+    ).scalar() == 1
+    db.close()
+
+
+def test_least_recently_used_entries_are_evicted_over_budget(session_factory, monkeypatch):
+    """Test the byte budget evicts by last use, not by insertion order"""
+    monkeypatch.setattr(extraction_cache, "EXTRACTION_CACHE_MAX_BYTES", 250)
+    start = datetime.utcnow() - timedelta(hours=1)
+    for minute, name in enumerate(("a", "b")):
+        extraction_cache.store_extraction(name, "x" * 98, [])  # 100 bytes with the "[]" links
+        db = session_factory()
+        db.query(ExtractionCache).filter(ExtractionCache.sha256 == name).update(
+            {ExtractionCache.last_used_at: start + timedelta(minutes=minute)}
+        )
+        db.commit()
+        db.close()
+
+    # "a" was stored first but used last
+    assert extraction_cache.get_cached_extraction("a") is not None
+    extraction_cache.store_extraction("c", "x" * 98, [])
+
+    db = session_factory()
+    assert sorted(digest for (digest,) in db.query(ExtractionCache.sha256)) == ["a", "c"]
+    db.close()
+
+
+def test_failed_hit_bookkeeping_still_returns_the_hit(session_factory, monkeypatch):
+    """Test a commit failure while recording a hit doesn't fail the lookup"""
+    extraction_cache.store_extraction("a", "text", [])
+
+    def locked_session():
+        session = session_factory()
+
+        def commit():
+            raise OperationalError("UPDATE extraction_cache", {}, Exception("database is locked"))
+
+        session.commit = commit
+        return session
+
+    monkeypatch.setattr(extraction_cache, "SessionLocal", locked_session)
+    assert extraction_cache.get_cached_extraction("a") == ("text", [])
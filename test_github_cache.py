@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import github_cache
+import metrics
+from models import Base, GitHubCacheEntry
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Fake GitHub API serving `server.bodies` by path with ETags, answering 304 to a matching If-None-Match"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get("If-None-Match")))
+            body = server.bodies.get(self.path)
+
+        if body is None:
+            status, payload, etag = (500, b"{}", None) if self.path == "/broken" else (404, b"{}", None)
+        else:
+            payload = body.encode()
+            etag = f'"{len(body)}-{hash(body) & 0xffff}"'
+            status = 304 if self.headers.get("If-None-Match") == etag else 200
+
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if status == 304:
+            self.end_headers()
+            return
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def fake_github():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.bodies = {"/users/ann": '{"login": "ann"}'}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(github_cache, "SessionLocal", factory)
+    monkeypatch.setattr(github_cache, "GITHUB_CACHE_ENABLED", True)
+    monkeypatch.setattr(github_cache, "_last_prune", None)
+    return factory
+
+
+def age_entries(factory, seconds):
+    db = factory()
+    db.query(GitHubCacheEntry).update({GitHubCacheEntry.fetched_at: datetime.utcnow() - timedelta(seconds=seconds)})
+    db.commit()
+    db.close()
+
+
+def test_fresh_entry_is_served_without_a_request(session_factory, fake_github):
+    """Test a miss fetches and stores, and a repeat within the TTL makes no request"""
+    url = f"{fake_github.url}/users/ann"
+    first = github_cache.cached_get(requests.get, url, "profile")
+    hits = metrics.get_counter("github_cache.hits")
+    second = github_cache.cached_get(requests.get, url, "profile")
+
+    assert (first.status_code, second.status_code) == (200, 200)
+    assert second.json() == first.json() == {"login": "ann"}
+    assert fake_github.requests == [("/users/ann", None)]
+    assert metrics.get_counter("github_cache.hits") == hits + 1
+
+
+def test_stale_entry_is_revalidated_with_its_etag(session_factory, fake_github):
+    """Test an entry past its TTL is revalidated; a 304 serves the stored body and makes it fresh again"""
+    url = f"{fake_github.url}/users/ann"
+    github_cache.cached_get(requests.get, url, "profile")
+    db = session_factory()
+    etag = db.get(GitHubCacheEntry, url).etag
+    db.close()
+    age_entries(session_factory, github_cache.GITHUB_CACHE_TTLS["profile"] + 1)
+
+    revalidated = metrics.get_counter("github_cache.revalidated")
+    response = github_cache.cached_get(requests.get, url, "profile")
+    assert (response.status_code, response.json()) == (200, {"login": "ann"})
+    assert fake_github.requests[-1] == ("/users/ann", etag)
+    assert metrics.get_counter("github_cache.revalidated") == revalidated + 1
+
+    # The 304 refreshed the entry, so the next call is a plain hit
+    github_cache.cached_get(requests.get, url, "profile")
+    assert len(fake_github.requests) == 2
+
+
+def test_changed_resource_replaces_the_entry(session_factory, fake_github):
+    """Test a stale entry whose ETag no longer matches is replaced by the new body"""
+    url = f"{fake_github.url}/users/ann"
+    github_cache.cached_get(requests.get, url, "profile")
+    fake_github.bodies["/users/ann"] = '{"login": "ann", "bio": "new"}'
+    age_entries(session_factory, github_cache.GITHUB_CACHE_TTLS["profile"] + 1)
+
+    assert github_cache.cached_get(requests.get, url, "profile").json() == {"login": "ann", "bio": "new"}
+    assert github_cache.cached_get(requests.get, url, "profile").json() == {"login": "ann", "bio": "new"}
+    assert len(fake_github.requests) == 2
+
+
+def test_only_200_and_404_are_cached(session_factory, fake_github):
+    """Test a missing README (404) is cached but a server error is fetched again"""
+    missing, broken = f"{fake_github.url}/repos/ann/etl/readme", f"{fake_github.url}/broken"
+    for _ in range(2):
+        assert github_cache.cached_get(requests.get, missing, "readme").status_code == 404
+        assert github_cache.cached_get(requests.get, broken, "repo").status_code == 500
+
+    assert [path for path, _ in fake_github.requests] == ["/repos/ann/etl/readme", "/broken", "/broken"]
+
+
+def test_entries_past_retention_are_pruned(session_factory, fake_github, monkeypatch):
+    """Test a save prunes entries not refreshed for the retention period, keeping recent stale ones"""
+    for path in ("/users/ann", "/users/bo", "/users/cy"):
+        fake_github.bodies[path] = "{}"
+    github_cache.cached_get(requests.get, f"{fake_github.url}/users/ann", "profile")
+    github_cache.cached_get(requests.get, f"{fake_github.url}/users/bo", "profile")
+    db = session_factory()
+    db.query(GitHubCacheEntry).filter(GitHubCacheEntry.url.endswith("/ann")).update(
+        {GitHubCacheEntry.fetched_at: datetime.utcnow() - timedelta(seconds=github_cache.GITHUB_CACHE_TTLS["profile"] + 1)},
+        synchronize_session=False
+    )
+    db.query(GitHubCacheEntry).filter(GitHubCacheEntry.url.endswith("/bo")).update(
+        {GitHubCacheEntry.fetched_at: datetime.utcnow() - timedelta(seconds=github_cache.GITHUB_CACHE_RETENTION_SECONDS + 1)},
+        synchronize_session=False
+    )
+    db.commit()
+
+    # The saves above pruned already; the next one is due once the interval has passed
+    monkeypatch.setattr(github_cache, "_last_prune", None)
+    github_cache.cached_get(requests.get, f"{fake_github.url}/users/cy", "profile")
+
+    assert sorted(url.rsplit("/", 1)[1] for (url,) in db.query(GitHubCacheEntry.url)) == ["ann", "cy"]
+    db.close()
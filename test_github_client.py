@@ -0,0 +1,114 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from github_client import GitHubClient, GitHubRateLimitError, TokenBucket
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Fake GitHub API that emits rate-limit headers per token"""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        token = (self.headers.get("Authorization") or "").replace("token ", "")
+        with server.lock:
+            server.seen_tokens.append(token)
+            remaining = server.budgets.get(token, 0)
+            secondary = server.secondary_limit_replies > 0
+            if secondary:
+                server.secondary_limit_replies -= 1
+            elif remaining > 0:
+                server.budgets[token] = remaining - 1
+
+        if secondary:
+            self.send_response(403)
+            self.send_header("Retry-After", "0")
+            self.send_header("X-RateLimit-Remaining", str(remaining))
+        elif remaining > 0:
+            self.send_response(200)
+            self.send_header("X-RateLimit-Remaining", str(remaining - 1))
+        else:
+            self.send_response(403)
+            self.send_header("X-RateLimit-Remaining", "0")
+        self.send_header("X-RateLimit-Reset", str(int(server.reset_at)))
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+
+@pytest.fixture
+def fake_github():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.lock = threading.Lock()
+    server.seen_tokens = []
+    server.budgets = {}
+    server.secondary_limit_replies = 0
+    server.reset_at = time.time() + 3600
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/users/octocat"
+    yield server
+    server.shutdown()
+
+
+def test_rotates_to_token_with_budget(fake_github):
+    """Test the client moves to the next token once one is exhausted"""
+    fake_github.budgets = {"first": 2, "second": 5}
+    client = GitHubClient(tokens=["first", "second"], requests_per_second=1000, burst=100, max_wait=0)
+
+    statuses = [client.get(fake_github.url).status_code for _ in range(6)]
+
+    # No request was spent on an exhausted token
+    assert statuses == [200] * 6
+    assert len(fake_github.seen_tokens) == 6
+    assert set(fake_github.seen_tokens) == {"first", "second"}
+
+
+def test_defers_when_budget_is_gone(fake_github):
+    """Test exhaustion raises GitHubRateLimitError instead of returning a failure"""
+    fake_github.budgets = {"only": 1}
+    client = GitHubClient(tokens=["only"], requests_per_second=1000, burst=100, max_wait=1)
+
+    assert client.get(fake_github.url).status_code == 200
+    with pytest.raises(GitHubRateLimitError) as error:
+        client.get(fake_github.url)
+    assert error.value.reset_at == pytest.approx(fake_github.reset_at, abs=1)
+
+
+def test_waits_for_reset_within_max_wait(fake_github):
+    """Test requests queue until the reset when it is close enough"""
+    fake_github.budgets = {"only": 1}
+    fake_github.reset_at = int(time.time()) + 2
+    client = GitHubClient(tokens=["only"], requests_per_second=1000, burst=100, max_wait=5)
+
+    assert client.get(fake_github.url).status_code == 200  # Learns remaining=0 and the reset time
+    # GitHub restores the budget just before the reset the client waits for
+    threading.Timer(fake_github.reset_at - time.time() - 0.5, fake_github.budgets.update, kwargs={"only": 10}).start()
+
+    start = time.time()
+    assert client.get(fake_github.url).status_code == 200
+    assert time.time() - start > 0.5
+
+
+def test_retries_secondary_rate_limit(fake_github):
+    """Test a 403 with Retry-After is retried"""
+    fake_github.budgets = {"only": 10}
+    fake_github.secondary_limit_replies = 1
+    client = GitHubClient(tokens=["only"], requests_per_second=1000, burst=100, max_wait=5)
+
+    assert client.get(fake_github.url).status_code == 200
+    assert len(fake_github.seen_tokens) == 2
+
+
+def test_token_bucket_limits_bursts():
+    """Test the bucket allows `capacity` immediate calls and then paces"""
+    bucket = TokenBucket(rate=20, capacity=5)
+    start = time.monotonic()
+    for _ in range(10):
+        assert bucket.acquire(timeout=5)
+    # 5 from the burst, 5 more at 20/s
+    assert time.monotonic() - start >= 0.2
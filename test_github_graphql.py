@@ -0,0 +1,115 @@
+import pytest
+
+from github_graphql import (
+    GitHubGraphQLError, build_query, build_readme_query, map_profile, map_repo, readme_expression,
+    scrape_github_data_graphql
+)
+
+
+def tree(branch, *names):
+    return {"name": branch, "target": {"tree": {"entries": [{"name": name, "type": "blob"} for name in names]}}}
+
+
+USER = {
+    "url": "https://github.com/ann", "name": "Ann", "bio": "Data engineer",
+    "repositories": {"totalCount": 12}, "followers": {"totalCount": 30}, "following": {"totalCount": 4}
+}
+PROFILE_REPO = {"defaultBranchRef": tree("main", "README.md"), "readme": {"text": "Hi,\nI'm Ann"}}
+REPO = {
+    "url": "https://github.com/ann/etl", "description": "ETL jobs", "stargazerCount": 7, "forkCount": 2,
+    "primaryLanguage": {"name": "Python"}, "languages": {"nodes": [{"name": "Python"}, {"name": "Shell"}]},
+    # README.rst on a default branch HEAD doesn't resolve to
+    "defaultBranchRef": tree("trunk", "LICENSE", "README.rst", "docs"), "readme": None
+}
+
+
+class Response:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+    """Answers GraphQL posts with canned payloads, in order"""
+
+    def __init__(self, *payloads):
+        self.payloads = list(payloads)
+        self.requests = []
+
+    def post(self, url, json=None):
+        self.requests.append(json)
+        return Response(self.payloads.pop(0))
+
+
+def test_build_query_passes_names_as_variables():
+    """Test profiles, profile README repos and repos get aliases and variables, never inlined names"""
+    query, variables = build_query(["ann"], [("ann", "etl"), ("bo", "web")])
+
+    assert variables == {"login0": "ann", "owner0": "ann", "name0": "etl", "owner1": "bo", "name1": "web"}
+    assert query.startswith("query Portfolio($login0: String!, $owner0: String!, $name0: String!, $owner1: String!")
+    for alias in ("p0: user(login: $login0)", "pr0: repository(owner: $login0, name: $login0)",
+                  "r0: repository(owner: $owner0, name: $name0)", "r1: repository(owner: $owner1, name: $name1)"):
+        assert alias in query
+    assert "etl" not in query and "ann" not in query
+
+    query, variables = build_readme_query([("ann", "etl", "trunk:README.rst")])
+    assert variables == {"owner0": "ann", "name0": "etl", "expression0": "trunk:README.rst"}
+    assert "b0: repository(owner: $owner0, name: $name0) { object(expression: $expression0)" in query
+
+
+def test_readme_is_found_by_name_on_the_default_branch():
+    """Test any root README variant is found, preferring Markdown, and none is reported for empty repos"""
+    assert readme_expression(REPO) == "trunk:README.rst"
+    assert readme_expression({"defaultBranchRef": tree("main", "readme.txt", "Readme.md")}) == "main:Readme.md"
+    assert readme_expression({"defaultBranchRef": tree("dev", "README")}) == "dev:README"
+    assert readme_expression({"defaultBranchRef": tree("main", "src", "setup.py")}) is None
+    assert readme_expression({"defaultBranchRef": None}) is None
+    assert readme_expression(None) is None
+
+
+def test_mappers_match_the_rest_dicts():
+    """Test GraphQL nodes map onto the REST backend's keys, in the same order"""
+    assert map_profile(USER, 17, "Hi,\nI'm Ann") == {
+        "profile_url": "https://github.com/ann", "name": "Ann", "bio": "Data engineer", "public_repos": 12,
+        "followers": 30, "following": 4, "contributions": 17, "profile_readme": "Hi, I'm Ann"
+    }
+    assert map_repo(REPO, None) == {
+        "repo_url": "https://github.com/ann/etl", "description": "ETL jobs", "stars": 7, "forks": 2,
+        "language": "Python", "languages": ["Python", "Shell"], "readme": "README not found"
+    }
+    assert len(map_repo(REPO, "x" * 2000)["readme"]) == 500
+
+
+def test_scrape_reads_other_readmes_in_one_more_query():
+    """Test a portfolio costs one query, plus one for READMEs HEAD:README.md didn't find"""
+    client = FakeClient(
+        {"data": {"p0": USER, "pr0": PROFILE_REPO, "r0": REPO, "r1": None},
+         "errors": [{"message": "Could not resolve to a Repository with the name 'bo/gone'."}]},
+        {"data": {"b0": {"object": {"text": "ETL\r\njobs"}}}}
+    )
+    contributions = []
+
+    def fetch_contributions(username):
+        contributions.append(username)
+        return 17
+
+    data = scrape_github_data_graphql(client, ["ann"], [("ann", "etl"), ("bo", "gone")], fetch_contributions)
+
+    assert len(client.requests) == 2
+    assert client.requests[1]["variables"] == {"owner0": "ann", "name0": "etl", "expression0": "trunk:README.rst"}
+    assert contributions == ["ann"]
+    assert [profile["profile_readme"] for profile in data["profiles"]] == ["Hi, I'm Ann"]
+    # The missing repo is skipped, like a REST 404
+    assert [(project["repo_url"], project["readme"]) for project in data["projects"]] == [
+        ("https://github.com/ann/etl", "ETL jobs")
+    ]
+
+
+def test_failed_query_raises():
+    """Test a query that fails as a whole raises so the caller falls back to REST"""
+    client = FakeClient({"errors": [{"message": "Bad credentials"}]})
+    with pytest.raises(GitHubGraphQLError):
+        scrape_github_data_graphql(client, ["ann"], [], lambda username: 0)
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+import agents
+
+
+class Response:
+    def __init__(self, payload, text=""):
+        self.status_code = 200
+        self.payload = payload
+        self.text = text
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def fake_github(monkeypatch):
+    """Stub github_get answering every REST endpoint; records requests and the peak number in flight"""
+    state = {"urls": [], "in_flight": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def github_get(url, endpoint):
+        with lock:
+            state["urls"].append(url)
+            state["in_flight"] += 1
+            state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            path = url.split("://", 1)[1].split("/", 1)[1]
+            # The first profile and repo answer slowest, so finishing order differs from link order
+            time.sleep(0.05 if "ann" in path.lower() else 0.01)
+            if url.startswith("https://raw/"):
+                return Response(None, text=f"README of {path}")
+            parts = path.split("/")
+            if parts[0] == "users":
+                return Response([{}] * 3 if parts[-1] == "events" else {"html_url": f"https://github.com/{parts[1]}"})
+            if parts[-1] == "readme":
+                return Response({"download_url": f"https://raw/{'/'.join(parts[1:3])}"})
+            if parts[-1] == "languages":
+                return Response({"Python": 100})
+            return Response({"html_url": f"https://github.com/{parts[1]}/{parts[2]}"})
+        finally:
+            with lock:
+                state["in_flight"] -= 1
+
+    monkeypatch.setattr(agents, "github_get", github_get)
+    monkeypatch.setattr(agents, "GITHUB_ENRICHMENT_BACKEND", "rest")
+    return state
+
+
+def test_targets_are_deduplicated_case_insensitively():
+    """Test repeated profiles and repos differing only in case are collected once, keeping first spellings"""
+    usernames, repos = agents.collect_github_targets([
+        "https://github.com/Ann", "https://github.com/ann/", "https://example.com/ann",
+        "https://github.com/Ann/ETL", "https://github.com/ann/etl/tree/main", "https://github.com/ann/etl",
+        "https://github.com/bo", "https://github.com/bo/web"
+    ])
+
+    assert usernames == ["Ann", "bo"]
+    assert repos == [("Ann", "ETL"), ("bo", "web")]
+
+
+def test_each_target_is_fetched_once_concurrently_in_link_order(fake_github):
+    """Test every resource is requested once, the requests overlap, and results keep the links' order"""
+    data = agents.scrape_github_data([
+        "https://github.com/Ann", "https://github.com/bo", "https://github.com/ANN",
+        "https://github.com/ann/etl", "https://github.com/bo/web", "https://github.com/Ann/ETL"
+    ])
+
+    assert [profile["profile_url"] for profile in data["profiles"]] == [
+        "https://github.com/Ann", "https://github.com/bo"
+    ]
+    assert [project["repo_url"] for project in data["projects"]] == [
+        "https://github.com/ann/etl", "https://github.com/bo/web"
+    ]
+    assert data["profiles"][0]["contributions"] == 3
+    assert data["projects"][1]["languages"] == ["Python"]
+
+    # 4 calls per profile and per repo (README downloads included), none repeated
+    assert len(fake_github["urls"]) == 2 * 4 + 2 * 4
+    assert max(Counter(url.lower() for url in fake_github["urls"]).values()) == 1
+    assert fake_github["peak"] > 1
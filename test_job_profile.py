@@ -0,0 +1,32 @@
+
+from agents import generate_feedback, parse_job_description
+from job_profile import get_profile, parse_skills
+from models import JobDetails
+
+
+def make_job(skills):
+    return JobDetails(job_id=901, job_title="Data Engineer", job_details="-", skills_requirement=skills,
+                      education_requirement="BSc", experience_requirement="3 years")
+
+
+def test_parse_skills_handles_lists_and_bullets():
+    """Test comma, semicolon, newline and bullet separated skills"""
+    assert parse_skills("Python, SQL; Spark and Airflow\n• dbt\n- Kafka, python") == [
+        "Python", "SQL", "Spark and Airflow", "dbt", "Kafka"
+    ]
+
+
+def test_profile_is_reused_until_the_job_changes():
+    """Test the profile is cached per job revision and matches the string-parsing fallback"""
+    job = make_job("Python, SQL, Spark")
+    profile = get_profile(job)
+    assert get_profile(job) is profile
+    assert (profile.title, profile.skills) == ("Data Engineer", ("Python", "SQL", "Spark"))
+    assert parse_job_description(profile.description) == ("Data Engineer", ["Python", "SQL", "Spark"])
+
+    job.skills_requirement = "Python, Kafka"
+    edited = get_profile(job)
+    assert edited is not profile and edited.skills == ("Python", "Kafka")
+
+    feedback = generate_feedback(30, 8, 10, 0, edited.description, profile=edited)
+    assert "Data Engineer" in feedback and "Python, Kafka" in feedback
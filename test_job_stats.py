@@ -0,0 +1,99 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import rescore
+from job_stats import rebuild, record_candidates
+from models import Base, Candidate, JobDetails, JobStats
+from write_queue import WriteQueue
+
+SCORES = [0.0, 9.5, 42.0, 69.9, 70.0, 88.0, 100.0]
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(rescore, "SessionLocal", factory)
+
+    db = factory()
+    for job_id in (1, 2):
+        db.add(JobDetails(job_id=job_id, job_title="Engineer", job_details="-", skills_requirement="Python",
+                          education_requirement="-", experience_requirement="-"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def add_candidate(job_id, email, total_score):
+    def write(db):
+        candidate = Candidate(job_id=job_id, user_name=email, user_email=email, resume_url=f"/uploads/{email}.pdf",
+                              parameter_score=total_score / 4, job_similarity_score=total_score / 2,
+                              github_score=total_score / 4, total_score=total_score)
+        db.add(candidate)
+        record_candidates(db, [candidate])
+    return write
+
+
+def snapshot(factory):
+    db = factory()
+    try:
+        return {stats.job_id: stats.to_dict() for stats in db.query(JobStats)}
+    finally:
+        db.close()
+
+
+def stored_totals(factory):
+    """job_stats columns per job, floats rounded so sums added in a different order compare equal"""
+    db = factory()
+    try:
+        return {
+            stats.job_id: {
+                column.name: round(getattr(stats, column.name), 6)
+                for column in JobStats.__table__.columns if column.name != "updated_at"
+            }
+            for stats in db.query(JobStats)
+        }
+    finally:
+        db.close()
+
+
+def test_incremental_stats_match_a_rebuild(session_factory, monkeypatch):
+    """Test inserts and a rescore keep job_stats equal to an aggregate over the candidates"""
+    writer = WriteQueue(session_factory=session_factory, max_wait_ms=200, name="test_stats_writer")
+    futures = [writer.submit(add_candidate(1 + i % 2, f"c{i}@example.com", score)) for i, score in enumerate(SCORES)]
+    for future in futures:
+        future.result(timeout=5)
+
+    stats = snapshot(session_factory)[1]
+    assert (stats["candidate_count"], stats["pass_count"]) == (4, 2)
+    assert [bucket["count"] for bucket in stats["histogram"]] == [1, 0, 0, 0, 1, 0, 0, 1, 0, 1]
+    assert stats["mean_total_score"] == pytest.approx((0 + 42 + 70 + 100) / 4, abs=0.01)
+
+    # Everyone in job 1 rescored to 75: one more pass, all in the 70 bucket
+    monkeypatch.setattr(rescore, "rescore_candidate", lambda *args: {
+        "Parameter Score": 20, "Job Similarity Score": 40, "GitHub Score": 15, "Total Score": 75
+    })
+    rescore.rescore_job(1, workers=1, batch_size=3)
+
+    stats = snapshot(session_factory)[1]
+    assert (stats["pass_count"], stats["score_sums"]["github_score"]) == (4, 60.0)
+    incremental = stored_totals(session_factory)
+    db = session_factory()
+    rebuild(db)
+    db.commit()
+    db.close()
+    assert incremental == stored_totals(session_factory)
+
+
+def test_duplicate_insert_is_not_counted(session_factory):
+    """Test a failed insert rolls back its stats with it"""
+    writer = WriteQueue(session_factory=session_factory, max_wait_ms=200, name="test_stats_writer")
+    futures = [writer.submit(add_candidate(1, email, 80.0)) for email in ("a@x.com", "a@x.com", "b@x.com")]
+    assert [type(future.exception(timeout=5)) for future in futures] == [type(None), IntegrityError, type(None)]
+
+    stats = snapshot(session_factory)[1]
+    assert (stats["candidate_count"], stats["pass_count"], stats["score_sums"]["total_score"]) == (2, 2, 160.0)
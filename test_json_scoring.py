@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import agents
+import metrics
+
+RESUME = "Data engineer with Python, SQL and Spark experience."
+VALID = {"IMPACT": 4, "FORMAT": 4, "LANGUAGE": 5, "SKILLS": 3, "SIMILARITY": 44, "GITHUB": 12, "TOTAL": 72}
+
+
+@pytest.fixture
+def ollama(monkeypatch):
+    """Fake pooled Ollama client in JSON mode; `ollama.reply` is returned and requests are recorded"""
+    class FakePool:
+        def __init__(self):
+            self.reply = None
+            self.requests = []
+
+        def generate(self, **request):
+            self.requests.append(request)
+            return {"response": self.reply}
+
+    pool = FakePool()
+    monkeypatch.setattr(agents, "ollama_pool", pool)
+    monkeypatch.setattr(agents, "SCORING_FORMAT", "json")
+    monkeypatch.setattr(agents, "SCORING_CASCADE_ENABLED", False)
+    return pool
+
+
+def counters():
+    return {name: metrics.get_counter(f"scoring.{name}") for name in ("parse_attempts", "parse_success", "fallbacks")}
+
+
+def test_valid_json_reply_is_parsed(ollama):
+    """Test a schema-valid reply is used as is and sends the ScoreOutput schema as Ollama's format"""
+    ollama.reply = json.dumps(VALID)
+    before = counters()
+    evaluation = agents.score_resume(RESUME, "job description", [])
+
+    assert ollama.requests[-1]["format"] == agents.ScoreOutput.model_json_schema()
+    assert (evaluation["Parameter Score"], evaluation["Job Similarity Score"], evaluation["GitHub Score"],
+            evaluation["Total Score"]) == (16, 44, 12, 72)
+    after = counters()
+    assert {name: after[name] - before[name] for name in after} == {
+        "parse_attempts": 1, "parse_success": 1, "fallbacks": 0
+    }
+
+
+@pytest.mark.parametrize("reply", [
+    json.dumps({**VALID, "IMPACT": 9}),  # Out of range
+    json.dumps({key: value for key, value in VALID.items() if key != "GITHUB"}),  # Missing field
+    '{"IMPACT": 4, "FORMAT": 4',  # Truncated
+])
+def test_invalid_json_reply_falls_back(ollama, reply):
+    """Test a reply failing schema validation uses the default scoring and counts as a failed parse"""
+    ollama.reply = reply
+    before = counters()
+    evaluation = agents.score_resume(RESUME, "job description", [])
+
+    assert 0 <= evaluation["Total Score"] <= 100
+    after = counters()
+    assert {name: after[name] - before[name] for name in after} == {
+        "parse_attempts": 1, "parse_success": 0, "fallbacks": 1
+    }
@@ -0,0 +1,90 @@
+import math
+from collections import Counter
+
+import pytest
+
+from local_scorer import (
+    AVERAGE_RESUME_TOKENS,
+    BM25_B,
+    BM25_K1,
+    FULL_MATCH_FREQUENCY,
+    JobVector,
+    similarity_score,
+    split_terms,
+    tokenize
+)
+
+JOB = "📌 Job Title: Backend Engineer\n1️⃣ Skills: Python, C++, Node.js, CI/CD, Kubernetes and PostgreSQL"
+
+
+def test_tokenize_keeps_tech_terms_and_drops_labels():
+    """Test c++, node.js and ci/cd survive tokenisation while emoji and labels do not"""
+    assert tokenize(JOB) == ["backend", "engineer", "python", "c++", "node.js", "ci/cd", "kubernetes", "postgresql"]
+
+
+def test_similarity_rewards_relevant_resumes():
+    """Test whole-term matching, saturation and the 0-60 range"""
+    relevant = "Backend engineer. Built Python and C++ services, Node.js APIs, CI/CD on Kubernetes with PostgreSQL."
+    unrelated = "Marketing lead. Ran JavaScript-free campaigns, brand strategy and events."
+
+    assert similarity_score(relevant, JOB) > 40
+    assert similarity_score(unrelated, JOB) == 0
+    assert similarity_score(relevant * 50, JOB) <= 60
+
+
+def reference_similarity(resume_text, job_text):
+    """Term-by-term BM25 coverage, written without NumPy to check JobVector against"""
+    job_counts = Counter(tokenize(job_text))
+    resume_terms = split_terms(resume_text)
+    if not job_counts or not resume_terms:
+        return 0.0
+
+    resume_counts = Counter(term.rstrip(".") for term in resume_terms)
+    length_norm = 1 - BM25_B + BM25_B * len(resume_terms) / AVERAGE_RESUME_TOKENS
+    full_match = FULL_MATCH_FREQUENCY * (BM25_K1 + 1) / (FULL_MATCH_FREQUENCY + BM25_K1)
+    covered = total = 0.0
+    for term, count in job_counts.items():
+        weight = 1.0 + math.log(count)
+        tf = resume_counts[term]
+        covered += weight * min(tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm) / full_match, 1.0)
+        total += weight
+    return covered / total
+
+
+def test_empty_documents_score_zero():
+    """Test an empty resume or a job without usable terms scores 0 instead of dividing by zero"""
+    assert similarity_score("", JOB) == 0
+    assert similarity_score("   \n\t", JOB) == 0
+    assert similarity_score("Python developer", "") == 0
+    assert JobVector("the and of").similarity("Python developer") == 0.0
+
+
+def test_job_term_missing_from_resume_adds_nothing():
+    """Test a job term no resume mentions only lowers coverage and never fails"""
+    job = "Python Haskell"
+    resume = "Python developer writing Python services"
+
+    vector = JobVector(job)
+    assert vector.similarity("Haskell") > 0
+    assert vector.similarity(resume) == pytest.approx(JobVector("Python").similarity(resume) / 2)
+
+
+def test_repeated_job_terms_weigh_more():
+    """Test a term the posting repeats outweighs one it mentions once"""
+    job = "Kubernetes Kubernetes Kubernetes operators, Terraform"
+
+    vector = JobVector(job)
+    assert vector.weights[vector.index["kubernetes"]] > vector.weights[vector.index["terraform"]]
+    assert vector.similarity("Kubernetes Kubernetes") > vector.similarity("Terraform Terraform")
+
+
+@pytest.mark.parametrize("resume", [
+    "Python developer.",
+    "Backend engineer. Python, Python and more Python. Kubernetes and PostgreSQL in production.",
+    "Engineer " + "writing Node.js services on Kubernetes " * 40,
+    "C++ and CI/CD. Kubernetes. Kubernetes. Kubernetes.",
+    "Marketing lead running brand campaigns"
+])
+def test_similarity_matches_reference_bm25(resume):
+    """Test the vectorised scorer agrees with a plain-Python BM25 on a small corpus"""
+    assert JobVector(JOB).similarity(resume) == pytest.approx(reference_similarity(resume, JOB))
@@ -0,0 +1,97 @@
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from candidate_listing import list_candidates
+from db_engine import create_configured_engine
+from migrations import MIGRATIONS, applied_versions, run_migrations
+from models import Base, Candidate, JobDetails
+from sqlalchemy.orm import sessionmaker
+
+# candidates as created before migration 1: no indexes besides the unique email, no foreign key
+LEGACY_CANDIDATES = """
+CREATE TABLE candidates (
+    id INTEGER NOT NULL PRIMARY KEY, job_id INTEGER, user_name VARCHAR(255) NOT NULL,
+    user_email VARCHAR(255) NOT NULL UNIQUE, resume_url VARCHAR(255) NOT NULL,
+    parameter_score FLOAT NOT NULL, job_similarity_score FLOAT NOT NULL, github_score FLOAT NOT NULL,
+    total_score FLOAT NOT NULL, created_at DATETIME
+)
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Configured like the app's engine, so foreign keys are enforced; the legacy rows reference a missing job
+    engine = create_configured_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(LEGACY_CANDIDATES)
+        conn.exec_driver_sql(
+            "INSERT INTO candidates VALUES (7, 1, 'Ann', 'ann@example.com', '/uploads/a.pdf', 15, 40, 10, 65, '2025-01-01')"
+        )
+        conn.exec_driver_sql(
+            "INSERT INTO candidates VALUES (9, 1, 'Bo', 'bo@example.com', '/uploads/b.pdf', 12, 30, 0, 42, '2025-01-02')"
+        )
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_migration_upgrades_legacy_candidates_table(engine):
+    """Test the rebuild adds the foreign key and indexes, keeps rows and runs only once"""
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(engine) == []
+    assert applied_versions(engine) == {version for version, _, _ in MIGRATIONS}
+
+    inspector = inspect(engine)
+    assert [fk["referred_table"] for fk in inspector.get_foreign_keys("candidates")] == ["job_details"]
+    indexes = {index["name"]: index["column_names"] for index in inspector.get_indexes("candidates")}
+    assert indexes["ix_candidates_job_id_total_score"] == ["job_id", "total_score"]
+    assert indexes["ix_candidates_job_id_created_at"] == ["job_id", "created_at"]
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("SELECT id, user_email, total_score FROM candidates ORDER BY id").all() == [
+            (7, "ann@example.com", 65.0), (9, "bo@example.com", 42.0)
+        ]
+
+
+def test_foreign_key_rejects_unknown_jobs(engine):
+    """Test after the rebuild a candidate can only be stored for an existing job"""
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.commit()
+    db.add(Candidate(job_id=1, user_name="Cy", user_email="cy@example.com", resume_url="/uploads/c.pdf",
+                     parameter_score=10, job_similarity_score=20, github_score=0, total_score=30))
+    db.commit()
+
+    db.add(Candidate(job_id=404, user_name="Di", user_email="di@example.com", resume_url="/uploads/d.pdf",
+                     parameter_score=10, job_similarity_score=20, github_score=0, total_score=30))
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.close()
+
+
+@pytest.mark.parametrize("filters", [
+    {"job_id": 1, "sort": "total_score"},
+    {"job_id": 1, "sort": "created_at"},
+    {"job_id": 1, "sort": "total_score", "order": "asc"},
+    {"sort": "total_score"},
+    {"sort": "created_at"},
+])
+def test_candidate_listings_use_indexes(engine, filters):
+    """Test listing queries (first and later pages) walk an index instead of scanning and sorting"""
+    run_migrations(engine)
+    statements = []
+    event.listen(engine, "before_cursor_execute",
+                 lambda conn, cursor, statement, parameters, context, executemany: statements.append((statement, parameters)))
+
+    db = sessionmaker(bind=engine)()
+    page = list_candidates(db, limit=1, fields="id", **filters)
+    assert page["next_cursor"] is not None
+    list_candidates(db, limit=1, fields="id", cursor=page["next_cursor"], **filters)
+    db.close()
+
+    with engine.connect() as conn:
+        for statement, parameters in statements[-2:]:
+            plan = " | ".join(row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+            assert "USING INDEX ix_candidates_" in plan or "USING COVERING INDEX ix_candidates_" in plan, plan
+            assert "TEMP B-TREE" not in plan, plan
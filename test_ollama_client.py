@@ -0,0 +1,67 @@
+import json
+import select
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import metrics
+from ollama_client import OllamaClientPool, OllamaTimeoutError
+
+
+class SlowOllamaHandler(BaseHTTPRequestHandler):
+    """Fake Ollama that never finishes a generation; records when the client hangs up"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if request.get("stream"):
+            # One token, then nothing more
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            line = json.dumps({"model": request["model"], "response": "IMPACT", "done": False}).encode() + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+
+        # Wait for the client to close the connection (a read of b"") instead of answering
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            if select.select([self.connection], [], [], 0.05)[0] and not self.connection.recv(1):
+                self.server.disconnected.set()
+                return
+
+
+@pytest.fixture
+def slow_ollama():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SlowOllamaHandler)
+    server.daemon_threads = True
+    server.disconnected = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_timeout_cancels_the_request(slow_ollama, streaming):
+    """Test a generation over its deadline raises OllamaTimeoutError, closes the connection and is counted"""
+    pool = OllamaClientPool(host=f"http://127.0.0.1:{slow_ollama.server_address[1]}", timeout=0.3)
+    timeouts = metrics.get_counter("ollama.timeouts")
+
+    start = time.perf_counter()
+    with pytest.raises(OllamaTimeoutError):
+        if streaming:
+            pool.stream(lambda token: False, model="gemma3:4b", prompt="score this")
+        else:
+            pool.generate(model="gemma3:4b", prompt="score this")
+
+    assert time.perf_counter() - start < 2
+    # The server sees the connection closed, so a real Ollama would abort the generation
+    assert slow_ollama.disconnected.wait(2)
+    assert metrics.get_counter("ollama.timeouts") == timeouts + 1
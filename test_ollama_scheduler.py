@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+from agents import PRIORITY_BATCH, PRIORITY_INTERACTIVE, OllamaOverloadedError, OllamaScheduler
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_interactive_calls_run_before_queued_batch_calls():
+    """Test waiting calls are admitted by priority, then arrival order"""
+    scheduler = OllamaScheduler(max_parallel=1, max_queue=10)
+    scheduler.acquire()
+    order = []
+
+    def call(name, priority):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = []
+    for name, priority in [("batch-1", PRIORITY_BATCH), ("batch-2", PRIORITY_BATCH), ("live", PRIORITY_INTERACTIVE)]:
+        thread = threading.Thread(target=call, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: scheduler.stats()["queued"] == len(threads))
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["live", "batch-1", "batch-2"]
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_full_queue_rejects_with_retry_after():
+    """Test backpressure once max_parallel calls run and max_queue wait"""
+    scheduler = OllamaScheduler(max_parallel=1, max_queue=1)
+    scheduler.acquire()
+    waiter = threading.Thread(target=lambda: (scheduler.acquire(), scheduler.release()))
+    waiter.start()
+    wait_until(lambda: scheduler.stats()["queued"] == 1)
+
+    with pytest.raises(OllamaOverloadedError) as error:
+        scheduler.acquire()
+    assert error.value.retry_after >= 1
+
+    scheduler.release()
+    waiter.join(timeout=5)
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_wait_is_bounded():
+    """Test a call that gets no slot in time gives up with OllamaOverloadedError and leaves the queue"""
+    scheduler = OllamaScheduler(max_parallel=1, max_queue=10, max_wait=0.1)
+    scheduler.acquire()
+
+    start = time.perf_counter()
+    with pytest.raises(OllamaOverloadedError):
+        scheduler.acquire()
+    assert 0.1 <= time.perf_counter() - start < 2
+    assert scheduler.stats()["queued"] == 0
+
+    scheduler.release()
+    with scheduler.slot():
+        assert scheduler.stats()["in_flight"] == 1
+
+
+def test_waiting_batch_calls_age_ahead_of_new_interactive_calls():
+    """Test a batch call that has waited long enough runs before interactive calls that arrived after it"""
+    # Batch is 10 levels down, so it overtakes interactive calls arriving 10 * 0.02s after it
+    scheduler = OllamaScheduler(max_parallel=1, max_queue=10, aging=0.02)
+    scheduler.acquire()
+    order = []
+
+    def call(name, priority):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = [threading.Thread(target=call, args=("batch", PRIORITY_BATCH))]
+    threads[0].start()
+    wait_until(lambda: scheduler.stats()["queued"] == 1)
+    time.sleep(0.3)
+    threads.append(threading.Thread(target=call, args=("live", PRIORITY_INTERACTIVE)))
+    threads[1].start()
+    wait_until(lambda: scheduler.stats()["queued"] == 2)
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert order == ["batch", "live"]
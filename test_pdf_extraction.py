@@ -0,0 +1,50 @@
+import fitz
+import pytest
+
+import pdf_extraction
+from pdf_extraction import PDFExtractionError, extract_pdf_content
+
+
+def build_pdf(pages):
+    """Build a PDF whose page N contains the text 'page N' and one link"""
+    doc = fitz.open()
+    for page_number in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"page {page_number}")
+        page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(72, 100, 200, 120), "uri": f"https://github.com/user/repo{page_number}"})
+    return doc.tobytes()
+
+
+def test_extracts_pages_in_order_across_chunks(monkeypatch):
+    """Test page-parallel extraction keeps document order"""
+    monkeypatch.setattr(pdf_extraction, "PDF_WORKERS", 0)
+    monkeypatch.setattr(pdf_extraction, "PDF_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(pdf_extraction, "PDF_MAX_PAGES", 100)
+
+    text, links = extract_pdf_content(build_pdf(5))
+
+    assert [line for line in text.split("\n") if line] == [f"page {i}" for i in range(5)]
+    assert links == [f"https://github.com/user/repo{i}" for i in range(5)]
+
+
+def test_page_cap_truncates_document(monkeypatch):
+    """Test pages beyond PDF_MAX_PAGES are not extracted"""
+    monkeypatch.setattr(pdf_extraction, "PDF_WORKERS", 0)
+    monkeypatch.setattr(pdf_extraction, "PDF_PAGES_PER_TASK", 2)
+    monkeypatch.setattr(pdf_extraction, "PDF_MAX_PAGES", 3)
+
+    text, links = extract_pdf_content(build_pdf(6))
+
+    assert "page 2" in text
+    assert "page 3" not in text
+    assert len(links) == 3
+
+
+def test_rejects_oversized_and_non_pdf_uploads(monkeypatch):
+    """Test the byte cap and PDF signature check"""
+    monkeypatch.setattr(pdf_extraction, "PDF_MAX_BYTES", 100)
+
+    with pytest.raises(PDFExtractionError):
+        extract_pdf_content(build_pdf(1))
+    with pytest.raises(PDFExtractionError):
+        extract_pdf_content(b"not a pdf")
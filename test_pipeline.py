@@ -0,0 +1,201 @@
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import pipeline
+from models import Base, Candidate, JobDetails, Submission
+from write_queue import WriteQueue
+
+SCORES = {"Parameter Score": 20, "Job Similarity Score": 35, "GitHub Score": 15, "Total Score": 70}
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(pipeline, "SessionLocal", factory)
+    monkeypatch.setattr(pipeline, "candidate_writer", WriteQueue(session_factory=factory, enabled=False))
+
+    db = factory()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def add_submission(factory, **fields):
+    db = factory()
+    submission = pipeline.create_submission(db, "Ann", "ann@example.com", 1, "/uploads/ann.pdf")
+    for name, value in fields.items():
+        setattr(submission, name, value)
+    db.commit()
+    submission_id = submission.id
+    db.close()
+    return submission_id
+
+
+def load(factory, submission_id):
+    db = factory()
+    try:
+        return db.query(Submission).filter(Submission.id == submission_id).one()
+    finally:
+        db.close()
+
+
+def test_queued_submission_is_claimed_once(session_factory):
+    """Test a claim takes the row out of the queue, so a second poller can't claim it too"""
+    submission_id = add_submission(session_factory)
+    assert pipeline.find_runnable_submissions(10) == [submission_id]
+
+    assert pipeline.claim_submission(submission_id)
+    assert not pipeline.claim_submission(submission_id)
+    assert pipeline.find_runnable_submissions(10) == []
+    submission = load(session_factory, submission_id)
+    assert (submission.stage, submission.attempts) == (pipeline.STAGE_EXTRACTING, 1)
+
+
+def test_expired_lease_is_reclaimed(session_factory):
+    """Test work stuck in a stage is picked up again only after its lease expires"""
+    expired = datetime.utcnow() - timedelta(seconds=pipeline.SUBMISSION_LEASE_SECONDS + 1)
+    live_id = add_submission(session_factory, stage=pipeline.STAGE_SCORING, attempts=1)
+    stale_id = add_submission(session_factory, user_email="bo@example.com", stage=pipeline.STAGE_SCORING,
+                              attempts=1, updated_at=expired)
+
+    assert pipeline.find_runnable_submissions(10) == [stale_id]
+    assert not pipeline.claim_submission(live_id)
+    assert pipeline.claim_submission(stale_id)
+    # Recovered work keeps its stage so it resumes where it stopped
+    submission = load(session_factory, stale_id)
+    assert (submission.stage, submission.attempts) == (pipeline.STAGE_SCORING, 2)
+
+
+def test_recovered_submission_resumes_without_rescoring(session_factory, monkeypatch):
+    """Test a worker that crashed after scoring resumes at storing instead of calling the LLM again"""
+    def no_scoring(*args, **kwargs):
+        raise AssertionError("score_resume called for an already scored submission")
+
+    notified = []
+    monkeypatch.setattr(pipeline, "score_resume", no_scoring)
+    monkeypatch.setattr(pipeline, "notify_candidate", lambda name, email, title, result: notified.append(email))
+
+    expired = datetime.utcnow() - timedelta(seconds=pipeline.SUBMISSION_LEASE_SECONDS + 1)
+    submission_id = add_submission(session_factory, stage=pipeline.STAGE_STORING, attempts=1,
+                                   evaluation=json.dumps(SCORES), updated_at=expired)
+    assert pipeline.claim_submission(submission_id)
+    pipeline.process_submission(submission_id)
+
+    submission = load(session_factory, submission_id)
+    assert submission.stage == pipeline.STAGE_COMPLETED
+    assert notified == ["ann@example.com"]
+    db = session_factory()
+    assert db.query(Candidate.id).filter(Candidate.user_email == "ann@example.com").scalar() == submission.candidate_id
+    db.close()
+
+
+def test_gives_up_after_max_attempts(session_factory):
+    """Test a submission that keeps crashing its worker is failed instead of retried forever"""
+    expired = datetime.utcnow() - timedelta(seconds=pipeline.SUBMISSION_LEASE_SECONDS + 1)
+    submission_id = add_submission(session_factory, stage=pipeline.STAGE_SCORING,
+                                   attempts=pipeline.SUBMISSION_MAX_ATTEMPTS, updated_at=expired)
+
+    assert not pipeline.claim_submission(submission_id)
+    assert load(session_factory, submission_id).stage == pipeline.STAGE_FAILED
+
+
+def test_heartbeat_keeps_the_lease_while_scoring(session_factory, monkeypatch):
+    """Test a long wait for Ollama doesn't let another worker reclaim the submission"""
+    monkeypatch.setattr(pipeline, "SUBMISSION_HEARTBEAT_SECONDS", 0.02)
+    monkeypatch.setattr(pipeline, "extract_with_cache", lambda content: ("resume text", []))
+    monkeypatch.setattr(pipeline, "get_file_path", lambda resume_url: __file__)
+    monkeypatch.setattr(pipeline, "notify_candidate", lambda *args: True)
+    submission_id = add_submission(session_factory)
+    runnable_while_scoring = []
+
+    def slow_scoring(*args, **kwargs):
+        # Age the lease past expiry; the heartbeat must renew it before the scoring ends
+        db = session_factory()
+        expired = datetime.utcnow() - timedelta(seconds=pipeline.SUBMISSION_LEASE_SECONDS + 1)
+        db.query(Submission).filter(Submission.id == submission_id).update({Submission.updated_at: expired})
+        db.commit()
+        db.close()
+        time.sleep(0.2)
+        runnable_while_scoring.append(pipeline.find_runnable_submissions(10))
+        return SCORES
+
+    monkeypatch.setattr(pipeline, "score_resume", slow_scoring)
+    assert pipeline.claim_submission(submission_id)
+    pipeline.process_submission(submission_id)
+
+    assert runnable_while_scoring == [[]]
+    assert load(session_factory, submission_id).stage == pipeline.STAGE_COMPLETED
+
+
+def test_worker_that_lost_its_lease_stops(session_factory, monkeypatch):
+    """Test a worker whose submission was reclaimed during scoring stores nothing and sends no email"""
+    monkeypatch.setattr(pipeline, "extract_with_cache", lambda content: ("resume text", []))
+    monkeypatch.setattr(pipeline, "get_file_path", lambda resume_url: __file__)
+    notified = []
+    monkeypatch.setattr(pipeline, "notify_candidate", lambda name, email, title, result: notified.append(email))
+    submission_id = add_submission(session_factory)
+
+    def reclaimed_while_scoring(*args, **kwargs):
+        # Another worker's claim counts another attempt
+        db = session_factory()
+        db.query(Submission).filter(Submission.id == submission_id).update({Submission.attempts: 2})
+        db.commit()
+        db.close()
+        return SCORES
+
+    monkeypatch.setattr(pipeline, "score_resume", reclaimed_while_scoring)
+    assert pipeline.claim_submission(submission_id)
+    pipeline.process_submission(submission_id)
+
+    submission = load(session_factory, submission_id)
+    assert (submission.stage, submission.evaluation, submission.attempts) == (pipeline.STAGE_SCORING, None, 2)
+    assert notified == []
+
+
+def test_transient_error_is_retried_until_attempts_run_out(session_factory, monkeypatch):
+    """Test an ordinary error requeues the submission with a backoff, and fails it on the last attempt"""
+    monkeypatch.setattr(pipeline, "extract_with_cache", lambda content: ("resume text", []))
+    monkeypatch.setattr(pipeline, "get_file_path", lambda resume_url: __file__)
+
+    def unreachable(*args, **kwargs):
+        raise ConnectionError("Ollama is unreachable")
+
+    monkeypatch.setattr(pipeline, "score_resume", unreachable)
+    submission_id = add_submission(session_factory)
+
+    for attempt in range(1, pipeline.SUBMISSION_MAX_ATTEMPTS + 1):
+        assert pipeline.claim_submission(submission_id)
+        pipeline.process_submission(submission_id)
+        submission = load(session_factory, submission_id)
+        assert submission.attempts == attempt
+        assert "Ollama is unreachable" in submission.error
+        if attempt < pipeline.SUBMISSION_MAX_ATTEMPTS:
+            assert submission.stage == pipeline.STAGE_QUEUED
+            assert submission.updated_at > datetime.utcnow()  # Backing off
+            # Skip the backoff
+            db = session_factory()
+            db.query(Submission).filter(Submission.id == submission_id).update({Submission.updated_at: datetime.utcnow()})
+            db.commit()
+            db.close()
+
+    assert submission.stage == pipeline.STAGE_FAILED
+
+
+def test_unreadable_upload_fails_without_retrying(session_factory, monkeypatch):
+    """Test an error retrying can't fix fails the submission on the first attempt"""
+    monkeypatch.setattr(pipeline, "get_file_path", lambda resume_url: "/nonexistent/resume.pdf")
+    submission_id = add_submission(session_factory)
+
+    assert pipeline.claim_submission(submission_id)
+    pipeline.process_submission(submission_id)
+    assert load(session_factory, submission_id).stage == pipeline.STAGE_FAILED
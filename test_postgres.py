@@ -0,0 +1,107 @@
+"""
+Runs against a PostgreSQL server when TEST_DATABASE_URL is set, e.g.
+
+    TEST_DATABASE_URL=postgresql://postgres@localhost:5432/resume_scorer_test python -m pytest test_postgres.py
+
+The app's tables in that database are dropped and recreated.
+"""
+
+import asyncio
+import os
+import threading
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from candidate_listing import list_candidates, list_candidates_async
+from db_engine import create_configured_async_engine, create_configured_engine
+from migrations import MIGRATIONS, applied_versions, run_migrations, schema_lock
+from models import Base, Candidate, JobDetails
+from write_queue import WriteQueue
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"), reason="TEST_DATABASE_URL is not a PostgreSQL URL"
+)
+
+
+@pytest.fixture
+def engine():
+    engine = create_configured_engine(TEST_DATABASE_URL)
+    Base.metadata.drop_all(engine)
+    yield engine
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def create_schema(engine):
+    """What models.create_tables() does, for this engine"""
+    with schema_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        run_migrations(engine)
+
+
+def test_workers_starting_together_create_the_schema_once(engine):
+    """Test concurrent create_tables() calls don't race on CREATE TABLE or migrations"""
+    errors = []
+
+    def start_worker():
+        try:
+            create_schema(engine)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=start_worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert applied_versions(engine) == {version for version, _, _ in MIGRATIONS}
+
+
+def test_candidates_on_postgres(engine):
+    """Test inserts, duplicate handling and sync/async listings behave as on SQLite"""
+    create_schema(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add(JobDetails(job_title="Engineer", job_details="-", skills_requirement="Python",
+                          education_requirement="-", experience_requirement="-"))
+        db.commit()
+        job_id = db.query(JobDetails.job_id).scalar()
+
+    def add_candidate(email, score):
+        def write(db):
+            db.add(Candidate(job_id=job_id, user_name=email, user_email=email, resume_url="/uploads/c.pdf",
+                             total_score=score))
+        return write
+
+    writer = WriteQueue(session_factory=factory, max_wait_ms=200, name="test_pg_writer")
+    futures = [writer.submit(add_candidate(f"c{i}@example.com", float(i % 3 * 10))) for i in range(9)]
+    duplicate = writer.submit(add_candidate("c0@example.com", 0.0))
+    for future in futures:
+        future.result(timeout=10)
+    assert isinstance(duplicate.exception(timeout=10), IntegrityError)
+
+    with factory() as db:
+        first = list_candidates(db, limit=4, job_id=job_id, sort="total_score", fields="id,total_score")
+        second = list_candidates(db, limit=4, job_id=job_id, sort="total_score", fields="id,total_score",
+                                 cursor=first["next_cursor"])
+    items = first["items"] + second["items"]
+    assert len({item["id"] for item in items}) == 8
+    assert [item["total_score"] for item in items] == sorted((item["total_score"] for item in items), reverse=True)
+
+    async def fetch():
+        async_engine = create_configured_async_engine(TEST_DATABASE_URL)
+        try:
+            async with async_sessionmaker(async_engine)() as db:
+                return await list_candidates_async(db, limit=4, job_id=job_id, sort="total_score",
+                                                   fields="id,total_score")
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(fetch()) == first
@@ -0,0 +1,47 @@
+import prescreen as prescreen_module
+from prescreen import DECISION_ACCEPT, DECISION_ESCALATE, DECISION_REJECT, estimate_scores, prescreen
+
+JOB = "Job Title: Backend Engineer\nSkills: Python, Django, PostgreSQL, Docker, Kubernetes, REST APIs"
+
+STRONG = "\n".join(
+    ["EXPERIENCE"]
+    + [f"Built Python Django REST APIs on PostgreSQL, Docker and Kubernetes serving {n}k users, cutting latency {n}%"
+       for n in range(10, 40)]
+    + ["EDUCATION", "BSc Computer Science", "SKILLS", "Python, Django, PostgreSQL, Docker, Kubernetes, REST APIs",
+       "PROJECTS", "Open source contributor"]
+)
+WEAK = "Barista. Made coffee."
+
+
+def test_estimate_scores_stay_in_range():
+    """Test the local estimate covers the seven components and their bounds"""
+    scores = estimate_scores(STRONG, JOB, ["https://github.com/dev", "https://github.com/dev/"])
+    assert set(scores) == {"IMPACT", "FORMAT", "LANGUAGE", "SKILLS", "SIMILARITY", "GITHUB", "TOTAL"}
+    assert all(0 <= scores[key] <= 5 for key in ("IMPACT", "FORMAT", "LANGUAGE", "SKILLS"))
+    assert scores["GITHUB"] == 8  # Duplicate profile links count once
+    assert scores["TOTAL"] == sum(value for key, value in scores.items() if key != "TOTAL")
+
+
+def test_prescreen_decides_only_clear_cases(monkeypatch):
+    """Test clear rejects and accepts are decided locally and the rest escalated"""
+    monkeypatch.setattr(prescreen_module, "get_thresholds", lambda job_id: (40, 75))
+    assert prescreen(WEAK, JOB, [], job_id=-1)[0] == DECISION_REJECT
+    assert prescreen(STRONG, JOB, [], job_id=-1)[0] == DECISION_ESCALATE
+
+    estimate = {"IMPACT": 5, "FORMAT": 5, "LANGUAGE": 3, "SKILLS": 5, "SIMILARITY": 58, "GITHUB": 0, "TOTAL": 76}
+    monkeypatch.setattr(prescreen_module, "estimate_scores", lambda *args: estimate)
+    assert prescreen(STRONG, JOB, [], job_id=-1) == (DECISION_ACCEPT, estimate)
+
+
+def test_unverified_github_links_never_earn_an_accept(monkeypatch):
+    """Test link points can prevent a local reject but not push a resume over the accept threshold"""
+    monkeypatch.setattr(prescreen_module, "get_thresholds", lambda job_id: (40, 75))
+    links = ["https://github.com/a", "https://github.com/b"]
+    estimate = estimate_scores(STRONG, JOB, links)
+    assert estimate["GITHUB"] == 16 and estimate["TOTAL"] >= 75
+    assert prescreen(STRONG, JOB, links, job_id=-1)[0] == DECISION_ESCALATE
+
+    # A borderline reject is escalated instead, since the links may hold real work
+    monkeypatch.setattr(prescreen_module, "get_thresholds", lambda job_id: (70, 90))
+    assert prescreen(STRONG, JOB, [], job_id=-1)[0] == DECISION_REJECT
+    assert prescreen(STRONG, JOB, links, job_id=-1)[0] == DECISION_ESCALATE
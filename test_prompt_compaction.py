@@ -0,0 +1,68 @@
+import os
+
+from agents import build_scoring_prompt, scoring_prompt_prefix
+from prompt_compaction import compact_github_data, compact_resume, count_tokens, drop_boilerplate, normalize_text
+
+
+def test_drops_page_furniture_and_contact_lines():
+    """Test headers, page numbers and contact details are removed but content is kept"""
+    text = ""
+    for page in range(1, 4):
+        text += f"Jane Roe - Curriculum Vitae    Page {page}\n"
+        text += f"•   Led   migration number {page} of the billing platform to Kubernetes clusters\n"
+        text += f"{page}\n"
+    text = "jane@example.com | +44 20 7946 0958\nSoftware Engineer 2019 - 2021\n" + text
+
+    lines = drop_boilerplate(normalize_text(text))
+
+    assert lines == [
+        "Software Engineer 2019 - 2021",
+        "• Led migration number 1 of the billing platform to Kubernetes clusters",
+        "• Led migration number 2 of the billing platform to Kubernetes clusters",
+        "• Led migration number 3 of the billing platform to Kubernetes clusters"
+    ]
+
+
+def test_budget_keeps_every_section():
+    """Test section-aware truncation shares the budget instead of cutting off the tail"""
+    experience = "\n".join(f"Shipped feature {i} for the search team with measurable impact" for i in range(200))
+    text = f"EXPERIENCE\n{experience}\nSKILLS\nPython, Go, SQL\nEDUCATION\nB.Sc. Computer Science"
+
+    compacted = compact_resume(text, budget=200)
+
+    assert count_tokens(compacted) <= 210
+    assert "[...]" in compacted
+    assert "Python, Go, SQL" in compacted
+    assert compacted.endswith("EDUCATION\nB.Sc. Computer Science")
+
+
+def test_github_data_is_minified_within_budget():
+    """Test READMEs are shortened and empty fields dropped to fit the budget"""
+    github_data = {
+        "profiles": [{"name": "Jane", "bio": None, "profile_readme": "hello " * 80}],
+        "projects": [{"repo_url": f"https://github.com/jane/repo{i}", "readme": "docs " * 100} for i in range(5)]
+    }
+
+    compacted = compact_github_data(github_data, budget=250)
+
+    assert count_tokens(compacted) <= 250
+    assert "\n" not in compacted and '"bio"' not in compacted
+    assert "repo0" in compacted
+
+
+def test_scoring_prompts_share_job_prefix():
+    """Test two applicants to one job get a byte-identical prefix and differ only in the suffix"""
+    job_description = "Backend Engineer\nRequired: Python, PostgreSQL, 3+ years of API development"
+    github_data = {"profiles": [], "projects": []}
+
+    first = build_scoring_prompt(job_description, "Jane Roe\nPython developer at Acme", github_data)
+    second = build_scoring_prompt(job_description, "John Doe\nGo developer at Initech", github_data)
+
+    prefix = scoring_prompt_prefix(job_description)
+    shared = os.path.commonprefix([first, second])
+    assert first.startswith(prefix) and second.startswith(prefix)
+    assert first[:len(prefix)].encode("utf-8") == second[:len(prefix)].encode("utf-8")
+    assert len(shared) >= len(prefix)
+    assert job_description in prefix
+    assert "Jane Roe" in first[len(prefix):] and "John Doe" in second[len(prefix):]
+    assert first[len(prefix):] != second[len(prefix):]
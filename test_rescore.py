@@ -0,0 +1,115 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import agents
+import rescore
+import score_cache
+from models import Base, Candidate, JobDetails
+
+
+class Interrupted(BaseException):
+    """Stands in for Ctrl+C; not caught as a per-candidate failure"""
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(rescore, "SessionLocal", factory)
+
+    db = factory()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.add_all(Candidate(job_id=1, user_name=f"c{i}", user_email=f"c{i}@example.com",
+                         resume_url=f"/uploads/{i}.pdf") for i in range(1, 8))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_interrupted_run_resumes_from_checkpoint(session_factory, monkeypatch):
+    """Test batches commit with the checkpoint and a rerun scores only what is left"""
+    scored = []
+
+    def fake_rescore(candidate_id, resume_url, job, job_description):
+        if candidate_id == 5 and 5 not in scored:
+            scored.append(5)
+            raise Interrupted()
+        if candidate_id == 6:
+            raise IOError("missing resume")
+        scored.append(candidate_id)
+        return {"Parameter Score": 10, "Job Similarity Score": 40, "GitHub Score": 10, "Total Score": 60}
+
+    monkeypatch.setattr(rescore, "rescore_candidate", fake_rescore)
+
+    with pytest.raises(Interrupted):
+        rescore.rescore_job(1, workers=1, batch_size=2)
+    db = session_factory()
+    assert rescore.latest_run(db, 1).last_candidate_id == 4
+    db.close()
+
+    summary = rescore.rescore_job(1, workers=1, batch_size=2)
+    assert summary["status"] == rescore.STATUS_COMPLETED
+    assert (summary["processed"], summary["failed"], summary["total"]) == (6, 1, 7)
+    # Candidates 1-4 were committed before the interruption and not scored again
+    assert scored == [1, 2, 3, 4, 5, 5, 7]
+
+    db = session_factory()
+    totals = {c.id: c.total_score for c in db.query(Candidate)}
+    assert totals == {1: 60, 2: 60, 3: 60, 4: 60, 5: 60, 6: 0, 7: 60}
+    db.close()
+
+
+def test_model_outage_keeps_stored_scores(session_factory, monkeypatch, tmp_path):
+    """Test fallback scores from an unavailable or unparseable model never replace real scores"""
+    resume = tmp_path / "resume.pdf"
+    resume.write_bytes(b"%PDF")
+    monkeypatch.setattr(rescore, "get_file_path", lambda resume_url: str(resume))
+    monkeypatch.setattr(rescore, "extract_with_cache", lambda pdf_content: ("Python developer", []))
+    monkeypatch.setattr(score_cache, "SCORE_CACHE_ENABLED", False)
+    monkeypatch.setattr(agents, "SCORING_CASCADE_ENABLED", False)
+    monkeypatch.setattr(agents, "SCORING_FORMAT", "lines")
+    replies = iter([None, "I cannot score this resume."] + ["IMPACT: 4\nFORMAT: 4\nLANGUAGE: 4\nSKILLS: 4\n"
+                                                            "SIMILARITY: 40\nGITHUB: 10\nTOTAL: 66"] * 5)
+    monkeypatch.setattr(agents, "score_with_ollama", lambda prompt, **kwargs: next(replies))
+
+    summary = rescore.rescore_job(1, workers=1, batch_size=3)
+    assert (summary["processed"], summary["failed"]) == (5, 2)
+
+    db = session_factory()
+    totals = {c.id: c.total_score for c in db.query(Candidate)}
+    assert totals == {1: 0, 2: 0, 3: 66, 4: 66, 5: 66, 6: 66, 7: 66}
+    db.close()
+
+
+def test_concurrent_starts_run_the_job_once(session_factory, monkeypatch):
+    """Test a second start while the first is running is refused up front"""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_rescore(candidate_id, resume_url, job, job_description):
+        started.set()
+        release.wait(5)
+        return {"Parameter Score": 10, "Job Similarity Score": 40, "GitHub Score": 10, "Total Score": 60}
+
+    monkeypatch.setattr(rescore, "rescore_candidate", slow_rescore)
+    thread = rescore.start_rescore(1)
+    # Refused even if the first thread hasn't started running yet
+    with pytest.raises(RuntimeError):
+        rescore.start_rescore(1)
+    assert started.wait(5)
+    with pytest.raises(RuntimeError):
+        rescore.rescore_job(1)
+
+    release.set()
+    thread.join(5)
+    db = session_factory()
+    assert rescore.latest_run(db, 1).status == rescore.STATUS_COMPLETED
+    db.close()
+    # The reservation is released once the run ends
+    rescore.start_rescore(1).join(5)
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import agents
+import score_cache
+from models import Base, JobDetails, ScoreCache
+
+RESUME = "Data engineer with Python, SQL and Spark experience."
+REPLY = "IMPACT: 4\nFORMAT: 4\nLANGUAGE: 5\nSKILLS: 4\nSIMILARITY: 45\nGITHUB: 10\nTOTAL: 72"
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(score_cache, "SessionLocal", factory)
+    monkeypatch.setattr(score_cache, "SCORE_CACHE_ENABLED", True)
+    monkeypatch.setattr(agents, "SCORING_CASCADE_ENABLED", False)
+    monkeypatch.setattr(agents, "SCORING_FORMAT", "lines")
+    return factory
+
+
+@pytest.fixture
+def job():
+    return JobDetails(job_id=902, job_title="Data Engineer", job_details="Build pipelines",
+                      skills_requirement="Python, SQL, Spark", education_requirement="BSc",
+                      experience_requirement="3 years")
+
+
+def fake_ollama(monkeypatch, reply):
+    """Make score_with_ollama return `reply`; returns the list of prompts it was called with"""
+    calls = []
+
+    def score_with_ollama(prompt, **kwargs):
+        calls.append(prompt)
+        return reply
+
+    monkeypatch.setattr(agents, "score_with_ollama", score_with_ollama)
+    return calls
+
+
+def stored_entries(factory):
+    db = factory()
+    try:
+        return db.query(ScoreCache).count()
+    finally:
+        db.close()
+
+
+def test_key_changes_with_job_revision_model_and_prompt_version():
+    """Test each part of the key invalidates old entries when it changes"""
+    base = ("resume", ["https://github.com/ann"], 1, "fingerprint", "gemma3:4b", "v1")
+    key = score_cache.score_cache_key(*base)
+    assert score_cache.score_cache_key(*base) == key
+    for index, changed in ((3, "edited fingerprint"), (4, "llama3:8b"), (5, "v2")):
+        parts = list(base)
+        parts[index] = changed
+        assert score_cache.score_cache_key(*parts) != key
+
+
+def test_cache_hit_skips_ollama(session_factory, job, monkeypatch):
+    """Test a repeat scoring of the same resume and job revision is served from the cache"""
+    calls = fake_ollama(monkeypatch, REPLY)
+    first = agents.score_resume(RESUME, "job description", [], job=job)
+    second = agents.score_resume(RESUME, "job description", [], job=job)
+
+    assert len(calls) == 1
+    assert second == first and first["Total Score"] == 72
+    assert stored_entries(session_factory) == 1
+
+
+@pytest.mark.parametrize("reply", [
+    None,  # Ollama failed, so the keyword-based default scoring is used
+    "IMPACT: 4\nFORMAT: 4\nLANGUAGE: 5\nSKI",  # Truncated; the missing scores get defaults
+    "I cannot score this resume.",
+])
+def test_default_scores_are_not_cached(session_factory, job, monkeypatch, reply):
+    """Test an evaluation completed with default scores is not stored for later submissions"""
+    calls = fake_ollama(monkeypatch, reply)
+    agents.score_resume(RESUME, "job description", [], job=job)
+    agents.score_resume(RESUME, "job description", [], job=job)
+
+    assert len(calls) == 2
+    assert stored_entries(session_factory) == 0
@@ -0,0 +1,80 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from agents import ScoreLineParser
+from ollama_client import OllamaClientPool
+
+SCORE_LINES = ["IMPACT: 4", "FORMAT: 3", "LANGUAGE: 4", "SKILLS: 5", "SIMILARITY: 42", "GITHUB: 15", "TOTAL: 73"]
+
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    """Fake /api/generate that streams the score lines, then keeps chatting"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        tokens = [f"{line}\n" for line in SCORE_LINES] + ["Explanation "] * 200
+        try:
+            for token in tokens:
+                self._chunk({"model": "m", "created_at": "2025-01-01T00:00:00Z", "response": token, "done": False})
+                self.server.sent += 1
+                time.sleep(0.005)
+            self._chunk({"model": "m", "created_at": "2025-01-01T00:00:00Z", "response": "", "done": True,
+                         "eval_count": len(tokens)})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.server.disconnected.set()
+
+    def _chunk(self, payload):
+        data = (json.dumps(payload) + "\n").encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+@pytest.fixture
+def fake_ollama():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllamaHandler)
+    server.sent = 0
+    server.disconnected = threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+
+
+def test_parser_waits_for_complete_lines():
+    """Test a score line is only taken once its line has ended"""
+    parser = ScoreLineParser()
+    for line in SCORE_LINES[:-1]:
+        assert not parser.feed(line + "\n")
+    assert not parser.feed("TOTAL: 7")
+    assert parser.feed("3\nbecause")
+    assert parser.scores["TOTAL"] == 73
+    assert parser.first_score_seconds is not None
+
+
+def test_stream_stops_once_scores_are_parsed(fake_ollama):
+    """Test the generation is abandoned, and the connection dropped, after TOTAL"""
+    pool = OllamaClientPool(host=fake_ollama.url, timeout=10)
+    parser = ScoreLineParser()
+
+    result = pool.stream(parser.feed, model="m", prompt="score this")
+
+    assert result["stopped_early"]
+    assert result["tokens"] == len(SCORE_LINES)
+    assert parser.scores["SIMILARITY"] == 42
+    assert fake_ollama.disconnected.wait(timeout=5)
+    assert fake_ollama.sent < 100
@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Base, Candidate, JobDetails
+from write_queue import WriteQueue
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+
+    db = factory()
+    db.add(JobDetails(job_id=1, job_title="Engineer", job_details="-", skills_requirement="Python",
+                      education_requirement="-", experience_requirement="-"))
+    db.commit()
+    db.close()
+    return factory
+
+
+def add_candidate(email):
+    def write(db):
+        candidate = Candidate(job_id=1, user_name=email, user_email=email, resume_url=f"/uploads/{email}.pdf")
+        db.add(candidate)
+        db.flush()
+        return candidate.id
+    return write
+
+
+def test_failed_write_does_not_fail_its_group(session_factory):
+    """Test queued writes commit as one group and a duplicate only fails its own caller"""
+    commits = []
+    writer = WriteQueue(session_factory=lambda **kwargs: _tracking(session_factory(**kwargs), commits),
+                        max_batch=10, max_wait_ms=500, name="test_writer")
+
+    futures = [writer.submit(add_candidate(email)) for email in ("a@x.com", "b@x.com", "a@x.com", "c@x.com")]
+    results = [future.exception(timeout=5) or future.result() for future in futures]
+
+    assert isinstance(results[2], IntegrityError)
+    assert [results[0], results[1], results[3]] == [1, 2, 3]
+    # One transaction committed the three good rows after the duplicate was dropped
+    assert commits == [3]
+
+    db = session_factory()
+    assert sorted(c.user_email for c in db.query(Candidate)) == ["a@x.com", "b@x.com", "c@x.com"]
+    db.close()
+
+
+def _tracking(session, commits):
+    """Session whose commit() records how many candidates the table holds when it commits"""
+    commit = session.commit
+
+    def counting_commit():
+        commits.append(session.query(Candidate).count())
+        commit()
+
+    session.commit = counting_commit
+    return session
+
+
+def test_disabled_queue_writes_inline(session_factory):
+    """Test WRITE_QUEUE_ENABLED=false commits on the calling thread"""
+    writer = WriteQueue(session_factory=session_factory, enabled=False)
+    assert writer.run(add_candidate("a@x.com")) == 1
+    assert writer._thread is None
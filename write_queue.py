@@ -0,0 +1,155 @@
+"""
+Single-writer queue with group commit.
+
+SQLite allows one writer at a time, and with many request threads each
+committing its own candidate row they queue on the database lock, each
+paying a full commit. Instead, writes are submitted to one writer thread
+that takes every write queued at that moment (up to WRITE_BATCH_MAX,
+waiting at most WRITE_BATCH_WAIT_MS for more) and commits them in a
+single transaction.
+
+A write is a function taking a Session; it adds or updates rows and
+returns a value for the caller. The group's rows are flushed together.
+A write that fails (e.g. a duplicate email) is reported to its own
+caller only: the group is rolled back and run again flushing one write
+at a time, so write functions must be safe to call more than once
+before their commit.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from dotenv import load_dotenv
+
+import metrics
+from models import SessionLocal
+
+# Load environment variables from .env file
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Set WRITE_QUEUE_ENABLED=false to commit candidate inserts on the calling thread
+WRITE_QUEUE_ENABLED = os.getenv("WRITE_QUEUE_ENABLED", "true").lower() in ("1", "true", "yes")
+# Most writes committed in one transaction
+WRITE_BATCH_MAX = int(os.getenv("WRITE_BATCH_MAX", "64"))
+# How long the writer waits for more writes to join a group after the first
+WRITE_BATCH_WAIT_MS = float(os.getenv("WRITE_BATCH_WAIT_MS", "2"))
+
+
+class WriteQueue:
+    """Runs submitted write functions on one thread, committing them in groups"""
+
+    def __init__(self, session_factory=SessionLocal, max_batch=WRITE_BATCH_MAX, max_wait_ms=WRITE_BATCH_WAIT_MS,
+                 enabled=WRITE_QUEUE_ENABLED, name="write-queue"):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.enabled = enabled
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def submit(self, write):
+        """Queue `write(session)`; returns a Future resolved with its result once committed"""
+        future = Future()
+        if not self.enabled:
+            self._commit([(write, future)])
+            return future
+
+        self._ensure_started()
+        self._queue.put((write, future, time.perf_counter()))
+        metrics.set_gauge(f"{self.name}.depth", self._queue.qsize())
+        return future
+
+    def run(self, write, timeout=None):
+        """submit() and wait for the result (raises the write's exception)"""
+        return self.submit(write).result(timeout)
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            group = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(group) < self.max_batch:
+                try:
+                    # Take what is already queued; wait for stragglers only until the deadline
+                    group.append(self._queue.get(timeout=max(deadline - time.perf_counter(), 0)))
+                except queue.Empty:
+                    break
+
+            now = time.perf_counter()
+            for _, _, queued_at in group:
+                metrics.observe(f"{self.name}.wait_seconds", now - queued_at)
+            try:
+                self._commit([(write, future) for write, future, _ in group])
+            except Exception as e:
+                # _commit resolves every future; this only guards the thread
+                logger.error(f"{self.name} failed to commit a group: {str(e)}")
+
+    def _commit(self, group):
+        """Run and commit a group of writes, retrying without any write that raises"""
+        pending = [(write, future) for write, future in group if future.set_running_or_notify_cancel()]
+        # Flushing once lets the group's inserts go out together; after a failure each write
+        # is flushed on its own to find the one that raised
+        flush_each = len(pending) == 1
+        while pending:
+            # Results stay readable after commit, e.g. the id of an inserted row
+            db = self.session_factory(expire_on_commit=False)
+            try:
+                results = []
+                for index, (write, future) in enumerate(pending):
+                    try:
+                        results.append(write(db))
+                        if flush_each:
+                            db.flush()
+                    except Exception as e:
+                        db.rollback()
+                        if flush_each:
+                            future.set_exception(e)
+                            pending = pending[:index] + pending[index + 1:]
+                        else:
+                            # The failure may come from an earlier write's rows flushed by this one
+                            flush_each = True
+                        # The rest of the group ran in the rolled-back transaction; run it again
+                        metrics.increment(f"{self.name}.retried_groups")
+                        break
+                else:
+                    try:
+                        db.flush()
+                    except Exception:
+                        if flush_each:
+                            raise
+                        db.rollback()
+                        flush_each = True
+                        metrics.increment(f"{self.name}.retried_groups")
+                        continue
+                    start = time.perf_counter()
+                    db.commit()
+                    metrics.observe(f"{self.name}.commit_seconds", time.perf_counter() - start)
+                    metrics.observe(f"{self.name}.group_size", len(pending))
+                    for (_, future), result in zip(pending, results):
+                        future.set_result(result)
+                    pending = []
+            except Exception as e:
+                # The commit itself failed: every write in the group failed with it
+                db.rollback()
+                for _, future in pending:
+                    future.set_exception(e)
+                pending = []
+            finally:
+                db.close()
+
+
+# Candidate inserts from /submit-resume and the submission pipeline
+candidate_writer = WriteQueue(name="candidate_writer")